@@ -1,6 +1,9 @@
 import os
-from shiny import App, ui, reactive, render
+from urllib.parse import parse_qs
+from shiny import App, ui, reactive
 from shiny.ui import nav_panel
+from starlette.applications import Starlette
+from starlette.routing import Mount, Route
 
 # --- Modules ---
 from modules.about import about_ui
@@ -13,6 +16,79 @@ from modules.comparison import comparison_ui, comparison_server
 # --- Theme ---
 from utils.theme import create_theme
 
+# --- Data ---
+from utils.cache import cache_metrics
+from utils.cart import cart_add, cart_diff, cart_remove, product_ids
+from utils.comparison_lists import load_list
+from utils.data_loader import get_data
+from utils.metrics import metrics_endpoint, register_metrics
+from utils.sessions import register_session, session_metrics
+from utils.config import VENDOR_SOURCES
+from utils.static_assets import asset_url, immutable_cache
+from utils.workers import admission_metrics, event_loop_metrics, start_lag_monitor, worker_metrics
+
+
+def cart_ui():
+    """
+    Cart button and popover (hidden on About).
+
+    The list is rendered once; `www/cart.js` inserts and removes rows as the
+    server sends `cart_diff` messages, so cart changes never re-render it.
+    """
+    popover = ui.popover(
+
+        # Trigger button
+        ui.tags.button(
+            ui.tags.i(class_="fa-solid fa-cart-shopping"),
+            ui.tags.span(
+                "0",
+                id="cart-count",
+                class_="badge rounded-pill bg-danger ms-1 d-none",
+            ),
+            class_="btn btn-outline-primary position-relative",
+            type="button",
+        ),
+
+        # Popover content
+        ui.div(
+            ui.h6("My comparison list", class_="mb-3"),
+
+            ui.div(
+                ui.p("No products added yet.", id="cart-empty", class_="text-muted"),
+                id="cart-items",
+                style="max-height: 300px; overflow-y: auto; min-width: 250px;",
+            ),
+
+            ui.hr(),
+
+            ui.div(
+                ui.tags.button(
+                    "Compare your products",
+                    class_="btn btn-primary btn-sm flex-grow-1",
+                    onclick="Shiny.setInputValue('go_to_comparison', Math.random(), {priority: 'event'})",
+                ),
+                ui.tags.button(
+                    ui.tags.i(class_="fa-solid fa-trash"),
+                    class_="btn btn-outline-danger btn-sm ms-2",
+                    title="Clear cart",
+                    onclick="Shiny.setInputValue('clear_cart', Math.random(), {priority: 'event'})",
+                ),
+                class_="d-flex",
+            ),
+
+            class_="p-2",
+        ),
+
+        placement="bottom",
+    )
+
+    return ui.panel_conditional(
+        "input.main_nav !== 'About'",
+        ui.div(popover, class_="d-flex align-items-center"),
+        id="cart_container",
+        class_="ms-auto",
+    )
+
 
 # =========================================================
 # UI
@@ -62,12 +138,18 @@ app_ui = ui.page_navbar(
     header=ui.TagList(
         ui.tags.head(
             ui.tags.link(rel="stylesheet", href="styles.css"),
+            ui.tags.script(src="cart.js"),
+            ui.tags.script(src="url_state.js"),
+            ui.tags.script(src="session_activity.js"),
+            ui.tags.script(src="lazy_content.js"),
+            # Vendored by scripts/build_assets.py (CDN until it has been run)
             ui.tags.link(
                 rel="stylesheet",
-                href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css",
+                href=asset_url("fonts.css", default=VENDOR_SOURCES["fonts.css"]),
             ),
-            ui.tags.script(
-                src="https://cdn.jsdelivr.net/npm/echarts@5.4.3/dist/echarts.min.js"
+            ui.tags.link(
+                rel="stylesheet",
+                href=asset_url("fontawesome.css", default=VENDOR_SOURCES["fontawesome.css"]),
             ),
         ),
 
@@ -82,7 +164,7 @@ app_ui = ui.page_navbar(
                         ),
                         class_="flex-grow-1",
                     ),
-                    ui.output_ui("cart_container"),
+                    cart_ui(),
                     class_="d-flex align-items-center justify-content-between",
                 ),
                 class_="container-fluid px-4",
@@ -137,110 +219,92 @@ app_ui = ui.page_navbar(
 # =========================================================
 # SERVER
 # =========================================================
+def defer_until_tab(input, tab, start_module):
+    """
+    Starts a module server the first time `main_nav` switches to `tab`.
+
+    Sessions that never open the tab never load its data or register its
+    outputs. The module's outputs are bound when it starts, so the tab
+    renders as soon as it is shown.
+
+    Args:
+        input: The app session's inputs.
+        tab (str): `main_nav` value of the module's tab.
+        start_module (callable): Calls the module server.
+    """
+    started = {"value": False}
+
+    @reactive.Effect
+    def _start_module():
+        if started["value"] or input.main_nav() != tab:
+            return
+        started["value"] = True
+        with reactive.isolate():
+            start_module()
+        _start_module.destroy()
+
+
 def server(input, output, session):
 
     # -------------------------
-    # Shared cart state
+    # Session lifecycle (idle release, memory accounting, loop lag)
     # -------------------------
-    cart = reactive.Value(set())
+    register_session(session)
+    start_lag_monitor()
 
     # -------------------------
-    # Module servers
+    # Shared cart state (frozenset of product ids)
     # -------------------------
-    comparison_server("comparison", cart=cart)
-    innovation_page_server("innovation_page", cart=cart)
+    cart = reactive.Value(frozenset())
+    product_names = get_data()["product_names"]
 
     # -------------------------
-    # Cart UI (hidden on About)
+    # Module servers (Product comparison is built on first visit)
     # -------------------------
-    @render.ui
-    def cart_container():
-
-        # Hide cart on About page
-        if input.main_nav() == "About":
-            return None
-
-        items = list(cart.get())
-        count = len(items)
-
-        return ui.div(
-            ui.popover(
-
-                # Trigger button
-                ui.tags.button(
-                    ui.tags.i(class_="fa-solid fa-cart-shopping"),
-                    ui.tags.span(
-                        str(count),
-                        class_="badge rounded-pill bg-danger ms-1",
-                    )
-                    if count > 0
-                    else "",
-                    class_="btn btn-outline-primary position-relative",
-                    type="button",
-                ),
-
-                # Popover content
-                ui.div(
-                    ui.h6("My comparison list", class_="mb-3"),
-
-                    ui.div(
-                        *(
-                            [
-                                ui.div(
-                                    ui.tags.span(item),
-                                    ui.tags.button(
-                                        ui.tags.i(class_="fa-solid fa-xmark"),
-                                        class_="btn btn-sm btn-ghost float-end",
-                                        onclick=f"Shiny.setInputValue('remove_from_cart', '{item}', {{priority: 'event'}})",
-                                    ),
-                                    class_="cart-item d-flex justify-content-between align-items-center w-100",
-                                )
-                                for item in items
-                            ]
-                            if items
-                            else [ui.p("No products added yet.", class_="text-muted")]
-                        ),
-                        style="max-height: 300px; overflow-y: auto; min-width: 250px;",
-                    ),
-
-                    ui.hr(),
+    innovation_page_server("innovation_page", cart=cart)
+    defer_until_tab(input, "Product comparison", lambda: comparison_server("comparison", cart=cart))
 
-                    ui.div(
-                        ui.tags.button(
-                            "Compare your products",
-                            class_="btn btn-primary btn-sm flex-grow-1",
-                            onclick="Shiny.setInputValue('go_to_comparison', Math.random(), {priority: 'event'})",
-                        ),
-                        ui.tags.button(
-                            ui.tags.i(class_="fa-solid fa-trash"),
-                            class_="btn btn-outline-danger btn-sm ms-2",
-                            title="Clear cart",
-                            onclick="Shiny.setInputValue('clear_cart', Math.random(), {priority: 'event'})",
-                        ),
-                        class_="d-flex",
-                    ),
+    # -------------------------
+    # Cart UI: send only what changed
+    # -------------------------
+    shown = {"ids": frozenset()}
 
-                    class_="p-2",
-                ),
+    @reactive.Effect
+    async def _sync_cart_ui():
+        current = cart.get()
+        diff = cart_diff(shown["ids"], current, product_names)
+        shown["ids"] = current
+        if diff["add"] or diff["remove"]:
+            await session.send_custom_message("cart_diff", diff)
 
-                placement="bottom",
-            ),
-            class_="ms-auto d-flex align-items-center",
-        )
+    # -------------------------
+    # Shared lists: ?list=<token> restores the cart
+    # -------------------------
+    @reactive.Effect
+    def _restore_shared_list():
+        with reactive.isolate():
+            token = parse_qs(session.clientdata.url_search().lstrip("?")).get("list", [None])[0]
+        if not token:
+            return
+        saved = load_list(token)
+        if saved is None:
+            ui.notification_show("This shared list no longer exists", type="warning")
+            return
+        cart.set(frozenset(product_ids(saved["products"], product_names)))
+        ui.update_navs("main_nav", selected="Product comparison")
 
     # -------------------------
     # Cart logic
     # -------------------------
     @reactive.Effect
-    @reactive.event(input.remove_from_cart)
-    def _remove_item():
-        item_to_remove = input.remove_from_cart()
-        current = cart.get()
+    @reactive.event(input.cart_add)
+    def _add_items():
+        cart_add(cart, input.cart_add() or [])
 
-        if item_to_remove in current:
-            new_cart = current.copy()
-            new_cart.remove(item_to_remove)
-            cart.set(new_cart)
+    @reactive.Effect
+    @reactive.event(input.cart_remove)
+    def _remove_items():
+        cart_remove(cart, input.cart_remove() or [])
 
     @reactive.Effect
     @reactive.event(input.go_to_comparison)
@@ -250,14 +314,30 @@ def server(input, output, session):
     @reactive.Effect
     @reactive.event(input.clear_cart)
     def _clear_cart():
-        cart.set(set())
+        cart.set(frozenset())
 
 
 # =========================================================
 # APP
 # =========================================================
-app = App(
+shiny_app = App(
     app_ui,
     server,
     static_assets=os.path.join(os.path.dirname(__file__), "www"),
+)
+
+register_metrics("sessions", session_metrics)
+register_metrics("workers", worker_metrics)
+register_metrics("event_loop", event_loop_metrics)
+register_metrics("caches", cache_metrics)
+register_metrics("admission", admission_metrics)
+
+app = immutable_cache(
+    Starlette(
+        routes=[
+            Route("/metrics", metrics_endpoint),
+            Mount("/", app=shiny_app),
+        ],
+        lifespan=shiny_app.starlette_app.router.lifespan_context,
+    )
 )
\ No newline at end of file
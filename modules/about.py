@@ -1,41 +1,6 @@
-import os
 from shiny import ui
 
-
-# =========================================================
-# UTIL
-# =========================================================
-def load_html(path):
-    with open(path, "r") as f:
-        html = f.read()
-
-    # Extract only the content within the main tag to avoid including
-    # full <html>, <head>, and <body> tags which break host page styling.
-    start_tag = '<main class="content" id="quarto-document-content">'
-    end_tag = "</main>"
-
-    start_idx = html.find(start_tag)
-    end_idx = html.find(end_tag)
-
-    if start_idx != -1 and end_idx != -1:
-        content = html[start_idx : end_idx + len(end_tag)]
-
-        # Clean up unrendered Quarto/R artifacts if they exist
-        content = content.replace("<code>r params$last_updated</code>", "2026-03-27")
-        content = content.replace("`r params$last_updated`", "2026-03-27")
-
-        return content
-
-    return html
-
-
-# =========================================================
-# LOAD CONTENT (CACHE AT IMPORT)
-# =========================================================
-BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-ABOUT_PATH = os.path.join(BASE_DIR, "docs", "content", "about.html")
-
-ABOUT_HTML = load_html(ABOUT_PATH)
+from utils.static_assets import asset_url
 
 
 # =========================================================
@@ -43,14 +8,31 @@ ABOUT_HTML = load_html(ABOUT_PATH)
 # =========================================================
 
 def about_ui(id):
+    """
+    About tab.
+
+    The content is built by `scripts/build_assets.py` from the Quarto page
+    and fetched by `www/lazy_content.js` when the tab is first shown, so it
+    is not part of the page HTML and browsers cache it across visits.
+    """
+    src = asset_url("about.html")
+    if src is None:
+        body = ui.p(
+            "The About page has not been built. Run scripts/build_assets.py.",
+            class_="text-muted",
+        )
+    else:
+        body = ui.p("Loading…", class_="text-muted")
 
     return ui.div(
         ui.div(
-            ui.HTML(ABOUT_HTML),
+            body,
             class_="about-body",
+            data_lazy_src=src,
             # FULL WIDTH
             style="""
                 width: 100%;
+                min-height: 50vh;
             """,
         ),
         class_="container-fluid px-4 py-4",
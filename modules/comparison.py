@@ -1,9 +1,18 @@
+import functools
 from shiny import ui, reactive, module, render, req as shiny_req
+from starlette.responses import JSONResponse
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from shinywidgets import output_widget, render_widget
-from utils.data_loader import load_data
+from utils.cache import cached, make_cache
+from utils.cart import cart_add, cart_remove, product_ids, product_labels
+from utils.comparison_lists import list_lists, load_list, save_list
+from utils.data_loader import get_data
+from utils.dates import has_date, iso_dates, to_timestamp
+from utils.product_search import SEARCH_LIMIT, get_product_search, search_products
+from utils.sessions import require_active
+from utils.workers import run_in_worker, worker_calc
 
 
 def req(condition):
@@ -18,6 +27,463 @@ def req(condition):
         shiny_req(False)
 
 
+# Heatmap rows: label -> column of the WHO-scope data
+METRICS_MAP = {
+    "Product": "innovation",
+    "Disease": "disease",
+    "Stage": "trial_status",
+    "Projected first launch": "proj_date_first_launch",
+    "Kenya market authorization": "Kenya_nra",
+    "Senegal market authorization": "Senegal_nra",
+    "South Africa market authorization": "South Africa_nra",
+    "Global market authorization": "gra",
+    "WHO EML listed": "eml",
+}
+
+# Milestone colors
+EVENT_COLORS = {
+    "Proof of Concept": "#00539B",      # Accent Blue
+    "Marketing Authorization": "#012169", # Primary Blue
+    "First Country Launch": "#228B22",    # Success Green
+    "20% Market Uptake": "#8b5cf6",
+}
+
+EVENT_MAP = [
+    {
+        "label": "Proof of Concept",
+        "real": "date_proof_of_concept",
+        "proj": "date_proof_of_concept",
+    },
+    {
+        "label": "Marketing Authorization",
+        "real": "date_first_regulatory",
+        "proj": "proj_date_first_regulatory",
+    },
+    {
+        "label": "First Country Launch",
+        "real": "date_first_launch",
+        "proj": "proj_date_first_launch",
+    },
+    {
+        "label": "20% Market Uptake",
+        "real": None,
+        "proj": "proj_date_lmic_20_uptake",
+    },
+]
+
+# Comparison outputs shared by all sessions, keyed by data version and products
+_OUTPUT_CACHE = make_cache(maxsize=256, name="comparison_outputs")
+
+# Shown when an output is shed under load (see utils/workers.py `admit`)
+BUSY_MESSAGE = "The server is busy; this view will refresh shortly"
+BUSY_HTML = f'<p class="text-muted">{BUSY_MESSAGE}</p>'
+
+# Rendered heatmap HTML and timeline figures, keyed like `_OUTPUT_CACHE`.
+# Figures are safe to share: `render_widget` copies them into a new widget.
+_FIGURE_CACHE = make_cache(maxsize=256, name="comparison_figures")
+
+
+def comparison_table(horizon_df, names):
+    """
+    Builds the Impact & Readiness heatmap table for a set of products.
+
+    Args:
+        horizon_df (pd.DataFrame): Processed horizon data.
+        names (list): Innovation names to compare.
+
+    Returns:
+        pd.DataFrame: One row per product, columns labelled as in `METRICS_MAP`.
+    """
+    df_filtered = (
+        horizon_df.loc[
+            (horizon_df["scope"] == "WHO")
+            & (horizon_df["innovation"].isin(names))
+        ]
+        .assign(proj_date_first_launch=lambda d: iso_dates(d["proj_date_first_launch"]))
+    )
+
+    compare_df = pd.DataFrame(index=range(len(df_filtered)))
+    for label, col in METRICS_MAP.items():
+        if col in df_filtered.columns:
+            compare_df[label] = df_filtered[col].values
+        else:
+            compare_df[label] = "N/A"
+    return compare_df
+
+
+def milestone_events(horizon_df, names):
+    """
+    Timeline milestones of each product, sorted by date.
+
+    For products with several WHO rows, the row with the most projected
+    dates is used.
+
+    Args:
+        horizon_df (pd.DataFrame): Processed horizon data.
+        names (list): Innovation names, in display order.
+
+    Returns:
+        dict: {innovation: [{"name", "date", "type"}, ...]} for products with
+              at least one dated milestone.
+    """
+    base = horizon_df.loc[
+        (horizon_df["scope"] == "WHO") & (horizon_df["innovation"].isin(names))
+    ]
+    timeline = {}
+
+    for innovation in names:
+        sub = base[base["innovation"] == innovation]
+
+        if sub.empty:
+            continue
+
+        proj_cols = [e["proj"] for e in EVENT_MAP if e["proj"] in sub.columns]
+
+        if proj_cols:
+            completeness = has_date(sub[proj_cols]).sum(axis=1)
+            row = sub.iloc[int(np.argmax(completeness))]
+        else:
+            row = sub.iloc[0]
+
+        events = []
+
+        for event in EVENT_MAP:
+            proj_col = event["proj"]
+            real_col = event["real"]
+
+            if proj_col not in row.index:
+                continue
+
+            proj_date = to_timestamp(row.get(proj_col))
+            real_date = (
+                to_timestamp(row.get(real_col)) if real_col and real_col in row.index else None
+            )
+
+            if proj_date is not None:
+                event_type = (
+                    "Actual"
+                    if real_date is not None
+                    else "Projection"
+                )
+
+                events.append(
+                    {
+                        "name": event["label"],
+                        "date": proj_date,
+                        "type": event_type,
+                    }
+                )
+
+        if events:
+            events.sort(key=lambda x: x["date"])
+            timeline[innovation] = events
+
+    return timeline
+
+
+def comparison_outputs(horizon_df, names, version):
+    """
+    Heatmap table and timeline milestones for a product set, cached across sessions.
+
+    Usage:
+        Read by the comparison renderers, and warmed when a list is saved so a
+        shared link renders from cache.
+
+    Args:
+        horizon_df (pd.DataFrame): Processed horizon data.
+        names (list): Innovation names, in display order.
+        version (str): `load_data()["data_version"]` of `horizon_df`.
+
+    Returns:
+        dict: {"table": pd.DataFrame, "timeline": dict}
+    """
+    names = list(names)
+    return cached(
+        _OUTPUT_CACHE, (version, tuple(names)), functools.partial(_build_outputs, horizon_df, names)
+    )
+
+
+async def warm_comparison_outputs(horizon_df, names, version):
+    """
+    `comparison_outputs` for the event loop.
+
+    Runs `comparison_outputs` itself on the worker pool, so the loop is never
+    blocked. `_OUTPUT_CACHE` is only read through `cached` from running
+    worker threads: whoever claims a key is already computing it, and the
+    heatmap / timeline jobs waiting on it can never hold the threads the
+    computation needs.
+
+    Args:
+        horizon_df (pd.DataFrame): Processed horizon data.
+        names (list): Innovation names, in display order.
+        version (str): `load_data()["data_version"]` of `horizon_df`.
+
+    Returns:
+        dict: {"table": pd.DataFrame, "timeline": dict}
+    """
+    return await run_in_worker(comparison_outputs, horizon_df, list(names), version)
+
+
+def _build_outputs(horizon_df, names):
+    # Uncached body of `comparison_outputs`
+    return {
+        "table": comparison_table(horizon_df, names),
+        "timeline": milestone_events(horizon_df, names),
+    }
+
+
+def heatmap_html(compare_df):
+    """
+    Renders the Impact & Readiness table as styled HTML.
+
+    Runs on the worker pool: the Styler pass over every cell is the most
+    expensive step of the comparison page.
+
+    Args:
+        compare_df (pd.DataFrame): `comparison_outputs(...)["table"]`.
+
+    Returns:
+        str: HTML table.
+    """
+    numeric_cols = [
+        "Probability of Success",
+        "Financing Score",
+        "Readiness Score",
+        "Efficacy",
+    ]
+
+    yes_no_cols = [
+        "Kenya market authorization",
+        "Senegal market authorization",
+        "South Africa market authorization",
+        "Global Mkt Authorization",
+        "WHO EML listed",
+    ]
+
+    def color_cells(val):
+        if pd.isna(val) or val == "N/A":
+            return "background-color:#f8f9fa;color:#BFBBBB" # Neutral Gray
+
+        if isinstance(val, str):
+            v = val.strip().lower()
+
+            if v == "yes":
+                return "background-color:rgba(34, 139, 34, 0.1);color:#228B22;font-weight:700" # Success Green
+
+            if v == "no":
+                return "background-color:rgba(220, 20, 60, 0.1);color:#DC143C;font-weight:700" # Error Red
+
+        try:
+            v = float(val)
+
+            if v <= 1:
+                return (
+                    "background-color:rgba(34, 139, 34, 0.1);color:#228B22"
+                    if v > 0.5
+                    else "background-color:rgba(220, 20, 60, 0.1);color:#DC143C"
+                )
+            elif v <= 2:
+                return (
+                    "background-color:rgba(34, 139, 34, 0.1);color:#228B22"
+                    if v > 1
+                    else "background-color:rgba(220, 20, 60, 0.1);color:#DC143C"
+                )
+            else:
+                return (
+                    "background-color:rgba(34, 139, 34, 0.1);color:#228B22"
+                    if v > 50
+                    else "background-color:rgba(220, 20, 60, 0.1);color:#DC143C"
+                )
+        except Exception:
+            return ""
+
+    cols_to_style = [
+        c for c in numeric_cols + yes_no_cols if c in compare_df.columns
+    ]
+
+    styler = (
+        compare_df.style.hide(axis="index")
+        .set_table_attributes('class="table table-striped table-hover table-sm"')
+        .set_properties(
+            **{
+                "text-align": "center",
+                "vertical-align": "middle",
+                "font-size": "0.9rem",
+                "padding": "6px",
+            }
+        )
+        .set_table_styles(
+            [
+                {
+                    "selector": "th",
+                    "props": [
+                        ("background-color", "#012169"),
+                        ("color", "white"),
+                        ("font-weight", "600"),
+                        ("text-align", "center"),
+                    ],
+                },
+                {
+                    "selector": "td",
+                    "props": [
+                        ("border", "1px solid #dee2e6"),
+                    ],
+                },
+            ]
+        )
+    )
+
+    if cols_to_style:
+        if hasattr(styler, "map"):
+            styler = styler.map(color_cells, subset=cols_to_style)
+        else:
+            styler = styler.applymap(color_cells, subset=cols_to_style)
+
+    return styler.format(na_rep="—").to_html()
+
+
+def message_figure(text):
+    """
+    Empty chart showing a centred message (placeholder for the timeline).
+
+    Args:
+        text (str): Message.
+
+    Returns:
+        go.Figure: Blank figure with the message.
+    """
+    fig = go.Figure()
+    fig.update_layout(
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        annotations=[
+            dict(
+                text=text,
+                showarrow=False,
+                xref="paper",
+                yref="paper",
+                x=0.5,
+                y=0.5,
+            )
+        ],
+        height=300,
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+    )
+    return fig
+
+
+def timeline_figure(horizon_df, selected_ids, version):
+    """
+    Time-to-market milestone chart for the compared products.
+
+    Runs on the worker pool; the returned `go.Figure` is turned into a
+    widget on the event loop by `render_widget`.
+
+    Args:
+        horizon_df (pd.DataFrame): Processed horizon data.
+        selected_ids (list): Innovation names, in display order.
+        version (str): `load_data()["data_version"]` of `horizon_df`.
+
+    Returns:
+        go.Figure: Timeline, or a placeholder when nothing is selected or dated.
+    """
+
+    if not selected_ids:
+        return message_figure("Select products to compare")
+
+    fig = go.Figure()
+    all_dates_flat = []
+
+    timeline = comparison_outputs(horizon_df, selected_ids, version)["timeline"]
+
+    for innovation, events in timeline.items():
+        all_dates_flat.extend(e["date"] for e in events)
+
+        dates = [e["date"] for e in events]
+        names = [e["name"] for e in events]
+        marker_colors = [EVENT_COLORS[e["name"]] for e in events]
+        types = [e["type"] for e in events]
+
+        fig.add_trace(
+            go.Scatter(
+                x=dates,
+                y=[innovation] * len(dates),
+                mode="lines+markers",
+                line=dict(color="#000000", width=3),
+                marker=dict(
+                    size=12,
+                    color=marker_colors,
+                    line=dict(width=2, color="white"),
+                ),
+                text=names,
+                customdata=types,
+                hovertemplate=(
+                    "<b>%{text}</b><br>"
+                    "Date: %{x|%Y-%m-%d}<br>"
+                    "Source: %{customdata}<extra></extra>"
+                ),
+                showlegend=False,
+            )
+        )
+
+    if not all_dates_flat:
+        return message_figure("No timeline data available")
+
+    # Legend entries for milestones
+    for label, color in EVENT_COLORS.items():
+        fig.add_trace(
+            go.Scatter(
+                x=[None],
+                y=[None],
+                mode="markers",
+                marker=dict(size=12, color=color),
+                name=label,
+            )
+        )
+
+    start_range = min(all_dates_flat) - pd.DateOffset(years=1)
+    end_range = max(all_dates_flat) + pd.DateOffset(years=1)
+
+    fig.update_layout(
+        height=max(400, 150 + (len(selected_ids) * 50)),
+        showlegend=True,
+        legend=dict(
+            title=dict(text="Milestones", font=dict(size=12)),
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1,
+        ),
+        margin=dict(l=20, r=20, t=50, b=50),
+        xaxis=dict(
+            type="date",
+            range=[start_range, end_range],
+            showgrid=True,
+            gridcolor="#f0f0f0",
+            zeroline=False,
+            linecolor="#BFBBBB",
+            tickformat="%Y",
+            side="bottom",
+        ),
+        yaxis=dict(
+            type="category",
+            categoryorder="array",
+            categoryarray=list(reversed(selected_ids)),
+            autorange="reversed",
+            showgrid=False,
+        ),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+    )
+
+    fig.update_xaxes(automargin=True)
+    fig.update_yaxes(automargin=True)
+
+    return fig
+
+
 @module.ui
 def comparison_ui():
     """
@@ -41,6 +507,26 @@ def comparison_ui():
                         choices=[],  # Filled by server
                         multiple=True,
                         width="100%",
+                        options={
+                            # Keep the server's ranking: show exactly the
+                            # options of the latest response, in its order,
+                            # and re-query on every keystroke.
+                            "loadThrottle": 150,
+                            "maxOptions": SEARCH_LIMIT,
+                            "onLoad": ui.js_eval(
+                                """function(res) {
+                                    this.loadedSearches = {};
+                                    this.serverRanks = {};
+                                    (res || []).forEach((o, i) => { this.serverRanks[o.value] = i; });
+                                }"""
+                            ),
+                            "score": ui.js_eval(
+                                """function() {
+                                    const ranks = this.serverRanks || {};
+                                    return (item) => item.value in ranks ? 1 / (1 + ranks[item.value]) : 0;
+                                }"""
+                            ),
+                        },
                     ),
                     ui.input_action_button(
                         "add_search_to_cart_comp",
@@ -49,6 +535,12 @@ def comparison_ui():
                         ),
                         class_="btn btn-primary btn-sm w-100 mt-2",
                     ),
+                    ui.input_select(
+                        "open_list",
+                        "Open a saved list:",
+                        choices={"": "—"},  # Filled by server
+                        width="100%",
+                    ),
                     class_="col-md-4 card p-3",
                 ),
                 class_="row mb-4 align-items-center",
@@ -57,17 +549,34 @@ def comparison_ui():
                 ui.div(
                     ui.div(
                         ui.span("Products in Your List", class_="fw-semibold"),
-                        ui.input_action_button(
-                            "remove_selected_from_cart_comp",
-                            ui.tags.span(
-                                ui.tags.i(class_="fa-solid fa-trash me-1"), "Remove from list"
+                        ui.div(
+                            ui.input_text(
+                                "list_name",
+                                None,
+                                placeholder="List name",
+                                width="200px",
                             ),
-                            class_="btn btn-sm btn-outline-danger",
+                            ui.input_action_button(
+                                "save_list",
+                                ui.tags.span(
+                                    ui.tags.i(class_="fa-solid fa-share-nodes me-1"), "Save & share"
+                                ),
+                                class_="btn btn-sm btn-outline-primary",
+                            ),
+                            ui.input_action_button(
+                                "remove_selected_from_cart_comp",
+                                ui.tags.span(
+                                    ui.tags.i(class_="fa-solid fa-trash me-1"), "Remove from list"
+                                ),
+                                class_="btn btn-sm btn-outline-danger",
+                            ),
+                            class_="d-flex align-items-center gap-2",
                         ),
                         class_="d-flex justify-content-between align-items-center w-100",
                     ),
                     class_="card-header",
                 ),
+                ui.output_ui("share_link"),
                 ui.div(
                     ui.output_data_frame("pipeline_compare"),
                     class_="card-body p-0",
@@ -84,7 +593,7 @@ def comparison_ui():
                     class_="card-header",
                 ),
                 ui.div(
-                    ui.output_table("comparison_heatmap"),
+                    ui.output_ui("comparison_heatmap"),
                     class_="card-body d-flex justify-content-center overflow-auto",
                 ),
                 class_="card mb-4",
@@ -114,19 +623,28 @@ def comparison_server(input, output, session, cart):
     """
     Server logic for the Product Comparison module.
     """
-    data = load_data()
-    horizon_df = data["horizon"].copy()
+    data = get_data()
+    product_names = data["product_names"]
+    data_version = data["data_version"]
+
+    # Shared, read-only product rows (WHO scope)
+    horizon_df = data["innovation_df"]
+
+    async def product_index():
+        # Built once per data version (on the worker pool) and shared by all sessions
+        return await get_product_search(data["products"], data_version)
     selected_comp_innovation = reactive.Value(None)
 
     def comparison_base_df():
         """
         Returns only products currently in the cart.
         """
-        items = list(cart.get())
-        out = horizon_df[horizon_df["innovation"].isin(items)].copy()
+        items = product_labels(cart.get(), product_names)
+        require_active()
+        out = horizon_df[horizon_df["innovation"].isin(items)]
 
         return (
-            out.loc[out["scope"] == "WHO"].copy().reset_index(drop=True)
+            out.loc[out["scope"] == "WHO"].reset_index(drop=True)
         )
 
 
@@ -151,18 +669,15 @@ def comparison_server(input, output, session, cart):
 
     @reactive.Calc
     def selected_innovation_ids():
-        # In the new logic, all products in comparison_base_df (i.e. in cart) are compared
-        base = comparison_base_df()
-        if base.empty:
-            return []
-        return base["innovation"].tolist()
+        # All products in the cart are compared, in name order (the order
+        # comparison outputs are cached under)
+        require_active()
+        return product_labels(cart.get(), product_names)
 
     @render.data_frame
     def pipeline_compare():
         df = comparison_base_df().assign(
-            proj_date_first_launch=lambda d: pd.to_datetime(
-                d["proj_date_first_launch"], errors="coerce"
-            ).dt.strftime("%Y-%m-%d")
+            proj_date_first_launch=lambda d: iso_dates(d["proj_date_first_launch"])
         )
 
         return render.DataGrid(
@@ -193,14 +708,20 @@ def comparison_server(input, output, session, cart):
             selected_id = df_f.iloc[idx]["innovation"]
             selected_comp_innovation.set(selected_id)
 
+    async def _product_search_json(request):
+        """
+        Selectize data route: ranked product names for the typed query.
+        """
+        query = request.query_params.get("query", "")
+        names = search_products(await product_index(), query, limit=SEARCH_LIMIT)
+        return JSONResponse([{"value": n, "label": n} for n in names])
+
     @reactive.Effect
     def _update_comp_search():
-        all_products = sorted(horizon_df["innovation"].dropna().unique().tolist())
-        ui.update_selectize(
+        # Only the route URL is sent; choices are fetched as the user types
+        session.send_input_message(
             "product_search_comp",
-            choices=all_products,
-            selected=None,
-            server=True
+            {"url": session.dynamic_route("product_search_comp", _product_search_json)},
         )
 
     @reactive.Effect
@@ -208,23 +729,86 @@ def comparison_server(input, output, session, cart):
     def _add_search_to_cart_comp():
         searched = input.product_search_comp()
         if searched:
-            current = cart.get()
-            new_cart = current.copy()
-            for prod in searched:
-                new_cart.add(prod)
-            cart.set(new_cart)
+            # One cart update for the whole selection
+            cart_add(cart, product_ids(searched, product_names))
             ui.update_selectize("product_search_comp", selected=[])
 
+    # ---------------------------------------------------------
+    # Saved, shareable lists
+    # ---------------------------------------------------------
+    share_token = reactive.Value(None)
+
+    def _update_saved_lists(selected=""):
+        choices = {"": "—"}
+        choices.update({token: name for token, name in list_lists()})
+        ui.update_select("open_list", choices=choices, selected=selected)
+
+    @reactive.Effect
+    def _init_saved_lists():
+        _update_saved_lists()
+
+    @reactive.Effect
+    @reactive.event(input.save_list)
+    async def _save_list():
+        names = selected_innovation_ids()
+        if not names:
+            ui.notification_show("Add products before saving a list", type="warning")
+            return
+
+        name = input.list_name().strip() or f"{len(names)} products"
+        token = save_list(name, names)
+
+        share_token.set(token)
+        _update_saved_lists(selected=token)
+        ui.notification_show(f"Saved '{name}'", type="message")
+
+        # Warm the comparison outputs on the worker pool so the shared link
+        # renders from cache
+        await warm_comparison_outputs(horizon_df, names, data_version)
+
+    @reactive.Effect
+    @reactive.event(input.open_list)
+    def _open_list():
+        token = input.open_list()
+        if not token:
+            return
+        saved = load_list(token)
+        if saved is None:
+            return
+        cart.set(frozenset(product_ids(saved["products"], product_names)))
+        share_token.set(token)
+
+    @render.ui
+    def share_link():
+        token = share_token.get()
+        if not token:
+            return None
+        cd = session.clientdata
+        port = cd.url_port()
+        url = (
+            f"{cd.url_protocol()}//{cd.url_hostname()}{':' + port if port else ''}"
+            f"{cd.url_pathname()}?list={token}"
+        )
+        return ui.div(
+            ui.tags.small("Share this list:", class_="text-muted me-2"),
+            ui.tags.input(
+                type="text",
+                value=url,
+                readonly=True,
+                onclick="this.select()",
+                class_="form-control form-control-sm",
+            ),
+            class_="d-flex align-items-center px-3 py-2 border-bottom",
+        )
+
     @reactive.Effect
     @reactive.event(input.remove_selected_from_cart_comp)
     def _remove_selected_from_cart_comp():
         selected_id = selected_comp_innovation.get()
         if selected_id:
-            current = cart.get()
-            if selected_id in current:
-                new_cart = current.copy()
-                new_cart.remove(selected_id)
-                cart.set(new_cart)
+            ids = product_ids([selected_id], product_names)
+            if ids and ids[0] in cart.get():
+                cart_remove(cart, ids)
                 ui.notification_show(f"Removed {selected_id} from comparison list", type="message")
                 selected_comp_innovation.set(None)
         else:
@@ -232,7 +816,7 @@ def comparison_server(input, output, session, cart):
 
     @reactive.Effect
     def _sync_selection():
-        current_cart = cart.get()
+        current_cart = product_labels(cart.get(), product_names)
         selected_id = selected_comp_innovation.get()
         if selected_id and selected_id not in current_cart:
             selected_comp_innovation.set(None)
@@ -244,351 +828,44 @@ def comparison_server(input, output, session, cart):
         if not selected_ids:
             return pd.DataFrame()
 
-        return horizon_df[horizon_df["innovation"].isin(selected_ids)].copy()
+        return horizon_df[horizon_df["innovation"].isin(selected_ids)]
+
+    def heatmap_for(horizon_df, names):
+        if not names:
+            return None
+        return heatmap_html(comparison_outputs(horizon_df, names, data_version)["table"])
+
+    # Computed on the worker pool (see utils/workers.py), once per product set
+    heatmap = worker_calc(
+        heatmap_for,
+        lambda: (horizon_df, selected_innovation_ids()),
+        cache=_FIGURE_CACHE,
+        key=lambda _, names: ("heatmap", data_version, tuple(names)),
+        output_class="heatmap",
+        busy=lambda: BUSY_HTML,
+        name="comparison.heatmap",
+    )
 
-    @render.table
+    @render.ui
     def comparison_heatmap():
-        selected_ids = selected_innovation_ids()
-
-        if not selected_ids:
-            return pd.DataFrame({"Message": ["Select products to compare"]})
-        df_filtered = (
-            horizon_df.loc[
-                (horizon_df["scope"] == "WHO")
-                & (horizon_df["innovation"].isin(selected_ids))
-            ]
-            .copy()
-            .assign(
-                proj_date_first_launch=lambda d: pd.to_datetime(
-                    d["proj_date_first_launch"], errors="coerce"
-                ).dt.strftime("%Y-%m-%d")
-            )
-        )
-
-        metrics_map = {
-            "Product": "innovation",
-            "Disease": "disease",
-            "Stage": "trial_status",
-            "Projected first launch": "proj_date_first_launch",
-            "Kenya market authorization": "Kenya_nra",
-            "Senegal market authorization": "Senegal_nra",
-            "South Africa market authorization": "South Africa_nra",
-            "Global market authorization": "gra",
-            "WHO EML listed": "eml",
-        }
-
-        compare_df = pd.DataFrame()
-        for label, col in metrics_map.items():
-            if col in df_filtered.columns:
-                compare_df[label] = df_filtered[col].values
-            else:
-                compare_df[label] = "N/A"
-
-        numeric_cols = [
-            "Probability of Success",
-            "Financing Score",
-            "Readiness Score",
-            "Efficacy",
-        ]
-
-        yes_no_cols = [
-            "Kenya market authorization",
-            "Senegal market authorization",
-            "South Africa market authorization",
-            "Global Mkt Authorization",
-            "WHO EML listed",
-        ]
-
-        def color_cells(val):
-            if pd.isna(val) or val == "N/A":
-                return "background-color:#f8f9fa;color:#BFBBBB" # Neutral Gray
-
-            if isinstance(val, str):
-                v = val.strip().lower()
-
-                if v == "yes":
-                    return "background-color:rgba(34, 139, 34, 0.1);color:#228B22;font-weight:700" # Success Green
-
-                if v == "no":
-                    return "background-color:rgba(220, 20, 60, 0.1);color:#DC143C;font-weight:700" # Error Red
-
-            try:
-                v = float(val)
-
-                if v <= 1:
-                    return (
-                        "background-color:rgba(34, 139, 34, 0.1);color:#228B22"
-                        if v > 0.5
-                        else "background-color:rgba(220, 20, 60, 0.1);color:#DC143C"
-                    )
-                elif v <= 2:
-                    return (
-                        "background-color:rgba(34, 139, 34, 0.1);color:#228B22"
-                        if v > 1
-                        else "background-color:rgba(220, 20, 60, 0.1);color:#DC143C"
-                    )
-                else:
-                    return (
-                        "background-color:rgba(34, 139, 34, 0.1);color:#228B22"
-                        if v > 50
-                        else "background-color:rgba(220, 20, 60, 0.1);color:#DC143C"
-                    )
-            except Exception:
-                return ""
-
-        cols_to_style = [
-            c for c in numeric_cols + yes_no_cols if c in compare_df.columns
-        ]
-
-        styler = (
-            compare_df.style.hide(axis="index")
-            .set_table_attributes('class="table table-striped table-hover table-sm"')
-            .set_properties(
-                **{
-                    "text-align": "center",
-                    "vertical-align": "middle",
-                    "font-size": "0.9rem",
-                    "padding": "6px",
-                }
-            )
-            .set_table_styles(
-                [
-                    {
-                        "selector": "th",
-                        "props": [
-                            ("background-color", "#012169"),
-                            ("color", "white"),
-                            ("font-weight", "600"),
-                            ("text-align", "center"),
-                        ],
-                    },
-                    {
-                        "selector": "td",
-                        "props": [
-                            ("border", "1px solid #dee2e6"),
-                        ],
-                    },
-                ]
-            )
-        )
-
-        if cols_to_style:
-            if hasattr(styler, "map"):
-                styler = styler.map(color_cells, subset=cols_to_style)
-            else:
-                styler = styler.applymap(color_cells, subset=cols_to_style)
-
-        return styler.format(na_rep="—")
+        html = heatmap()
+        if html is None:
+            return ui.p("Select products to compare", class_="text-muted")
+        return ui.HTML(html)
+
+    # Computed on the worker pool (see utils/workers.py), once per product set
+    timeline = worker_calc(
+        timeline_figure,
+        lambda: (horizon_df, selected_innovation_ids(), data_version),
+        cache=_FIGURE_CACHE,
+        key=lambda _, names, version: ("timeline", version, tuple(names)),
+        output_class="timeline",
+        busy=lambda: message_figure(BUSY_MESSAGE),
+        name="comparison.timeline",
+    )
 
     @render_widget(
-    height=lambda: f"{max(400, 150 + len(list(cart.get())) * 60)}px"
+    height=lambda: f"{max(400, 150 + len(cart.get()) * 60)}px"
 )
     def time_to_market_plot():
-        selected_ids = selected_innovation_ids()
-
-        if not selected_ids:
-            fig = go.Figure()
-            fig.update_layout(
-                xaxis=dict(visible=False),
-                yaxis=dict(visible=False),
-                annotations=[
-                    dict(
-                        text="Select products to compare",
-                        showarrow=False,
-                        xref="paper",
-                        yref="paper",
-                        x=0.5,
-                        y=0.5,
-                    )
-                ],
-                height=300,
-                plot_bgcolor="white",
-                paper_bgcolor="white",
-            )
-            return fig
-
-        base = comparison_base_df()
-
-        fig = go.Figure()
-        all_dates_flat = []
-
-        # Milestone colors
-        event_colors = {
-            "Proof of Concept": "#00539B",      # Accent Blue
-            "Marketing Authorization": "#012169", # Primary Blue
-            "First Country Launch": "#228B22",    # Success Green
-            "20% Market Uptake": "#8b5cf6",
-        }
-
-        event_map = [
-            {
-                "label": "Proof of Concept",
-                "real": "date_proof_of_concept",
-                "proj": "date_proof_of_concept",
-            },
-            {
-                "label": "Marketing Authorization",
-                "real": "date_first_regulatory",
-                "proj": "proj_date_first_regulatory",
-            },
-            {
-                "label": "First Country Launch",
-                "real": "date_first_launch",
-                "proj": "proj_date_first_launch",
-            },
-            {
-                "label": "20% Market Uptake",
-                "real": None,
-                "proj": "proj_date_lmic_20_uptake",
-            },
-        ]
-
-        for innovation in selected_ids:
-            sub = base[base["innovation"] == innovation]
-
-            if sub.empty:
-                continue
-
-            proj_cols = [e["proj"] for e in event_map if e["proj"] in sub.columns]
-
-            if proj_cols:
-                completeness = sub[proj_cols].notna().sum(axis=1)
-                row = sub.loc[completeness.idxmax()]
-            else:
-                row = sub.iloc[0]
-
-            events = []
-
-            for event in event_map:
-                proj_col = event["proj"]
-                real_col = event["real"]
-
-                if proj_col not in row.index:
-                    continue
-
-                proj_date = row.get(proj_col)
-                real_date = (
-                    row.get(real_col) if real_col and real_col in row.index else None
-                )
-
-                if pd.notna(proj_date):
-                    event_type = (
-                        "Actual"
-                        if (real_col and pd.notna(real_date))
-                        else "Projection"
-                    )
-
-                    events.append(
-                        {
-                            "name": event["label"],
-                            "date": proj_date,
-                            "type": event_type,
-                        }
-                    )
-
-                    all_dates_flat.append(proj_date)
-
-            if not events:
-                continue
-
-            events.sort(key=lambda x: x["date"])
-
-            dates = [e["date"] for e in events]
-            names = [e["name"] for e in events]
-            marker_colors = [event_colors[e["name"]] for e in events]
-            types = [e["type"] for e in events]
-
-            fig.add_trace(
-                go.Scatter(
-                    x=dates,
-                    y=[innovation] * len(dates),
-                    mode="lines+markers",
-                    line=dict(color="#000000", width=3),
-                    marker=dict(
-                        size=12,
-                        color=marker_colors,
-                        line=dict(width=2, color="white"),
-                    ),
-                    text=names,
-                    customdata=types,
-                    hovertemplate=(
-                        "<b>%{text}</b><br>"
-                        "Date: %{x|%Y-%m-%d}<br>"
-                        "Source: %{customdata}<extra></extra>"
-                    ),
-                    showlegend=False,
-                )
-            )
-
-        if not all_dates_flat:
-            fig.update_layout(
-                xaxis=dict(visible=False),
-                yaxis=dict(visible=False),
-                annotations=[
-                    dict(
-                        text="No timeline data available",
-                        showarrow=False,
-                        xref="paper",
-                        yref="paper",
-                        x=0.5,
-                        y=0.5,
-                    )
-                ],
-                height=300,
-                plot_bgcolor="white",
-                paper_bgcolor="white",
-            )
-            return fig
-
-        # Legend entries for milestones
-        for label, color in event_colors.items():
-            fig.add_trace(
-                go.Scatter(
-                    x=[None],
-                    y=[None],
-                    mode="markers",
-                    marker=dict(size=12, color=color),
-                    name=label,
-                )
-            )
-
-        start_range = min(all_dates_flat) - pd.DateOffset(years=1)
-        end_range = max(all_dates_flat) + pd.DateOffset(years=1)
-
-        fig.update_layout(
-            height=max(400, 150 + (len(selected_ids) * 50)),
-            showlegend=True,
-            legend=dict(
-                title=dict(text="Milestones", font=dict(size=12)),
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1,
-            ),
-            margin=dict(l=20, r=20, t=50, b=50),
-            xaxis=dict(
-                type="date",
-                range=[start_range, end_range],
-                showgrid=True,
-                gridcolor="#f0f0f0",
-                zeroline=False,
-                linecolor="#BFBBBB",
-                tickformat="%Y",
-                side="bottom",
-            ),
-            yaxis=dict(
-                type="category",
-                categoryorder="array",
-                categoryarray=list(reversed(selected_ids)),
-                autorange="reversed",
-                showgrid=False,
-            ),
-            plot_bgcolor="white",
-            paper_bgcolor="white",
-        )
-
-        fig.update_xaxes(automargin=True)
-        fig.update_yaxes(automargin=True)
-
-        return fig
\ No newline at end of file
+        return timeline()
\ No newline at end of file
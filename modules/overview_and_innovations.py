@@ -1,12 +1,227 @@
 # modules/innovation_page.py
+import json
 from shiny import ui, reactive, module, render, req
+from shiny.module import resolve_id
 from shiny.render import DataGrid
 from shiny.ui import popover
+from urllib.parse import parse_qs
 from utils.ui_helpers import info_tooltip
 import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
 from shinywidgets import output_widget, render_widget
-from utils.data_loader import load_data
+from utils.cache import cached, make_cache
+from utils.cart import cart_add, product_ids
+from utils.config import FILTER_DEBOUNCE, LAUNCH_WINDOW_YEARS
+from utils.cube import cube_counts, cube_distinct
+from utils.data_loader import get_data
+from utils.dates import date_range_rows, day, in_range, iso_date, iso_dates, next_years, to_timestamp
+from utils.pipeline import pipeline_view
+from utils.reactivity import debounce
+from utils.sessions import require_active, session_resource
+from utils.text_search import get_text_index, search_text
+from utils.workers import worker_calc
+
+
+# Filtered row positions per (data version, disease, category, status),
+# shared by all sessions so restored or shared filter states open warm
+_FILTER_CACHE = make_cache(maxsize=512, name="overview_filters")
+
+# Explorer rows need a 20% uptake date from this day on
+UPTAKE_FROM = day("2025-01-01")
+
+# Overview filters kept in the URL query string
+URL_FILTER_KEYS = ["disease", "category", "status", "product"]
+
+# Product type colors of the treemap and the trend chart
+CATEGORY_COLORS = {
+    "Diagnostic": "#00539B",    # Accent Blue
+    "Drug": "#012169",          # Primary Blue
+    "Vaccine": "#228B22",       # Success Green
+    "Medical Device": "#8b5cf6",
+    "Vector Control": "#DC143C", # Error Red
+    "Software": "#ec4899",
+    "Other": "#BFBBBB",         # Neutral Gray
+    "Unknown": "#BFBBBB",
+}
+
+
+def filtered_positions(innovation_df, version, disease=None, category=None, status=None):
+    """
+    Row positions of `innovation_df` matching an Overview filter state.
+
+    Phase 1 products are always excluded. Results are cached per exact
+    state, so every session (and every shared link) with the same filters
+    reuses them. Called on the worker pool (`utils.cache.cached`).
+
+    Args:
+        innovation_df (pd.DataFrame): WHO-scope product rows.
+        version (str): `load_data()["data_version"]` of `innovation_df`.
+        disease (str, optional): Disease filter; None or "All products" for all.
+        category (str, optional): Category filter.
+        status (str, optional): Trial status filter.
+
+    Returns:
+        np.ndarray: Sorted integer positions for `innovation_df.iloc`.
+    """
+    if disease == "All products":
+        disease = None
+
+    def compute():
+        # Not in place: with copy-on-write, `to_numpy()` returns read-only views
+        mask = (innovation_df["trial_status"] != "Phase 1").to_numpy()
+        if disease:
+            mask = mask & (innovation_df["disease"] == disease).to_numpy()
+        if category:
+            mask = mask & (innovation_df["category"] == category).to_numpy()
+        if status:
+            mask = mask & (innovation_df["trial_status"] == status).to_numpy()
+        return np.flatnonzero(mask)
+
+    return cached(_FILTER_CACHE, (version, disease, category, status), compute)
+
+
+def cube_filters(disease=None, category=None, status=None):
+    """
+    Count-cube slice of an Overview filter state (see `filtered_positions`).
+
+    Args:
+        disease (str, optional): Disease filter; None or "All products" for all.
+        category (str, optional): Category filter.
+        status (str, optional): Trial status filter.
+
+    Returns:
+        dict: Keyword arguments for `cube_counts` / `cube_distinct`.
+    """
+    return {
+        "scope": "WHO",
+        "disease": None if disease == "All products" else disease,
+        "category": category,
+        "trial_status": status,
+        "exclude": {"trial_status": "Phase 1"},
+    }
+
+
+def window_rows(df, rows):
+    """
+    Rows of `df` whose position is in `rows`.
+
+    Args:
+        df (pd.DataFrame): Subset of `innovation_df`, indexed by row position
+                           (as returned by `filtered_rows`).
+        rows (np.ndarray): Sorted row positions (see `date_range_rows`).
+
+    Returns:
+        pd.DataFrame: Matching rows, in row-position order.
+    """
+    return df.loc[np.intersect1d(df.index.to_numpy(), rows, assume_unique=True)]
+
+
+def table_rows(page_df, hits=None, uptake_rows=None):
+    """
+    Product Explorer rows: the page filters plus the uptake-date window and text search.
+
+    Args:
+        page_df (pd.DataFrame): Rows matching the page filters.
+        hits (pd.DataFrame, optional): `search_text` results; rows are kept
+                                       in their rank order.
+        uptake_rows (np.ndarray, optional): Row positions with an uptake date
+                                            from `UPTAKE_FROM` on, from the
+                                            dataset's date index. Scanned
+                                            from `page_df` when omitted.
+
+    Returns:
+        pd.DataFrame: Rows to list.
+    """
+    if uptake_rows is None:
+        df_f = page_df[in_range(page_df["proj_date_lmic_20_uptake"], start=UPTAKE_FROM)]
+    else:
+        df_f = window_rows(page_df, uptake_rows)
+
+    if hits is not None:
+        rank = pd.Series(range(len(hits)), index=hits["innovation"].to_numpy())
+        df_f = (
+            df_f[df_f["innovation"].isin(rank.index)]
+            .assign(_rank=lambda d: d["innovation"].map(rank))
+            .sort_values("_rank", kind="stable")
+            .drop(columns="_rank")
+        )
+    return df_f
+
+
+def pipeline_grid_frame(table_df):
+    """
+    Product Explorer rows formatted for the DataGrid.
+
+    Args:
+        table_df (pd.DataFrame): Output of `table_rows`.
+
+    Returns:
+        pd.DataFrame: Display columns, in the order of `table_df`.
+    """
+    # NOTE: the table shows proj_date_first_launch, but rows are filtered on
+    # proj_date_lmic_20_uptake (see table_rows).
+    return table_df.assign(
+        proj_date_first_launch=lambda d: iso_dates(d["proj_date_first_launch"])
+    ).rename(
+        columns={
+            "innovation": "Product",
+            "manufacturer": "Manufacturer",
+            "category": "Category",
+            "trial_status": "Status",
+            "proj_date_first_launch": "Projected date of launch",
+            "disease": "Disease area",
+        }
+    )[
+        [
+            "Product",
+            "Manufacturer",
+            "Disease area",
+            "Category",
+            "Status",
+            "Projected date of launch",
+        ]
+    ]
+
+
+def explorer_frames(page_df, hits=None, uptake_rows=None) -> dict:
+    """
+    Product Explorer frames for one filter state and search.
+
+    Usage:
+        Run as one `worker_calc` by the Overview server, so a filter change
+        costs one worker round trip and a superseded state is cancelled as
+        a whole.
+
+    Args:
+        page_df (pd.DataFrame): Rows matching the page filters.
+        hits (pd.DataFrame, optional): `search_text` results.
+        uptake_rows (np.ndarray, optional): See `table_rows`.
+
+    Returns:
+        dict: {"page_df", "table_df" (`table_rows`),
+               "pipeline_grid" (`pipeline_grid_frame`)}.
+    """
+    table_df = table_rows(page_df, hits, uptake_rows)
+    return {
+        "page_df": page_df,
+        "table_df": table_df,
+        "pipeline_grid": pipeline_grid_frame(table_df),
+    }
+
+
+def parse_filter_query(search: str) -> dict:
+    """
+    Reads the Overview filter state from a URL query string.
+
+    Args:
+        search (str): `?disease=...&category=...` (leading "?" optional).
+
+    Returns:
+        dict: Values for the keys of `URL_FILTER_KEYS` that are present.
+    """
+    params = parse_qs(search.lstrip("?"))
+    return {k: params[k][0] for k in URL_FILTER_KEYS if params.get(k, [""])[0]}
 
 
 def req(condition):
@@ -68,6 +283,8 @@ def innovation_page_ui():
       - Introduction readiness (Financing + Uptake/Delivery + Policy)
     """
     return ui.TagList(
+        # One-shot layout-ready signal (see www/session_activity.js)
+        ui.tags.script(f"whenLayoutReady({json.dumps(resolve_id('layout_ready'))});"),
         ui.div(
             # =====================================================
             # KPI CARDS
@@ -195,6 +412,33 @@ def innovation_page_ui():
                         ),
                         class_="row g-3",
                     ),
+                    ui.div(
+                        ui.div(
+                            ui.div(
+                                ui.div(
+                                    ui.tags.span("Projected Pipeline"),
+                                    info_tooltip(
+                                        "Cumulative number of products by projected date of first launch, for the filters above."
+                                    ),
+                                    class_="d-flex align-items-center gap-1",
+                                ),
+                                ui.input_radio_buttons(
+                                    "trend_grain",
+                                    None,
+                                    choices={"year": "Year", "quarter": "Quarter", "month": "Month"},
+                                    selected="year",
+                                    inline=True,
+                                ),
+                                class_="card-header d-flex align-items-center justify-content-between",
+                            ),
+                            ui.div(
+                                output_widget("trend_chart", height="320px"),
+                                class_="card-body",
+                            ),
+                            class_="card mb-0",
+                        ),
+                        class_="mt-3",
+                    ),
                     class_="card-body",
                 ),
                 class_="card mb-4",
@@ -228,6 +472,12 @@ def innovation_page_ui():
                             class_="fw-semibold",
                         ),
                         ui.div(
+                            ui.input_text(
+                                "text_search",
+                                None,
+                                placeholder="Search products, indications, manufacturers...",
+                                width="320px",
+                            ),
                             ui.input_action_button(
                                 "clear_filters",
                                 ui.tags.span(
@@ -244,7 +494,7 @@ def innovation_page_ui():
                                 ),
                                 class_="btn btn-sm btn-success",
                             ),
-                            class_="d-flex gap-2",
+                            class_="d-flex align-items-center gap-2",
                         ),
                         class_="d-flex justify-content-between align-items-center w-100",
                     ),
@@ -413,22 +663,41 @@ def innovation_page_server(input, output, session, cart):
     clear_trigger = reactive.Value(0)
     layout_ready = reactive.Value(False)
 
-    data = load_data()
-    horizon_df = data["horizon"]
+    data = get_data()
+    products = data["products"]
     innovation_df = data["innovation_df"]
+    cube = data["cube"]
+    date_indexes = data["date_indexes"]
+
+    # Row positions with a 20% uptake date from UPTAKE_FROM on (searchsorted)
+    uptake_rows = date_range_rows(date_indexes["proj_date_lmic_20_uptake"], start=UPTAKE_FROM)
+    product_names = data["product_names"]
+    data_version = data["data_version"]
+
+    @reactive.extended_task
+    async def text_index():
+        # Built once per data version on the worker pool and shared by all sessions
+        return await get_text_index(innovation_df, data_version)
+
+    text_index.invoke()
 
     # ---------------------------------------------------------
     # Populate dropdown choices
     # ---------------------------------------------------------
-    diseases = ["All products"] + sorted(horizon_df["disease"].dropna().unique().tolist())
-    all_products = sorted(horizon_df["innovation"].dropna().unique().tolist())
+    diseases = ["All products"] + sorted(products["disease"].dropna().unique().tolist())
+
+    # Filter state from the URL (bookmarks and shared links)
+    with reactive.isolate():
+        restored = parse_filter_query(session.clientdata.url_search())
+    if restored.get("disease") not in diseases:
+        restored.pop("disease", None)
 
     @reactive.Effect
     def _update_choices():
         ui.update_select(
             "disease_selector",
             choices=diseases,
-            selected="All products",
+            selected=restored.get("disease", "All products"),
         )
 
     # ---------------------------------------------------------
@@ -450,9 +719,7 @@ def innovation_page_server(input, output, session, cart):
     def count_innovations(diseases_list):
         if isinstance(diseases_list, str):
             diseases_list = [diseases_list]
-        return len(
-            horizon_df[horizon_df["disease"].isin(diseases_list)]["innovation"].unique()
-        )
+        return cube_distinct(cube, disease=list(diseases_list))
 
     @render.ui
     def kpi_databases():
@@ -460,105 +727,158 @@ def innovation_page_server(input, output, session, cart):
 
     @render.ui
     def kpi_products():
-        df = page_df()
+        # Distinct products in the filter state, from the count cube
+        n_products = cube_distinct(cube, **cube_filters(*page_state()))
         return ui.card(
-            kpi_card(df.innovation.nunique(), "Products included", "", "table")
+            kpi_card(n_products, "Products included", "", "table")
         )
 
-    def filtered_innovation_df_for_table(df: pd.DataFrame) -> pd.DataFrame:
-        out = df.copy()
-
-        # Does not show Trial Phase 1
-        out = out[out["trial_status"] != "Phase 1"]
-
-        # Removes empty time stamps or time stamps way too in the past
-        out = out[
-            out["proj_date_lmic_20_uptake"].notna()
-            & (out["proj_date_lmic_20_uptake"] >= pd.Timestamp("2025-01-01"))
-        ]
+    # Explorer rows without filters: no Trial Phase 1, uptake from UPTAKE_FROM on
+    statuses = innovation_df["trial_status"].to_numpy()
+    df0 = innovation_df.iloc[uptake_rows[statuses[uptake_rows] != "Phase 1"]]
+    default_innovation_id = df0["innovation"].iloc[0] if not df0.empty else None
+    selected_innovation = reactive.Value(restored.get("product", default_innovation_id))
+    selected_category = reactive.Value(restored.get("category"))
+    selected_status = reactive.Value(restored.get("status"))
 
-        return out
+    # ---------------------------------------------------------
+    # Keep the URL in sync with the filters
+    # ---------------------------------------------------------
+    url_params = {}
+    pending_disease = {"value": restored.get("disease")}
 
-    df0 = filtered_innovation_df_for_table(innovation_df)
-    default_innovation_id = df0["innovation"].iloc[0] if not df0.empty else None
-    selected_innovation = reactive.Value(default_innovation_id)
-    selected_category = reactive.Value(None)
-    selected_status = reactive.Value(None)
+    @reactive.Effect
+    async def _sync_url():
+        disease = input.disease_selector()
+        # Wait for the restored disease to reach the client before writing
+        if pending_disease["value"]:
+            if disease != pending_disease["value"]:
+                return
+            pending_disease["value"] = None
+        params = {
+            "disease": None if disease == "All products" else disease,
+            "category": selected_category.get(),
+            "status": selected_status.get(),
+            "product": selected_innovation.get(),
+        }
+        if params != url_params:
+            url_params.clear()
+            url_params.update(params)
+            await session.send_custom_message("url_state", {"params": params})
 
     # ---------------------------------------------------------
-    # Layout settle delay
+    # Layout ready (one-shot signal from the client)
     # ---------------------------------------------------------
     @reactive.Effect
-    def _layout_delay():
-        reactive.invalidate_later(0.5)
+    @reactive.event(input.layout_ready)
+    def _layout_ready():
         layout_ready.set(True)
 
-    @reactive.Calc
-    def base_df():
-        # Core data for the page: WHO scope, excluding Phase 1
-        df = innovation_df[innovation_df["trial_status"] != "Phase 1"].copy()
-        return df
-
-    @reactive.Calc
-    def disease_df():
-        df = base_df()
-        disease = input.disease_selector()
-        if disease != "All products":
-            df = df[df["disease"] == disease]
-        return df
+    def filtered_rows(disease=None, category=None, status=None):
+        # Rows of innovation_df for one filter state, from the shared row-id cache
+        # (worker threads only, see utils.cache.cached)
+        return innovation_df.iloc[
+            filtered_positions(innovation_df, data_version, disease, category, status)
+        ]
 
-    @reactive.Calc
-    def category_filtered_df():
-        df = disease_df()
-        status = selected_status.get()
-        if status:
-            df = df[df["trial_status"] == status]
-        return df
+    # Filter state, published once rapid clicks on the charts and the disease
+    # selector have settled; intermediate states are never computed
+    page_state = debounce(
+        lambda: (input.disease_selector(), selected_category.get(), selected_status.get()),
+        FILTER_DEBOUNCE,
+    )
 
+    def page_filters():
+        require_active()
+        return page_state()
 
     @reactive.Calc
-    def status_filtered_df():
-        df = disease_df()
-        category = selected_category.get()
-        if category:
-            df = df[df["category"] == category]
-        return df
+    def search_hits():
+        # BM25 ranking of the free-text search box (None when empty)
+        query = input.text_search().strip()
+        if not query:
+            return None
+        return search_text(text_index.result(), query)
+
+    def explorer_for(filters, hits):
+        return explorer_frames(filtered_rows(*filters), hits, uptake_rows)
+
+    # One computation on the worker pool (see utils/workers.py) per filter
+    # state and search, behind the "datagrid" admission limit
+    explorer = worker_calc(
+        explorer_for,
+        lambda: (page_filters(), search_hits()),
+        output_class="datagrid",
+        name="overview.explorer",
+    )
 
     @reactive.Calc
     def page_df():
-        df = disease_df()
-        category = selected_category.get()
-        status = selected_status.get()
-
-        if category:
-            df = df[df["category"] == category]
-        if status:
-            df = df[df["trial_status"] == status]
-
-        return df
+        return explorer()["page_df"]
 
     @reactive.Calc
     def table_df():
-        # Applies disease, category AND date filters
-        df_f = page_df()
-        df_f = df_f[
-            df_f["proj_date_lmic_20_uptake"].notna()
-            & (df_f["proj_date_lmic_20_uptake"] >= pd.Timestamp("2025-01-01"))
-        ]
-        return df_f
+        # Applies disease, category AND date filters, then the text search
+        return explorer()["table_df"]
+
+    # ---------------------------------------------------------
+    # Trend chart: cumulative projected launches
+    # ---------------------------------------------------------
+    def trend_for(filters, grain):
+        # Shared across sessions per filter state and grain (utils/pipeline.py)
+        pipeline = pipeline_view(filtered_rows(*filters), (data_version, *filters), grain=grain)
+        return grain, pipeline
+
+    # Computed on the worker pool (see utils/workers.py)
+    trend = worker_calc(
+        trend_for, lambda: (page_filters(), input.trend_grain()), name="overview.trend"
+    )
+
+    @render_widget
+    def trend_chart():
+        grain, pipeline = trend()
+        categories = [col for col in pipeline.columns if col != grain]
+        if not categories or not pipeline[categories].to_numpy().any():
+            return go.FigureWidget()
+
+        fig = go.FigureWidget(
+            data=[
+                go.Scatter(
+                    x=pipeline[grain],
+                    y=pipeline[cat],
+                    name=cat,
+                    mode="lines",
+                    stackgroup="pipeline",
+                    line=dict(color=CATEGORY_COLORS.get(cat, "#94a3b8")),
+                    hovertemplate="%{x}<br>" + cat + ": %{y}<extra></extra>",
+                )
+                for cat in categories
+            ]
+        )
+        fig.update_layout(
+            margin=dict(l=0, r=0, t=10, b=0),
+            paper_bgcolor="rgba(0,0,0,0)",
+            yaxis_title="Products (cumulative)",
+            legend=dict(orientation="h", y=-0.2),
+        )
+        return session_resource("overview.trend_chart", fig)
 
     # ---------------------------------------------------------
     # Pie (donut) chart
     # ---------------------------------------------------------
     @render_widget
     def pie_chart():
-        # Ensure reactivity by calling .get() early
-        selected = selected_status.get()
-        df_unique = status_filtered_df()
-
-        stage_counts = df_unique["trial_status"].value_counts().reset_index()
+        require_active()
+        # Ensure reactivity by reading the filter state early
+        disease, category, selected = page_state()
+
+        # Counts from the cube; the chart's own status filter is not applied
+        filters = cube_filters(disease, category)
+        stage_counts = cube_counts(cube, by=("trial_status",), **filters)
+        stage_counts = stage_counts[stage_counts > 0].sort_values(ascending=False, kind="stable")
+        stage_counts = stage_counts.reset_index()
         stage_counts.columns = ["status", "count"]
-        total_innovations = len(df_unique)
+        total_innovations = cube_counts(cube, **filters)
         if total_innovations == 0:
             return go.FigureWidget()
 
@@ -620,44 +940,25 @@ def innovation_page_server(input, output, session, cart):
 
         fig.data[0].on_click(on_click)
 
-        return fig
+        return session_resource("overview.pie_chart", fig)
 
     # ---------------------------------------------------------
     # SINGLE PIPELINE TABLE (DataGrid)
     # ---------------------------------------------------------
+    @reactive.Calc
+    def pipeline_grid():
+        # Display frame of the explorer table
+        return explorer()["pipeline_grid"]
+
     @render.data_frame
     def pipeline_tbl():
         clear_trigger.get()
-        df_f = table_df()
-        if df_f.empty:
+        grid_df = pipeline_grid()
+        if grid_df.empty:
             return None
 
-        # NOTE: keep the same column mapping as your existing code
-        # You used proj_date_first_launch in the table display, but filtered on proj_date_lmic_20_uptake.
         return render.DataGrid(
-            df_f.assign(
-                proj_date_first_launch=lambda d: d[
-                    "proj_date_first_launch"
-                ].dt.strftime("%Y-%m-%d")
-            ).rename(
-                columns={
-                    "innovation": "Product",
-                    "manufacturer": "Manufacturer",
-                    "category": "Category",
-                    "trial_status": "Status",
-                    "proj_date_first_launch": "Projected date of launch",
-                    "disease": "Disease area",
-                }
-            )[
-                [
-                    "Product",
-                    "Manufacturer",
-                    "Disease area",
-                    "Category",
-                    "Status",
-                    "Projected date of launch",
-                ]
-            ],
+            grid_df,
             selection_mode="row",
             width="100%",
             filters=True,
@@ -669,21 +970,16 @@ def innovation_page_server(input, output, session, cart):
         clear_trigger.get()
         df_f = page_df()
 
-        today = pd.Timestamp.today()
-        three_years = today + pd.DateOffset(years=3)
-
-        df_f = df_f.loc[
-            (df_f["proj_date_first_launch"] >= today)
-            & (df_f["proj_date_first_launch"] <= three_years)
-        ].copy()
+        launches = date_range_rows(
+            date_indexes["proj_date_first_launch"], *next_years(LAUNCH_WINDOW_YEARS)
+        )
+        df_f = window_rows(df_f, launches)
 
         if df_f.empty:
             return None
         return render.DataGrid(
             df_f.assign(
-                proj_date_first_launch=lambda d: d[
-                    "proj_date_first_launch"
-                ].dt.strftime("%Y-%m-%d")
+                proj_date_first_launch=lambda d: iso_dates(d["proj_date_first_launch"])
             ).rename(
                 columns={
                     "innovation": "Product",
@@ -725,10 +1021,7 @@ def innovation_page_server(input, output, session, cart):
     def _add_selected_to_cart():
         selected_id = selected_innovation()
         if selected_id:
-            current = cart.get()
-            new_cart = current.copy()
-            new_cart.add(selected_id)
-            cart.set(new_cart)
+            cart_add(cart, product_ids([selected_id], product_names))
             ui.notification_show(f"Added {selected_id} to comparison list", type="message")
 
 
@@ -741,6 +1034,7 @@ def innovation_page_server(input, output, session, cart):
 
     @reactive.Calc
     def detail_row():
+        require_active()
         selected_id = get_selected_id()
         req(selected_id)
         row = innovation_df[innovation_df["innovation"] == selected_id]
@@ -806,14 +1100,14 @@ def innovation_page_server(input, output, session, cart):
             proj_col = event["proj"]
             real_col = event["real"]
 
-            proj_date = row.get(proj_col) if proj_col in row.index else None
+            proj_date = to_timestamp(row.get(proj_col)) if proj_col in row.index else None
             real_date = (
-                row.get(real_col) if real_col and real_col in row.index else None
+                to_timestamp(row.get(real_col)) if real_col and real_col in row.index else None
             )
 
-            if pd.notna(proj_date):
+            if proj_date is not None:
                 event_type = (
-                    "Observed" if real_col and pd.notna(real_date) else "Speedometer Projection"
+                    "Observed" if real_date is not None else "Speedometer Projection"
                 )
 
                 all_events.append(
@@ -936,7 +1230,7 @@ def innovation_page_server(input, output, session, cart):
             )
         )
 
-        return fig
+        return session_resource("overview.timeline_plot", fig)
     # ---------------------------------------------------------
     # IMPACT POTENTIAL BOXES (popovers preserved)
     # ---------------------------------------------------------
@@ -1047,6 +1341,9 @@ def innovation_page_server(input, output, session, cart):
         row = detail_row()
 
         def format_date(d):
+            # Day numbers (utils.dates) or, for the quartiles, date strings
+            if isinstance(d, (int, np.integer)):
+                return iso_date(d) or "Not available"
             if pd.notna(d):
                 return pd.to_datetime(d).strftime("%Y-%m-%d")
             return "Not available"
@@ -1092,9 +1389,7 @@ def innovation_page_server(input, output, session, cart):
     # ---------------------------------------------------------
     @render.ui
     def filter_status_display():
-        disease = input.disease_selector()
-        category = selected_category.get()
-        status = selected_status.get()
+        disease, category, status = page_state()
 
         if disease == "All products" and category is None and status is None:
             return None
@@ -1329,31 +1624,25 @@ def innovation_page_server(input, output, session, cart):
 
     @render_widget
     def treemap_chart():
-        selected = selected_category.get()
-        df_unique = category_filtered_df()
+        require_active()
+        disease, selected, status = page_state()
 
-        type_counts = (
-            df_unique["category"].fillna("Unknown").value_counts().reset_index()
+        # Counts from the cube; the chart's own category filter is not applied
+        type_counts = cube_counts(
+            cube, by=("category",), dropna=False, **cube_filters(disease, status=status)
         )
+        type_counts.index = type_counts.index.fillna("Unknown")
+        type_counts = type_counts.groupby(level=0, sort=False).sum()
+        type_counts = type_counts[type_counts > 0].sort_values(ascending=False, kind="stable")
+        type_counts = type_counts.reset_index()
         type_counts.columns = ["category", "count"]
 
         if type_counts.empty:
             return go.FigureWidget()
 
-        category_colors = {
-            "Diagnostic": "#00539B",    # Accent Blue
-            "Drug": "#012169",          # Primary Blue
-            "Vaccine": "#228B22",       # Success Green
-            "Medical Device": "#8b5cf6",
-            "Vector Control": "#DC143C", # Error Red
-            "Software": "#ec4899",
-            "Other": "#BFBBBB",         # Neutral Gray
-            "Unknown": "#BFBBBB",
-        }
-
         colors = []
         for cat in type_counts["category"]:
-            base_color = category_colors.get(cat, "#94a3b8")
+            base_color = CATEGORY_COLORS.get(cat, "#94a3b8")
             if selected and cat != selected:
                 colors.append("#e5e7eb")
             else:
@@ -1393,7 +1682,7 @@ def innovation_page_server(input, output, session, cart):
 
         fig.data[0].on_click(on_click)
 
-        return fig
+        return session_resource("overview.treemap_chart", fig)
 
     @reactive.Effect
     def _auto_select_on_filter():
@@ -1412,6 +1701,7 @@ def innovation_page_server(input, output, session, cart):
         selected_category.set(None)
         selected_status.set(None)
         selected_innovation.set(None)
+        ui.update_text("text_search", value="")
 
         ui.update_select(
             "disease_selector",
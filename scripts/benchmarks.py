@@ -0,0 +1,320 @@
+"""
+Micro-benchmarks for the data pipeline.
+
+Run from the repository root, e.g.:
+
+    python scripts/benchmarks.py harmonizer --rows 1000000
+    python scripts/benchmarks.py interactions --rows 100000
+    python scripts/benchmarks.py date-windows --rows 1000000
+    python scripts/benchmarks.py cube --rows 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to allow importing utils/scripts
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules.comparison import comparison_outputs
+from modules.overview_and_innovations import filtered_positions, pipeline_grid_frame, table_rows
+from scripts.data_harmonizer import harmonize_data, harmonize_csv_chunked, harmonize_partitioned
+from utils.cube import build_cube, cube_counts, cube_distinct
+from utils.data_loader import get_data
+from utils.dates import NO_DATE, build_date_index, calendar_year, date_range_rows, day, in_range, next_years
+from utils.text_search import build_text_index, search_text
+
+
+def make_raw_scan(rows, seed=0):
+    """
+    Builds a synthetic raw horizon-scan export with the columns `harmonize_data` reads.
+
+    Args:
+        rows (int): Number of rows to generate.
+        seed (int): Seed for the NumPy generator.
+
+    Returns:
+        pd.DataFrame: Raw dataframe in the `www/horizon.csv` layout.
+    """
+    rng = np.random.default_rng(seed)
+    stages = [
+        "Phase I", "Phase II", "Phase III", "Phase 2/3", "Preclinical",
+        "Implementation Ready", "Post-Market Surveillance", "Stockpiled",
+    ]
+    return pd.DataFrame({
+        "Innovation": rng.choice([f"Product {i}" for i in range(2000)], rows),
+        "Disease": rng.choice(["Malaria", "HIV", "Tuberculosis", "MNCH"], rows),
+        "Category": rng.choice(["Vaccines", "Drugs", "Diagnostics", "Devices"], rows),
+        "Stage": rng.choice(stages, rows),
+        "Country": rng.choice(["Kenya", "Senegal", "South Africa", "Ghana"], rows),
+        "Impact Score": rng.uniform(0, 10, rows).round(1),
+        "Cost-effectiveness": rng.uniform(10, 1000, rows).round(0),
+        "Impact Potential": rng.integers(0, 100, rows),
+        "Budget Impact": rng.integers(0, 10_000, rows),
+        "Probability of technical and regulatory success": rng.integers(0, 100, rows),
+        "Financing": rng.integers(0, 100, rows),
+        "Policy readiness": rng.integers(0, 100, rows),
+        "Uptake/Delivery": rng.integers(0, 100, rows),
+        "expected_date_of_market": pd.to_datetime("2024-01-01")
+        + pd.to_timedelta(rng.integers(0, 12 * 365, rows), unit="D"),
+    })
+
+
+def bench_harmonizer(rows, repeat):
+    df = make_raw_scan(rows)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        harmonize_data(df.copy())
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_harmonizer_chunked(rows, repeat, chunksize=100_000):
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path = os.path.join(tmp, "raw.csv")
+        make_raw_scan(rows).to_csv(raw_path, index=False)
+        out_dir = os.path.join(tmp, "out")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            harmonize_csv_chunked(raw_path, out_dir, chunksize=chunksize)
+            timings.append(time.perf_counter() - start)
+
+        # Separate traced run: tracemalloc slows allocation-heavy code a lot
+        tracemalloc.start()
+        harmonize_csv_chunked(raw_path, out_dir, chunksize=chunksize)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  chunksize={chunksize:,} peak={peak / 1e6:.1f} MB")
+    return timings
+
+
+def bench_harmonizer_parallel(rows, repeat, workers=None):
+    df = make_raw_scan(rows)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        harmonize_partitioned(df, partition_by="Disease", workers=workers)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def make_products(rows, seed=0):
+    """
+    Builds a synthetic product table with the free-text columns of `innovation_df`.
+
+    Args:
+        rows (int): Number of products.
+        seed (int): Seed for the NumPy generator.
+
+    Returns:
+        pd.DataFrame: One row per product.
+    """
+    rng = np.random.default_rng(seed)
+    vocab = np.array([
+        "long", "acting", "injectable", "oral", "prep", "malaria", "rapid",
+        "diagnostic", "test", "vaccine", "children", "adult", "pregnant",
+        "women", "severe", "treatment", "prevention", "hiv", "tuberculosis",
+        "monoclonal", "antibody", "combination", "tablet", "dispersible",
+    ] + [f"term{i}" for i in range(5000)])
+
+    def sentences(n_words):
+        words = rng.choice(vocab, (rows, n_words))
+        return [" ".join(w) for w in words]
+
+    return pd.DataFrame({
+        "innovation": [f"Product {i}" for i in range(rows)],
+        "indication": sentences(6),
+        "technology": sentences(3),
+        "manufacturer": rng.choice([f"Maker {i}" for i in range(500)], rows),
+        "target_population": sentences(3),
+        "trial_status_notes": sentences(4),
+    })
+
+
+def bench_text_search(rows, repeat):
+    products = make_products(rows)
+    start = time.perf_counter()
+    index = build_text_index(products)
+    print(f"  build={time.perf_counter() - start:.2f}s terms={len(index['postings']):,}")
+
+    queries = ["long-acting injectable PrEP", "rapid diagnostic malaria", "severe malaria children"]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for query in queries:
+            search_text(index, query, limit=50)
+        timings.append((time.perf_counter() - start) / len(queries))
+    return timings
+
+
+def make_innovation_rows(rows):
+    """
+    Repeats the WHO-scope product rows of the real data up to `rows` rows.
+
+    Args:
+        rows (int): Number of rows.
+
+    Returns:
+        pd.DataFrame: Rows with the columns of `innovation_df`.
+    """
+    innovation_df = get_data()["innovation_df"]
+    positions = np.resize(np.arange(len(innovation_df)), rows)
+    return innovation_df.iloc[positions].reset_index(drop=True)
+
+
+def _interactions(df):
+    # One pass of the per-interaction frame work (caches bypassed by fresh versions)
+    version = object()
+    rows = df.iloc[filtered_positions(df, version, "Malaria")]
+    table = pipeline_grid_frame(table_rows(rows))
+    base = df[df["trial_status"] != "Phase 1"]
+    names = df["innovation"].drop_duplicates().head(10).tolist()
+    comparison_outputs(df, names, version)
+    return table, base
+
+
+def bench_interactions(rows, repeat):
+    df = make_innovation_rows(rows)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _interactions(df)
+        timings.append(time.perf_counter() - start)
+
+    # Allocations per interaction pass, with and without copy-on-write
+    for cow in (False, True):
+        with pd.option_context("mode.copy_on_write", cow):
+            tracemalloc.start()
+            _interactions(df)
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        print(f"  copy_on_write={cow} retained={current / 1e6:.1f} MB peak={peak / 1e6:.1f} MB")
+    return timings
+
+
+def bench_date_windows(rows, repeat, queries=20):
+    rng = np.random.default_rng(0)
+    days = rng.integers(day("2015-01-01"), day("2045-12-31"), rows).astype(np.int32)
+    days[rng.random(rows) < 0.2] = NO_DATE
+
+    start = time.perf_counter()
+    index = build_date_index(days)
+    print(f"  index build={time.perf_counter() - start:.3f}s")
+
+    # Full scan vs searchsorted, per window (k = matching rows)
+    windows = {
+        "March 2030": (day("2030-03-01"), day("2030-03-31")),
+        "calendar year 2030": calendar_year(2030),
+        "next 3 years": next_years(3),
+    }
+    for name, (lo, hi) in windows.items():
+        start = time.perf_counter()
+        for _ in range(queries):
+            np.flatnonzero(in_range(days, lo, hi))
+        scan = (time.perf_counter() - start) / queries
+        start = time.perf_counter()
+        for _ in range(queries):
+            found = date_range_rows(index, lo, hi)
+        indexed = (time.perf_counter() - start) / queries
+        print(f"  {name}: k={len(found):,} scan={scan * 1e3:.2f} ms index={indexed * 1e3:.2f} ms")
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for lo, hi in windows.values():
+            date_range_rows(index, lo, hi)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def make_long_rows(rows, seed=0):
+    """
+    Builds synthetic long-format rows (one per product and scope) with the cube dimensions.
+
+    Args:
+        rows (int): Number of rows.
+        seed (int): Seed for the NumPy generator.
+
+    Returns:
+        pd.DataFrame: Rows with the columns of `utils.cube.CUBE_DIMENSIONS` and "innovation".
+    """
+    rng = np.random.default_rng(seed)
+    statuses = ["Preclinical", "Phase 1", "Phase 2", "Phase 3", "Phase 4", "Unknown", None]
+    return pd.DataFrame({
+        "innovation": rng.choice([f"Product {i}" for i in range(max(rows // 20, 1))], rows),
+        "disease": rng.choice(["HIV", "Malaria", "Tuberculosis", "MNCH"], rows),
+        "category": rng.choice(["Drug", "Vaccine", "Diagnostic", "Device", "Vector control"], rows),
+        "trial_status": rng.choice(statuses, rows),
+        "scope": rng.choice(["WHO"] + [f"Country {i}" for i in range(30)], rows),
+        "market_year": rng.choice(np.r_[np.arange(2020, 2051, dtype=float), np.nan], rows),
+    })
+
+
+def bench_cube(rows, repeat):
+    df = make_long_rows(rows)
+    start = time.perf_counter()
+    cube = build_cube(df)
+    print(f"  build={time.perf_counter() - start:.3f}s cells={cube['counts'].size:,} pairs={len(cube['pair_cells']):,}")
+
+    # Overview aggregates for one filter state: from rows vs from the cube
+    filters = {"scope": "WHO", "disease": "Malaria", "exclude": {"trial_status": "Phase 1"}}
+
+    def from_rows():
+        page = df[(df["scope"] == "WHO") & (df["disease"] == "Malaria") & (df["trial_status"] != "Phase 1")]
+        page["trial_status"].value_counts()
+        page["category"].fillna("Unknown").value_counts()
+        page["innovation"].nunique()
+        df.groupby(["market_year", "category"]).size().unstack(fill_value=0)
+
+    def from_cube():
+        cube_counts(cube, by=("trial_status",), **filters)
+        cube_counts(cube, by=("category",), dropna=False, **filters)
+        cube_distinct(cube, **filters)
+        cube_counts(cube, by=("market_year", "category")).unstack(fill_value=0)
+
+    start = time.perf_counter()
+    from_rows()
+    print(f"  from rows={(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        from_cube()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+SUITES = {
+    "cube": bench_cube,
+    "date-windows": bench_date_windows,
+    "harmonizer": bench_harmonizer,
+    "harmonizer-chunked": bench_harmonizer_chunked,
+    "harmonizer-parallel": bench_harmonizer_parallel,
+    "interactions": bench_interactions,
+    "text-search": bench_text_search,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("suite", choices=sorted(SUITES))
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    timings = SUITES[args.suite](args.rows, args.repeat)
+    print(
+        f"{args.suite}: rows={args.rows:,} best={min(timings):.3f}s "
+        f"mean={sum(timings) / len(timings):.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
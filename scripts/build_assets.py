@@ -0,0 +1,401 @@
+"""
+Builds the static content served from `www/` and records it in the asset manifest.
+
+    - "about.html": the `<main>` content of the Quarto-rendered
+      `docs/content/about.html`, with unrendered R artifacts fixed and the
+      markup minified. The About tab loads it by URL (`www/lazy_content.js`),
+      so it is not embedded in the page sent to every session.
+    - "fontawesome.css" / "fonts.css": Font Awesome and the Inter fonts,
+      downloaded from `VENDOR_SOURCES` into `www/vendor/`. Only the icons
+      used by the app are kept (and, if fontTools is installed, only their
+      glyphs), and only the `FONT_SUBSETS` unicode ranges of the fonts.
+
+Every output file is named after a hash of its contents
+(`www/content/about.<hash>.html`) and served with an immutable
+`Cache-Control` by `utils.static_assets.immutable_cache`; the manifest maps
+the logical name to the current file.
+
+Run from the repository root after re-rendering the Quarto documentation or
+using a new icon (the vendor step needs network access; the deployed app
+does not):
+
+    python scripts/build_assets.py
+    python scripts/build_assets.py --only about
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import re
+import sys
+import urllib.request
+
+# Add parent directory to path to allow importing utils/scripts
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.config import ASSET_MANIFEST_PATH, VENDOR_SOURCES
+from utils.static_assets import FINGERPRINTED, content_hash
+
+ABOUT_SOURCE = "docs/content/about.html"
+CONTENT_DIR = "www/content"
+VENDOR_DIR = "www/vendor"
+
+# Files scanned for the Font Awesome icons the app uses
+ICON_SOURCES = ["app.py", "modules", "utils", "www"]
+ICON_CLASS = re.compile(r"\bfa-([a-z0-9]+(?:-[a-z0-9]+)*)")
+
+# Font Awesome faces kept (regular and the v4 compatibility faces are unused)
+FA_FACES = ("fa-solid-900", "fa-brands-400")
+
+# Google Fonts unicode-range subsets kept
+FONT_SUBSETS = ("latin",)
+
+# Google Fonts only serves woff2 to browsers it recognizes
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+
+MAIN_START = '<main class="content" id="quarto-document-content">'
+MAIN_END = "</main>"
+
+# Unrendered inline R in the Quarto source, and its replacement
+R_ARTIFACTS = {
+    "<code>r params$last_updated</code>": "2026-03-27",
+    "`r params$last_updated`": "2026-03-27",
+}
+
+# Blocks whose whitespace is significant
+PRESERVE = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2>)", re.S | re.I)
+COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.S)
+WHITESPACE = re.compile(r"\s+")
+BLOCK_GAP = re.compile(
+    r">\s+<(?=/?(?:main|div|section|header|footer|nav|p|h[1-6]|ul|ol|li|dl|dt|dd|"
+    r"table|thead|tbody|tfoot|tr|td|th|hr|br|figure|figcaption|blockquote)\b)",
+    re.I,
+)
+
+
+def extract_main(html: str) -> str:
+    """
+    The Quarto document content, without the page around it.
+
+    Args:
+        html (str): Full Quarto-rendered page.
+
+    Returns:
+        str: The `<main>` element (or the whole input if it has none), with
+             `R_ARTIFACTS` replaced.
+    """
+    start = html.find(MAIN_START)
+    end = html.find(MAIN_END, start)
+    if start != -1 and end != -1:
+        html = html[start : end + len(MAIN_END)]
+    for artifact, value in R_ARTIFACTS.items():
+        html = html.replace(artifact, value)
+    return html
+
+
+def minify_html(html: str) -> str:
+    """
+    Removes comments and collapses whitespace outside `<pre>`/`<script>` blocks.
+
+    Whitespace between inline elements is kept as a single space, so text
+    such as "<strong>A</strong> <a>B</a>" renders the same.
+
+    Args:
+        html (str): HTML fragment.
+
+    Returns:
+        str: Minified HTML.
+    """
+    parts = PRESERVE.split(html)
+    out = []
+    # re.split with two groups yields: text, block, tag name, text, ...
+    for i in range(0, len(parts), 3):
+        text = COMMENT.sub("", parts[i])
+        text = BLOCK_GAP.sub("><", WHITESPACE.sub(" ", text))
+        # Gaps next to a preserved block element (textarea is inline)
+        if i > 0 and parts[i - 1].lower() != "textarea":
+            text = re.sub(r"^ (?=<)", "", text)
+        if i + 1 < len(parts) and parts[i + 2].lower() != "textarea":
+            text = re.sub(r"(?<=>) $", "", text)
+        out.append(text)
+        if i + 1 < len(parts):
+            out.append(parts[i + 1])
+    return "".join(out).strip()
+
+
+def write_fingerprinted(data: bytes, name: str, out_dir: str) -> str:
+    """
+    Writes `data` as `<stem>.<hash><ext>` and removes older builds of it.
+
+    Args:
+        data (bytes): File contents.
+        name (str): Logical file name, e.g. "about.html".
+        out_dir (str): Output directory under `www/`.
+
+    Returns:
+        str: Path of the written file.
+    """
+    stem, ext = os.path.splitext(name)
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{stem}.{content_hash(data)}{ext}")
+    for old in glob.glob(os.path.join(out_dir, f"{stem}.*{ext}")):
+        if old != path and FINGERPRINTED.search(old):
+            os.remove(old)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def build_about(source: str = ABOUT_SOURCE, out_dir: str = CONTENT_DIR) -> str:
+    """
+    Builds the About page fragment.
+
+    Args:
+        source (str): Quarto-rendered about page.
+        out_dir (str): Output directory.
+
+    Returns:
+        str: Path of the fingerprinted fragment.
+    """
+    with open(source, "r", encoding="utf-8") as f:
+        html = f.read()
+    return write_fingerprinted(minify_html(extract_main(html)).encode("utf-8"), "about.html", out_dir)
+
+
+# --- Vendored front-end assets ---
+
+def fetch(url: str) -> bytes:
+    """Downloads `url` (with a browser user agent)."""
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+def used_icons(sources=ICON_SOURCES) -> set:
+    """
+    Font Awesome icon names referenced by the app's code and static files.
+
+    Args:
+        sources (list): Files or directories to scan (.py, .js, .css, .html).
+
+    Returns:
+        set: Names without the "fa-" prefix (also includes style classes
+             such as "solid", which are harmless).
+    """
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs[:] = [d for d in dirs if d not in ("vendor", "content", "__pycache__")]
+                paths.extend(os.path.join(root, f) for f in files)
+        else:
+            paths.append(source)
+
+    icons = set()
+    for path in paths:
+        if path.endswith((".py", ".js", ".css", ".html")):
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                icons.update(ICON_CLASS.findall(f.read()))
+    return icons
+
+
+def css_blocks(css: str) -> list:
+    """
+    Splits a stylesheet into top-level blocks (rules and @-rules, nesting kept).
+
+    Args:
+        css (str): Stylesheet text.
+
+    Returns:
+        list: (prelude, full block text) tuples; comments before a block are
+              part of its prelude.
+    """
+    blocks, depth, start = [], 0, 0
+    i = 0
+    while i < len(css):
+        c = css[i]
+        if c == '"' or c == "'":
+            i = css.index(c, i + 1)
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                text = css[start : i + 1]
+                blocks.append((text[: text.index("{")].strip(), text.strip()))
+                start = i + 1
+        i += 1
+    return blocks
+
+
+def subset_fontawesome(css: str, icons: set):
+    """
+    Keeps the Font Awesome rules needed for `icons`.
+
+    Key Logic:
+        1.  Icon rules (those setting `content` or `--fa`) keep only the
+            selectors of used icons, and are dropped if none is left.
+        2.  `@font-face` rules are kept for the `FA_FACES` files only.
+        3.  Everything else (base classes, sizes, animations) is kept.
+
+    Args:
+        css (str): `all.min.css`.
+        icons (set): Output of `used_icons`.
+
+    Returns:
+        tuple: (subset CSS, set of code points of the kept icons).
+    """
+    out = []
+    codepoints = set()
+    for prelude, block in css_blocks(css):
+        if prelude.startswith("@font-face"):
+            font_file = re.search(r"webfonts/([\w-]+)\.woff2", block)
+            if font_file and font_file.group(1) in FA_FACES:
+                out.append(block)
+            continue
+
+        body = block[block.index("{") + 1 : -1]
+        value = re.search(r"(?:content|--fa)\s*:\s*\"\\?([0-9a-fA-F]+)\"", body)
+        if value is None or prelude.startswith("@"):
+            out.append(block)
+            continue
+
+        selectors = [
+            sel for sel in prelude.split(",")
+            if (m := re.fullmatch(r"\.fa-([a-z0-9-]+)(?::(?:before|after))?", sel.strip()))
+            and m.group(1) in icons
+        ]
+        if selectors:
+            out.append(",".join(selectors) + "{" + body + "}")
+            codepoints.add(int(value.group(1), 16))
+    return "".join(out), codepoints
+
+
+def subset_font(data: bytes, codepoints: set) -> bytes:
+    """
+    Reduces a woff2 font to `codepoints` if fontTools is installed.
+
+    Args:
+        data (bytes): woff2 font.
+        codepoints (set): Unicode code points to keep.
+
+    Returns:
+        bytes: The subset font, or `data` unchanged without fontTools.
+    """
+    try:
+        from fontTools import subset
+        from fontTools.ttLib import TTFont
+    except ImportError:
+        return data
+
+    font = TTFont(io.BytesIO(data))
+    options = subset.Options()
+    options.flavor = "woff2"
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    out = io.BytesIO()
+    font.save(out)
+    return out.getvalue()
+
+
+def vendor_fontawesome(url: str = VENDOR_SOURCES["fontawesome.css"], out_dir: str = VENDOR_DIR) -> str:
+    """
+    Downloads Font Awesome, keeps the used icons and fingerprints the files.
+
+    Args:
+        url (str): `all.min.css` of the pinned release.
+        out_dir (str): Output directory.
+
+    Returns:
+        str: Path of the fingerprinted stylesheet.
+    """
+    css, codepoints = subset_fontawesome(fetch(url).decode("utf-8"), used_icons())
+    base = url.rsplit("/css/", 1)[0]
+
+    def local_font(match):
+        name, ext = match.group(1), match.group(2)
+        if ext != "woff2":
+            return ""
+        data = subset_font(fetch(f"{base}/webfonts/{name}.woff2"), codepoints)
+        return f"url({os.path.basename(write_fingerprinted(data, name + '.woff2', out_dir))}) format(\"woff2\")"
+
+    # Point the faces at the local woff2 files (older formats are dropped)
+    css = re.sub(r"url\(\.\./webfonts/([\w-]+)\.(\w+)\)\s*format\(\"[\w-]+\"\),?", local_font, css)
+    css = re.sub(r",\s*(?=[;}])", "", css)
+    return write_fingerprinted(css.encode("utf-8"), "fontawesome.css", out_dir)
+
+
+def vendor_google_fonts(url: str = VENDOR_SOURCES["fonts.css"], out_dir: str = VENDOR_DIR) -> str:
+    """
+    Downloads the Google Fonts stylesheet and its `FONT_SUBSETS` font files.
+
+    Args:
+        url (str): css2 API URL.
+        out_dir (str): Output directory.
+
+    Returns:
+        str: Path of the fingerprinted stylesheet.
+    """
+    css = fetch(url).decode("utf-8")
+    out = []
+    for match in re.finditer(r"/\*\s*([\w-]+)\s*\*/\s*(@font-face\s*\{.*?\})", css, re.S):
+        subset_name, block = match.groups()
+        if subset_name not in FONT_SUBSETS:
+            continue
+        family = re.search(r"font-family:\s*'([^']+)'", block).group(1)
+        weight = re.search(r"font-weight:\s*(\d+)", block).group(1)
+        font_url = re.search(r"url\((https://[^)]+)\)", block).group(1)
+        name = f"{family.lower().replace(' ', '-')}-{weight}-{subset_name}.woff2"
+        local = os.path.basename(write_fingerprinted(fetch(font_url), name, out_dir))
+        out.append(block.replace(font_url, local))
+    return write_fingerprinted("\n".join(out).encode("utf-8"), "fonts.css", out_dir)
+
+
+def update_manifest(entries: dict, path: str = ASSET_MANIFEST_PATH):
+    """
+    Merges built files into the asset manifest.
+
+    Args:
+        entries (dict): Logical name -> file path under `www/`.
+        path (str): Manifest file.
+    """
+    manifest = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    www = os.path.dirname(path)
+    for name, file_path in entries.items():
+        manifest[name] = os.path.relpath(file_path, www).replace(os.sep, "/")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(manifest.items())), f, indent=2)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build fingerprinted static assets.")
+    parser.add_argument("--about", default=ABOUT_SOURCE, help="Quarto-rendered about page")
+    parser.add_argument("--manifest", default=ASSET_MANIFEST_PATH, help="Asset manifest to update")
+    parser.add_argument("--only", choices=["about", "vendor"], help="Build one step only")
+    args = parser.parse_args()
+
+    built = {}
+    if args.only in (None, "about"):
+        built["about.html"] = build_about(args.about)
+        print(f"about.html: {os.path.getsize(args.about)} -> {os.path.getsize(built['about.html'])} bytes")
+
+    if args.only in (None, "vendor"):
+        for name, vendor in [("fontawesome.css", vendor_fontawesome), ("fonts.css", vendor_google_fonts)]:
+            try:
+                built[name] = vendor()
+            except OSError as e:
+                print(f"Warning: Could not vendor {name} from {VENDOR_SOURCES[name]}: {e}")
+
+    update_manifest(built, args.manifest)
+    for name, path in built.items():
+        print(f"{name} -> {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Builds the product alias table read by `utils.data_loader.load_data`.
+
+Every name the dashboard may receive for a product (its `innovation` name,
+its `alternative_names` and the spellings used by the EML lists) is indexed
+with `utils.trigram_index`. The table maps each alias to the canonical
+display name:
+
+    - "display_name": over-long innovation names with a single short
+      alternative name are displayed under that name (e.g. the Dual
+      Prevention Pill).
+    - "linked": names from an incoming file (`--link`) fuzzy-matched to an
+      existing product.
+
+Run from the repository root after each data refresh:
+
+    python scripts/build_product_aliases.py
+    python scripts/build_product_aliases.py --link new_export.csv --column product_name
+"""
+import argparse
+import os
+import re
+import sys
+
+import pandas as pd
+
+# Add parent directory to path to allow importing utils/scripts
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts.eml_matching import EML_PATH, _product_keys, component_key, load_eml
+from utils.config import ALIAS_PATH, DATA_PATH
+from utils.trigram_index import build_trigram_index, trigram_link
+
+# Innovation names longer than this are replaced by their alternative name, if it is unique
+DISPLAY_NAME_MAX_LEN = 100
+
+# Minimum trigram similarity for an incoming name to be linked to a product
+LINK_CUTOFF = 0.7
+
+ALIAS_SPLIT = re.compile(r"\s*[;,]\s*")
+
+
+def _alternative_names(value):
+    """Splits an `alternative_names` cell into individual names."""
+    if not isinstance(value, str):
+        return []
+    return [n for n in ALIAS_SPLIT.split(value) if n.strip()]
+
+
+def product_name_index(products, eml_df=None):
+    """
+    Trigram index over every known name of every product.
+
+    Args:
+        products (pd.DataFrame): One row per product with `innovation` and
+                                 optionally `alternative_names`.
+        eml_df (pd.DataFrame, optional): Output of `scripts.eml_matching.load_eml`;
+                                         EML names whose components match a
+                                         product are indexed under that product.
+
+    Returns:
+        dict: Output of `build_trigram_index` with product names as keys.
+    """
+    texts, keys, sources = [], [], []
+    alt = products["alternative_names"] if "alternative_names" in products.columns else None
+
+    for i, innovation in enumerate(products["innovation"]):
+        texts.append(innovation)
+        keys.append(innovation)
+        sources.append("innovation")
+        for name in _alternative_names(alt.iloc[i] if alt is not None else None):
+            texts.append(name)
+            keys.append(innovation)
+            sources.append("alternative_name")
+
+    if eml_df is not None:
+        by_key = {}
+        for i, innovation in enumerate(products["innovation"]):
+            for key in _product_keys(innovation, alt.iloc[i] if alt is not None else None):
+                by_key.setdefault(key, innovation)
+        for name in eml_df["name"].drop_duplicates():
+            innovation = by_key.get(component_key(name))
+            if innovation is not None:
+                texts.append(name)
+                keys.append(innovation)
+                sources.append("eml")
+
+    return build_trigram_index(texts, keys, sources)
+
+
+def display_aliases(products, max_len=DISPLAY_NAME_MAX_LEN):
+    """
+    Short display names for over-long innovation names.
+
+    Args:
+        products (pd.DataFrame): One row per product.
+        max_len (int): Names longer than this are shortened.
+
+    Returns:
+        pd.DataFrame: Columns ['alias', 'innovation', 'score', 'source'].
+    """
+    rows = []
+    if "alternative_names" not in products.columns:
+        return pd.DataFrame(columns=["alias", "innovation", "score", "source"])
+    for innovation, alternative_names in products[["innovation", "alternative_names"]].itertuples(index=False):
+        names = _alternative_names(alternative_names)
+        if len(innovation) > max_len and len(names) == 1:
+            rows.append((innovation, names[0], 1.0, "display_name"))
+    return pd.DataFrame(rows, columns=["alias", "innovation", "score", "source"])
+
+
+def linked_aliases(index, names, cutoff=LINK_CUTOFF):
+    """
+    Links incoming names to existing products in one batch.
+
+    Args:
+        index (dict): Output of `product_name_index`.
+        names (list): Incoming product names.
+        cutoff (float): Minimum trigram similarity.
+
+    Returns:
+        pd.DataFrame: Columns ['alias', 'innovation', 'score', 'source'] for
+                      the names that matched a product under a different name.
+    """
+    names = pd.Series(names, dtype=object).dropna().drop_duplicates()
+    links = trigram_link(index, names.tolist(), cutoff=cutoff)
+    links = links[links["key"].notna() & (links["query"] != links["key"])]
+    return pd.DataFrame({
+        "alias": links["query"],
+        "innovation": links["key"],
+        "score": links["score"].round(3),
+        "source": "linked",
+    }).reset_index(drop=True)
+
+
+def resolve_chains(aliases):
+    """
+    Points every alias at its final name (A -> B -> C becomes A -> C).
+
+    Args:
+        aliases (pd.DataFrame): Alias table.
+
+    Returns:
+        pd.DataFrame: Alias table without chains, self-mappings or duplicate aliases.
+    """
+    aliases = aliases.drop_duplicates("alias", keep="first")
+    mapping = dict(zip(aliases["alias"], aliases["innovation"]))
+
+    def final(name):
+        seen = {name}
+        while name in mapping and mapping[name] not in seen:
+            name = mapping[name]
+            seen.add(name)
+        return name
+
+    aliases = aliases.assign(innovation=aliases["innovation"].map(final))
+    return aliases[aliases["alias"] != aliases["innovation"]].reset_index(drop=True)
+
+
+def build_aliases(horizon_df, eml_df=None, incoming=None):
+    """
+    Builds the full alias table.
+
+    Args:
+        horizon_df (pd.DataFrame): Horizon data (long or wide format).
+        eml_df (pd.DataFrame, optional): EML entries for linking EML spellings.
+        incoming (list, optional): Names from a new export to link.
+
+    Returns:
+        pd.DataFrame: Columns ['alias', 'innovation', 'score', 'source'].
+    """
+    cols = [c for c in ["innovation", "alternative_names"] if c in horizon_df.columns]
+    products = horizon_df[cols].drop_duplicates("innovation").reset_index(drop=True)
+
+    aliases = [display_aliases(products)]
+    if incoming is not None:
+        index = product_name_index(products, eml_df)
+        aliases.append(linked_aliases(index, incoming))
+    return resolve_chains(pd.concat(aliases, ignore_index=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the product alias table.")
+    parser.add_argument("--input", default=DATA_PATH, help="Horizon CSV")
+    parser.add_argument("--eml", default=EML_PATH, help="Harmonized EML CSV")
+    parser.add_argument("--link", help="CSV of incoming product names to link to existing products")
+    parser.add_argument("--column", default="innovation", help="Name column of the --link file")
+    parser.add_argument("--out", default=ALIAS_PATH, help="Alias table to write")
+    args = parser.parse_args()
+
+    horizon_df = pd.read_csv(args.input, encoding="utf-8-sig")
+    eml_df = load_eml(args.eml) if os.path.exists(args.eml) else None
+
+    incoming = None
+    if args.link:
+        incoming = pd.read_csv(args.link, encoding="utf-8-sig")[args.column].tolist()
+
+    aliases = build_aliases(horizon_df, eml_df, incoming)
+    aliases.to_csv(args.out, index=False)
+    print(aliases.groupby("source").size().to_string())
+    print(f"Wrote {len(aliases)} aliases to {args.out}")
+
+    if incoming is not None:
+        resolved = set(aliases["alias"]) | set(horizon_df["innovation"].dropna())
+        unmatched = sorted({n for n in incoming if isinstance(n, str)} - resolved)
+        if unmatched:
+            print(f"{len(unmatched)} incoming names did not match any product, e.g. {unmatched[:5]}")
+
+
+if __name__ == "__main__":
+    main()
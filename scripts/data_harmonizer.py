@@ -1,59 +1,270 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
 import pandas as pd
 import numpy as np
-import random
 
-def harmonize_data(df, disease_name="Malaria"):
+# Add parent directory to path to allow importing utils when run as a script
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.config import PIPELINE_START_YEAR
+from utils.pipeline import cumulate
+
+# Lat/Lon Mapping (Default set)
+COUNTRY_COORDS = {
+    "Kenya": {"lat": -0.02, "lon": 37.9},
+    "Senegal": {"lat": 14.5, "lon": -14.4},
+    "South Africa": {"lat": -30.6, "lon": 22.9},
+    "Overall": {"lat": 0.0, "lon": 0.0},
+    "Brazil": {"lat": -10.8, "lon": -52.9},
+    "India": {"lat": 21.0, "lon": 78.0},
+    "Nigeria": {"lat": 9.1, "lon": 8.7},
+    "Tanzania": {"lat": -6.4, "lon": 35.0},
+    "Ghana": {"lat": 7.9, "lon": -1.0}
+}
+
+# "Ready" means the stage mentions Phase 2/3 or Market/Ready/Stockpiled
+READY_PATTERN = r"phase 2|phase ii|phase 3|phase iii|market|ready|stockpiled"
+
+# Stage -> implementation status. Patterns are plain substrings, so "phase i"
+# also matches "phase ii"/"phase iii" exactly like the original per-row lookup.
+PLANNED_PATTERN = r"phase 1|phase 2|phase i"
+IN_PROGRESS_PATTERN = r"phase 3|phase iii"
+
+# Inverse of success probabilities
+RISK_COLS = {
+    "Probability of technical and regulatory success": "technical_risk",
+    "Demand forecasting and generation": "market_risk",
+    "Regulatory approvals": "regulatory_risk",
+    "Financing": "financial_risk"
+}
+
+# Counter-based generator constants (SplitMix64)
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+# Standardize basic column names if they exist
+# This mapping is specific to the "Horizon" dataset structure but can be expanded
+COLUMN_MAPPING = {
+    "time_to_regulatory_approval": "Time_to_Approval",
+    "time_to_market": "Time_to_Market",
+    "Impact Score": "Impact Score",
+    "Cost-effectiveness": "Cost-effectiveness",
+    "Readiness": "Readiness",
+    "Stage": "Stage",
+    "Category": "Category",
+    "Country": "Country",
+    "LeadOrg": "LeadOrg",
+    "Disease": "Disease",
+    "TargetPop": "TargetPop",
+    "Impact Potential": "Impact Potential",
+    "Introduction Readiness": "Introduction Readiness"
+}
+
+# Ensure numeric columns are actually numeric in the horizon output
+NUMERIC_COLS = ["Impact Score", "Impact Potential", "Introduction Readiness", "Cost-effectiveness", "Readiness", "Time_to_Approval", "Time_to_Market"]
+
+IMPACT_COLS = {"Impact Score": "impact", "Cost-effectiveness": "cost_eff"}
+
+COUNTRY_READINESS_COLS = {
+    "Policy readiness": "policy_readiness",
+    "Potential supply chain": "infra_readiness",
+    "Uptake/Delivery": "uptake_potential",
+}
+
+# Outputs with one row per input row; written incrementally in chunked mode
+ROW_OUTPUTS = ["horizon", "usage_all", "ce_all", "pop_impact_all"]
+
+# Number of draws per ID for each offset field, in counter order
+OFFSET_FIELDS = {
+    "impact": 6,
+    "impact_passed": 6,
+    "intro_delta": 11,
+    "intro_passed_delta": 11,
+}
+
+
+def _stage_codes(stage):
     """
-    Harmonizes innovation data from a raw dataframe.
-    
+    Encodes a stage column as categorical codes plus lowercased labels.
+
+    Labels are stringified the same way as `str(stage).lower()`, so missing
+    values get their own code and never match a keyword.
+
     Args:
-        df (pd.DataFrame): The raw input dataframe containing innovation data.
-        disease_name (str): The name of the disease to filter or label the data with.
-        
+        stage (pd.Series): Raw stage column.
+
     Returns:
-        dict: A dictionary containing processed dataframes (pipeline, readiness, horizon, etc.)
-              ready for use in the dashboard.
+        tuple: (codes, labels) where `codes` is an int array indexing into
+               the lowercased `labels` Series.
+    """
+    codes, uniques = pd.factorize(stage, use_na_sentinel=False)
+    labels = pd.Series([str(u).lower() for u in uniques], dtype="object")
+    return codes, labels
+
+
+def _classify_stage(stage):
+    """
+    Vectorized readiness flag and implementation status for a stage column.
+
+    The regex classification runs once per distinct stage label and is then
+    broadcast to the rows through the categorical codes.
+
+    Args:
+        stage (pd.Series): Raw stage column.
+
+    Returns:
+        tuple: (is_ready, impl_status) as pd.Series aligned with `stage`.
+    """
+    codes, labels = _stage_codes(stage)
+
+    ready = labels.str.contains(READY_PATTERN, regex=True).to_numpy()
+    impl = np.select(
+        [
+            labels.str.contains(PLANNED_PATTERN, regex=True).to_numpy(),
+            labels.str.contains(IN_PROGRESS_PATTERN, regex=True).to_numpy(),
+        ],
+        ["planned", "in_progress"],
+        default="completed",
+    )
+
+    is_ready = pd.Series(ready[codes], index=stage.index)
+    impl_status = pd.Series(impl[codes], index=stage.index)
+    return is_ready, impl_status
+
+
+def _stable_hash(values):
+    """
+    Hashes string IDs to uint64 keys that are identical across processes.
+
+    Unlike the builtin `hash`, pandas' SipHash uses a fixed key and is not
+    affected by PYTHONHASHSEED.
+    """
+    return pd.util.hash_pandas_object(
+        pd.Series(values, dtype="object"), index=False
+    ).to_numpy(dtype=np.uint64)
+
+
+def _counter_uniform(keys, start, count):
+    """
+    Draws uniform [0, 1) floats from a counter-based SplitMix64 stream.
+
+    Each value is a pure function of (key, counter), so results do not depend
+    on row order, batch size or which process computes them.
+
+    Args:
+        keys (np.ndarray): uint64 keys, one per ID.
+        start (int): First counter value.
+        count (int): Number of draws per key.
+
+    Returns:
+        np.ndarray: Array of shape (len(keys), count).
+    """
+    counters = np.arange(start + 1, start + count + 1, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        z = keys[:, None] + counters[None, :] * _GOLDEN_GAMMA
+        z = (z ^ (z >> np.uint64(30))) * _MIX_1
+        z = (z ^ (z >> np.uint64(27))) * _MIX_2
+        z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+def _offset_draws(ids):
+    """
+    Computes the offset values for each ID as NumPy arrays.
+
+    Args:
+        ids (array-like): Unique innovation IDs.
+
+    Returns:
+        dict: One (len(ids), count) array per field in `OFFSET_FIELDS`.
+    """
+    keys = _stable_hash(ids)
+    draws = {}
+    start = 0
+    for field, count in OFFSET_FIELDS.items():
+        draws[field] = _counter_uniform(keys, start, count)
+        start += count
+
+    return {
+        "impact": (np.floor(draws["impact"] * 41) - 20).astype(np.int8),
+        "impact_passed": draws["impact_passed"] < 0.5,
+        "intro_delta": (np.floor(draws["intro_delta"] * 21) - 10).astype(np.int8),
+        "intro_passed_delta": draws["intro_passed_delta"] < 0.5,
+    }
+
+
+def _id_offsets(ids, draws=None):
+    """
+    Generates reproducible random offsets for each ID.
+
+    Args:
+        ids (array-like): Unique innovation IDs.
+        draws (dict, optional): Precomputed `_offset_draws(ids)`.
+
+    Returns:
+        dict: {id: {"impact": [...], "impact_passed": [...],
+               "intro_delta": [...], "intro_passed_delta": [...]}}
+    """
+    ids = list(ids)
+    if not ids:
+        return {}
+
+    if draws is None:
+        draws = _offset_draws(ids)
+    fields = [draws[field].tolist() for field in OFFSET_FIELDS]
+
+    return {
+        pid: {
+            "impact": a,
+            "impact_passed": b,
+            "intro_delta": c,
+            "intro_passed_delta": d,
+        }
+        for pid, a, b, c, d in zip(ids, *fields)
+    }
+
+
+def _prepare(df, start=0, sort=True):
+    """
+    Renames, types, IDs and filters a raw frame (or one chunk of it).
+
+    Args:
+        df (pd.DataFrame): Raw rows.
+        start (int): Number of raw rows already seen; IDs continue from here.
+        sort (bool): Sort by Innovation/Country first. Chunked mode leaves
+                     rows in file order since it cannot sort globally.
+
+    Returns:
+        pd.DataFrame: Cleaned rows with `id`, `Category` and `market_year`.
     """
-    
+    # --- Column Mapping & Cleaning ---
+    # Apply renaming only for columns that exist (this also gives us our own
+    # frame, so the caller's dataframe is never mutated)
+    rename_dict = {k: v for k, v in COLUMN_MAPPING.items() if k in df.columns}
+    df = df.rename(columns=rename_dict)
+
     # --- Preprocessing & ID Generation ---
     # Sort to ensure deterministic ID assignment
-    if "Innovation" in df.columns and "Country" in df.columns:
+    if sort and "Innovation" in df.columns and "Country" in df.columns:
         df = df.sort_values(by=["Innovation", "Country"]).reset_index(drop=True)
-    
+
     # Generate IDs like INV-001, INV-002...
-    df["raw_id"] = [f"INV-{i:03d}" for i in range(1, len(df) + 1)]
-    
+    df["raw_id"] = [f"INV-{i:03d}" for i in range(start + 1, start + len(df) + 1)]
+
     # Create composite Innovation ID for display and uniqueness
     # Handle cases where Innovation name might be missing
     if "Innovation" not in df.columns:
         df["Innovation"] = "Unknown Innovation"
-        
+
     df["Innovation"] = df["Innovation"].fillna("Unknown") + " (" + df["raw_id"] + ")"
     df["id"] = df["Innovation"] # Use composite ID as the main ID
 
-    # --- Column Mapping & Cleaning ---
-    # Standardize basic column names if they exist
-    # This mapping is specific to the "Horizon" dataset structure but can be expanded
-    column_mapping = {
-        "time_to_regulatory_approval": "Time_to_Approval",
-        "time_to_market": "Time_to_Market",
-        "Impact Score": "Impact Score",
-        "Cost-effectiveness": "Cost-effectiveness",
-        "Readiness": "Readiness",
-        "Stage": "Stage",
-        "Category": "Category",
-        "Country": "Country",
-        "LeadOrg": "LeadOrg",
-        "Disease": "Disease",
-        "TargetPop": "TargetPop",
-        "Impact Potential": "Impact Potential",
-        "Introduction Readiness": "Introduction Readiness"
-    }
-    
-    # Apply renaming only for columns that exist
-    rename_dict = {k: v for k, v in column_mapping.items() if k in df.columns}
-    df = df.rename(columns=rename_dict)
-
     # Ensure date column is datetime
     if "expected_date_of_market" in df.columns:
         df["expected_date_of_market"] = pd.to_datetime(df["expected_date_of_market"], errors="coerce")
@@ -66,46 +277,150 @@ def harmonize_data(df, disease_name="Malaria"):
         df["Category"] = df["Category"].str.strip()
     else:
         df["Category"] = "Uncategorized"
-    
-    # Filter for Forecast period (2025 and above)
-    # Only if market_year exists and has valid data
-    if "market_year" in df.columns:
-        df = df[df["market_year"] >= 2025]
-    
+
+    # Filter for Forecast period (PIPELINE_START_YEAR and above)
+    return df[df["market_year"] >= PIPELINE_START_YEAR]
+
+
+def _sum_count(df, keys, cols):
+    """
+    Grouped sum and non-null count of numeric columns, the mergeable form of a mean.
+
+    Args:
+        df (pd.DataFrame): Cleaned rows.
+        keys (list): Group-by columns.
+        cols (list): Value columns (coerced to numeric).
+
+    Returns:
+        pd.DataFrame: Indexed by `keys` with two column levels ("sum"/"count", col).
+    """
+    values = df[cols].apply(pd.to_numeric, errors="coerce")
+    grouped = values.groupby([df[k] for k in keys])
+    out = pd.concat({"sum": grouped.sum(), "count": grouped.count()}, axis=1)
+    if not cols:
+        # Keep the group keys even when there is nothing to average
+        out = out.reindex(df.groupby(keys).size().index)
+    return out
+
+
+def _mean(partial):
+    """Mean per group from a `_sum_count` partial (NaN where nothing was counted)."""
+    if partial.columns.empty:
+        return pd.DataFrame(index=partial.index)
+    return partial["sum"] / partial["count"].replace(0, np.nan)
+
+
+def _partial_aggregates(df):
+    """
+    Computes mergeable partial aggregates for one cleaned frame or chunk.
+
+    Every entry is a count or a sum, so partials from different chunks or
+    partitions combine with `_merge_partials` and only become means, shares or
+    cumulative counts in `_finalize_aggregates`.
+
+    Args:
+        df (pd.DataFrame): Output of `_prepare`.
+
+    Returns:
+        dict: Partial aggregates keyed by output name.
+    """
+    partials = {"rows": len(df)}
+
+    # 1. Pipeline counts by Year and Category
+    partials["pipeline"] = df.groupby(["market_year", "Category"]).size()
+
+    has_country = "Country" in df.columns
+    has_stage = "Stage" in df.columns
+
+    # 2. Stage counts
+    if has_stage:
+        partials["stage_counts"] = df["Stage"].value_counts(sort=False)
+
+    # 4. Impact sums/counts by Country, Category
+    if has_country:
+        impact_cols = [c for c in IMPACT_COLS if c in df.columns]
+        partials["impact"] = _sum_count(df, ["Country", "Category"], impact_cols)
+
+    # 5./10. Readiness and implementation counts
+    if has_stage:
+        is_ready, impl_status = _classify_stage(df["Stage"])
+        if has_country:
+            partials["readiness_cat"] = pd.DataFrame(
+                {"ready": is_ready, "total": 1}
+            ).groupby([df["Country"], df["Category"]]).sum()
+        partials["implementation"] = impl_status.groupby([df["Category"], impl_status.rename("impl_status")]).size()
+
+    # 9. Budget sums
+    if "Budget Impact" in df.columns:
+        budget = pd.to_numeric(df["Budget Impact"], errors='coerce').fillna(0)
+        partials["budget"] = budget.groupby(df["Category"]).sum()
+
+    # 11. Risk sums/counts
+    partials["risk"] = _sum_count(df, ["Category"], [c for c in RISK_COLS if c in df.columns])
+
+    # 12. Country readiness sums/counts
+    if has_country:
+        partials["country_readiness"] = _sum_count(
+            df, ["Country"], [c for c in COUNTRY_READINESS_COLS if c in df.columns]
+        )
+
+    return partials
+
+
+def _merge_partials(left, right):
+    """
+    Merges two partial-aggregate dicts by summing aligned groups.
+
+    Args:
+        left (dict | None): Accumulated partials, or None for the first chunk.
+        right (dict): Partials of the next chunk.
+
+    Returns:
+        dict: Combined partials.
+    """
+    if left is None:
+        return right
+
+    merged = {"rows": left["rows"] + right["rows"]}
+    for key in left.keys() | right.keys():
+        if key == "rows":
+            continue
+        parts = [p[key] for p in (left, right) if key in p]
+        combined = pd.concat(parts)
+        merged[key] = combined.groupby(level=list(range(combined.index.nlevels))).sum()
+    return merged
+
+
+def _finalize_aggregates(partials):
+    """
+    Turns merged partial aggregates into the dashboard's aggregate frames.
+
+    Args:
+        partials (dict): Output of `_partial_aggregates`/`_merge_partials`.
+
+    Returns:
+        dict: pipeline, readiness, impact_dat_all, readiness_cat_all,
+              budget_data, implementation_data, risk_data and
+              country_readiness_data.
+    """
     # --- 1. Pipeline Data (Dynamic) ---
-    # Aggregate counts by Year and Category
-    if "market_year" in df.columns and "Category" in df.columns:
-        pipeline_raw = df.groupby(["market_year", "Category"]).size().unstack(fill_value=0)
-        
-        # Ensure we have a reasonable year range
-        min_year = 2025
-        max_year = int(pipeline_raw.index.max()) if not pipeline_raw.empty and not pd.isna(pipeline_raw.index.max()) else 2035
-        all_years = range(min_year, max_year + 1)
-        
-        # Handle float index if NaNs existed in original column
-        if not pipeline_raw.empty:
-            pipeline_raw.index = pipeline_raw.index.astype(int)
-
-        # Reindex to ensure continuous years and cumulative sum
-        pipeline_reindexed = pipeline_raw.reindex(all_years, fill_value=0)
-        pipeline = pipeline_reindexed.cumsum().reset_index()
-        
-        pipeline = pipeline.rename(columns={"index": "year", "market_year": "year"})
-        
-        # Convert all columns to numeric except year
-        for col in pipeline.columns:
-            if col != "year":
-                pipeline[col] = pipeline[col].astype(int)
-    else:
-        pipeline = pd.DataFrame({"year": range(2025, 2036)})
+    # Cumulative counts per year and category (shared engine, see utils/pipeline.py)
+    counts = partials["pipeline"]
+    pipeline = cumulate(
+        counts.index.get_level_values("market_year").astype(int),
+        counts.index.get_level_values("Category"),
+        grain="year",
+        weights=counts.to_numpy(),
+    )
 
     # --- 2. Readiness Data (Dynamic) ---
-    if "Stage" in df.columns:
-        stage_counts = df["Stage"].value_counts().reset_index()
+    if "stage_counts" in partials:
+        # Most frequent first; ties by name so the order is independent of chunking
+        stage_counts = partials["stage_counts"].sort_index().sort_values(ascending=False, kind="stable").reset_index()
         stage_counts.columns = ["status", "count"]
-        total_innovations = len(df)
+        total_innovations = partials["rows"]
         stage_counts["pct"] = (stage_counts["count"] / total_innovations * 100).round(1)
-        
+
         # Assign colors dynamically
         base_colors = ["#10b981", "#3b82f6", "#f59e0b", "#ef4444", "#8b5cf6", "#ec4899"]
         stage_counts["colors"] = [base_colors[i % len(base_colors)] for i in range(len(stage_counts))]
@@ -113,24 +428,11 @@ def harmonize_data(df, disease_name="Malaria"):
     else:
         readiness = pd.DataFrame(columns=["status", "pct", "colors"])
 
-    # --- 3. Horizon DataFrame (Main Data) ---
-    horizon_df = df.copy()
-    
-    # Ensure numeric columns are actually numeric
-    numeric_cols = ["Impact Score", "Impact Potential", "Introduction Readiness", "Cost-effectiveness", "Readiness", "Time_to_Approval", "Time_to_Market"]
-    for col in numeric_cols:
-        if col in horizon_df.columns:
-            horizon_df[col] = pd.to_numeric(horizon_df[col], errors='coerce').fillna(0)
-
     # --- 4. Impact Data All ---
-    # Group by Country, Category
-    if "Country" in df.columns and "Category" in df.columns:
-        impact_dat_all = df.groupby(["Country", "Category"]).agg({
-            "Impact Score": "mean",
-            "Cost-effectiveness": "mean"
-        }).reset_index()
-        impact_dat_all = impact_dat_all.rename(columns={"Impact Score": "impact", "Cost-effectiveness": "cost_eff"})
-        
+    if "impact" in partials:
+        impact_dat_all = _mean(partials["impact"]).reindex(columns=list(IMPACT_COLS))
+        impact_dat_all = impact_dat_all.rename(columns=IMPACT_COLS).reset_index()
+
         # Add Overall
         overall_impact = impact_dat_all.groupby("Category").agg({
             "impact": "mean",
@@ -143,20 +445,9 @@ def harmonize_data(df, disease_name="Malaria"):
         impact_dat_all = pd.DataFrame(columns=["country", "category", "impact", "cost_eff"])
 
     # --- 5. Readiness Cat All ---
-    # Define "Ready" as Stage includes Phase 2/3 or Market/Ready/Stockpiled
-    def check_ready(stage):
-        s = str(stage).lower()
-        keywords = ["phase 2", "phase ii", "phase 3", "phase iii", "market", "ready", "stockpiled"]
-        return any(k in s for k in keywords)
-
-    if "Stage" in df.columns:
-        df["is_ready"] = df["Stage"].apply(check_ready)
-        
-        readiness_cat_all = df.groupby(["Country", "Category"]).agg(
-            ready=("is_ready", "sum"),
-            total=("id", "count")
-        ).reset_index()
-        
+    if "readiness_cat" in partials:
+        readiness_cat_all = partials["readiness_cat"].astype(int).reset_index()
+
         overall_readiness_cat = readiness_cat_all.groupby("Category").agg({
             "ready": "sum",
             "total": "sum"
@@ -167,67 +458,17 @@ def harmonize_data(df, disease_name="Malaria"):
     else:
         readiness_cat_all = pd.DataFrame(columns=["country", "category", "ready", "total"])
 
-    # --- 6. Usage All (Map Data) ---
-    # Lat/Lon Mapping (Default set)
-    country_coords = {
-        "Kenya": {"lat": -0.02, "lon": 37.9},
-        "Senegal": {"lat": 14.5, "lon": -14.4},
-        "South Africa": {"lat": -30.6, "lon": 22.9},
-        "Overall": {"lat": 0.0, "lon": 0.0},
-        "Brazil": {"lat": -10.8, "lon": -52.9},
-        "India": {"lat": 21.0, "lon": 78.0},
-        "Nigeria": {"lat": 9.1, "lon": 8.7},
-        "Tanzania": {"lat": -6.4, "lon": 35.0},
-        "Ghana": {"lat": 7.9, "lon": -1.0}
-    }
-    
-    if "Country" in df.columns:
-        usage_all = df[["id", "Country", "Stage"]].copy()
-        usage_all = usage_all.rename(columns={"Country": "country", "Stage": "status"})
-        usage_all["lat"] = usage_all["country"].map(lambda x: country_coords.get(x, {"lat": 0, "lon": 0})["lat"])
-        usage_all["lon"] = usage_all["country"].map(lambda x: country_coords.get(x, {"lat": 0, "lon": 0})["lon"])
-    else:
-        usage_all = pd.DataFrame(columns=["id", "country", "status", "lat", "lon"])
-
-    # --- 7. CE All ---
-    if "Country" in df.columns and "Cost-effectiveness" in df.columns:
-        ce_all = df[["id", "Country", "Cost-effectiveness"]].copy()
-        ce_all = ce_all.rename(columns={"Country": "country", "Cost-effectiveness": "ce_usd_per_daly"})
-        ce_all["ce_usd_per_daly"] = pd.to_numeric(ce_all["ce_usd_per_daly"], errors='coerce').fillna(0)
-    else:
-        ce_all = pd.DataFrame(columns=["id", "country", "ce_usd_per_daly"])
-
-    # --- 8. Pop Impact All ---
-    pop_impact_all = df[["id"]].copy()
-    if "Impact Potential" in df.columns:
-        # Simulate population impact based on Impact Potential * 1M (random variation)
-        pop_impact_all["pop_millions"] = df["Impact Potential"].apply(lambda x: (pd.to_numeric(x, errors='coerce') or 0) * 0.8 + 5)
-    else:
-        pop_impact_all["pop_millions"] = 0
-
     # --- 9. Budget Data ---
-    if "Budget Impact" in df.columns:
-        df["Budget Impact"] = pd.to_numeric(df["Budget Impact"], errors='coerce').fillna(0)
-        budget_data = df.groupby("Category")["Budget Impact"].sum().reset_index()
+    if "budget" in partials:
+        budget_data = partials["budget"].reset_index()
         budget_data.columns = ["category", "allocated"]
         budget_data["spent"] = budget_data["allocated"] * 0.8 # Simulate spent
     else:
         budget_data = pd.DataFrame(columns=["category", "allocated", "spent"])
 
     # --- 10. Implementation Data ---
-    # Map Stage to Status
-    def map_stage(stage):
-        s = str(stage).lower()
-        if "phase 1" in s or "phase 2" in s or "phase i" in s or "phase ii" in s:
-            return "planned"
-        elif "phase 3" in s or "phase iii" in s:
-            return "in_progress"
-        else:
-            return "completed"
-            
-    if "Stage" in df.columns:
-        df["impl_status"] = df["Stage"].apply(map_stage)
-        implementation_data = df.groupby(["Category", "impl_status"]).size().unstack(fill_value=0).reset_index()
+    if "implementation" in partials:
+        implementation_data = partials["implementation"].unstack(fill_value=0).reset_index()
         for col in ["planned", "in_progress", "completed"]:
             if col not in implementation_data.columns:
                 implementation_data[col] = 0
@@ -237,52 +478,94 @@ def harmonize_data(df, disease_name="Malaria"):
 
     # --- 11. Risk Data ---
     # Inverse of success probabilities
-    risk_cols = {
-        "Probability of technical and regulatory success": "technical_risk",
-        "Demand forecasting and generation": "market_risk",
-        "Regulatory approvals": "regulatory_risk",
-        "Financing": "financial_risk"
-    }
-    
-    risk_data_list = []
-    if "Category" in df.columns:
-        for cat, group in df.groupby("Category"):
-            cat_risks = {"category": cat}
-            for src, target in risk_cols.items():
-                if src in group.columns:
-                    val = pd.to_numeric(group[src], errors='coerce').mean()
-                    cat_risks[target] = max(0, 10 - (val / 10)) # Scale 0-100 down to 0-10 risk score (inverse)
-                else:
-                    cat_risks[target] = 5 # Default
-            risk_data_list.append(cat_risks)
-        risk_data = pd.DataFrame(risk_data_list)
-    else:
-        risk_data = pd.DataFrame(columns=["category", "technical_risk", "market_risk", "regulatory_risk", "financial_risk"])
+    means = _mean(partials["risk"])
+    risk_data = pd.DataFrame({"category": means.index})
+    for src, target in RISK_COLS.items():
+        if src in means.columns:
+            # Scale 0-100 down to 0-10 risk score (inverse)
+            risk_data[target] = (10 - means[src].to_numpy() / 10).clip(min=0)
+            risk_data[target] = risk_data[target].fillna(0)
+        else:
+            risk_data[target] = 5 # Default
 
     # --- 12. Country Readiness Data ---
-    if "Country" in df.columns:
-        # Check if columns exist before aggregation
-        agg_dict = {}
-        if "Policy readiness" in df.columns: agg_dict["Policy readiness"] = "mean"
-        if "Potential supply chain" in df.columns: agg_dict["Potential supply chain"] = "mean"
-        if "Uptake/Delivery" in df.columns: agg_dict["Uptake/Delivery"] = "mean"
-        
-        if agg_dict:
-            country_readiness_data = df.groupby("Country").agg(agg_dict).reset_index()
-            # Rename based on what was available
-            rename_map = {"Country": "country", "Policy readiness": "policy_readiness", 
-                          "Potential supply chain": "infra_readiness", "Uptake/Delivery": "uptake_potential"}
-            country_readiness_data = country_readiness_data.rename(columns=rename_map)
-            
-            # Add Overall
-            overall_cr = country_readiness_data.mean(numeric_only=True).to_frame().T
-            overall_cr["country"] = "Overall"
-            country_readiness_data = pd.concat([country_readiness_data, overall_cr])
-        else:
-             country_readiness_data = pd.DataFrame(columns=["country", "policy_readiness", "infra_readiness", "uptake_potential"])
+    country_means = _mean(partials["country_readiness"]) if "country_readiness" in partials else pd.DataFrame()
+    if not country_means.columns.empty:
+        country_readiness_data = country_means.reset_index()
+        # Rename based on what was available
+        country_readiness_data = country_readiness_data.rename(columns={"Country": "country", **COUNTRY_READINESS_COLS})
+
+        # Add Overall
+        overall_cr = country_readiness_data.mean(numeric_only=True).to_frame().T
+        overall_cr["country"] = "Overall"
+        country_readiness_data = pd.concat([country_readiness_data, overall_cr])
     else:
         country_readiness_data = pd.DataFrame(columns=["country", "policy_readiness", "infra_readiness", "uptake_potential"])
 
+    return {
+        "pipeline": pipeline,
+        "readiness": readiness,
+        "impact_dat_all": impact_dat_all,
+        "readiness_cat_all": readiness_cat_all,
+        "budget_data": budget_data,
+        "implementation_data": implementation_data,
+        "risk_data": risk_data,
+        "country_readiness_data": country_readiness_data,
+    }
+
+
+def _row_outputs(df):
+    """
+    Builds the outputs that carry one row per cleaned input row.
+
+    Args:
+        df (pd.DataFrame): Output of `_prepare`.
+
+    Returns:
+        dict: horizon, usage_all, ce_all and pop_impact_all frames.
+    """
+    # --- 3. Horizon DataFrame (Main Data) ---
+    horizon_df = df.assign(**{
+        col: pd.to_numeric(df[col], errors='coerce').fillna(0)
+        for col in NUMERIC_COLS if col in df.columns
+    })
+
+    # --- 6. Usage All (Map Data) ---
+    if "Country" in df.columns:
+        usage_all = df[["id", "Country", "Stage"]].rename(columns={"Country": "country", "Stage": "status"})
+        lat_map = {k: v["lat"] for k, v in COUNTRY_COORDS.items()}
+        lon_map = {k: v["lon"] for k, v in COUNTRY_COORDS.items()}
+        usage_all["lat"] = usage_all["country"].map(lat_map).fillna(0)
+        usage_all["lon"] = usage_all["country"].map(lon_map).fillna(0)
+    else:
+        usage_all = pd.DataFrame(columns=["id", "country", "status", "lat", "lon"])
+
+    # --- 7. CE All ---
+    if "Country" in df.columns and "Cost-effectiveness" in df.columns:
+        ce_all = df[["id", "Country", "Cost-effectiveness"]].rename(columns={"Country": "country", "Cost-effectiveness": "ce_usd_per_daly"})
+        ce_all["ce_usd_per_daly"] = pd.to_numeric(ce_all["ce_usd_per_daly"], errors='coerce').fillna(0)
+    else:
+        ce_all = pd.DataFrame(columns=["id", "country", "ce_usd_per_daly"])
+
+    # --- 8. Pop Impact All ---
+    if "Impact Potential" in df.columns:
+        # Simulate population impact based on Impact Potential * 1M (random variation)
+        pop_impact_all = df[["id"]].assign(
+            pop_millions=pd.to_numeric(df["Impact Potential"], errors='coerce') * 0.8 + 5
+        )
+    else:
+        pop_impact_all = df[["id"]].assign(pop_millions=0)
+
+    return {
+        "horizon": horizon_df,
+        "usage_all": usage_all,
+        "ce_all": ce_all,
+        "pop_impact_all": pop_impact_all,
+    }
+
+
+def _templates():
+    """Static impact and introduction-readiness templates."""
     # --- 13. Templates (Static) ---
     impact_template = pd.DataFrame({
         "metric": [
@@ -309,34 +592,285 @@ def harmonize_data(df, disease_name="Malaria"):
         "passed": [True, True, True, False, False, False, False, True, True, True, True]
     })
 
+    return {"impact_template": impact_template, "intro_template": intro_template}
+
+
+def harmonize_data(df, disease_name="Malaria"):
+    """
+    Harmonizes innovation data from a raw dataframe.
+
+    Args:
+        df (pd.DataFrame): The raw input dataframe containing innovation data.
+        disease_name (str): The name of the disease to filter or label the data with.
+
+    Returns:
+        dict: A dictionary containing processed dataframes (pipeline, readiness, horizon, etc.)
+              ready for use in the dashboard.
+    """
+    return _harmonize_prepared(_prepare(df))
+
+
+def _harmonize_prepared(df):
+    """`harmonize_data` for rows that already went through `_prepare`."""
+    result = _finalize_aggregates(_partial_aggregates(df))
+    result.update(_row_outputs(df))
+    result.update(_templates())
+
     # --- 14. ID Offsets (Dynamic) ---
-    # Generate random offsets for each ID
-    id_offsets = {}
-    for pid in df["id"].unique():
-        # Deterministic random based on ID hash
-        random.seed(hash(pid))
-        
-        id_offsets[pid] = {
-            "impact": [random.randint(-20, 20) for _ in range(6)],
-            "impact_passed": [random.choice([True, False]) for _ in range(6)],
-            "intro_delta": [random.randint(-10, 10) for _ in range(11)],
-            "intro_passed_delta": [random.choice([True, False]) for _ in range(11)]
-        }
+    # Deterministic offsets keyed by a stable hash of each ID
+    result["id_offsets"] = _id_offsets(df["id"].unique())
 
-    return {
-        "pipeline": pipeline,
-        "readiness": readiness,
-        "horizon": horizon_df,
-        "impact_dat_all": impact_dat_all,
-        "readiness_cat_all": readiness_cat_all,
-        "usage_all": usage_all,
-        "ce_all": ce_all,
-        "pop_impact_all": pop_impact_all,
-        "budget_data": budget_data,
-        "implementation_data": implementation_data,
-        "risk_data": risk_data,
-        "country_readiness_data": country_readiness_data,
-        "impact_template": impact_template,
-        "intro_template": intro_template,
-        "id_offsets": id_offsets,
+    return result
+
+
+def harmonize_csv_chunked(path, out_dir, chunksize=100_000, disease_name="Malaria"):
+    """
+    Harmonizes a raw CSV export in fixed-size chunks with bounded memory.
+
+    Each chunk is cleaned, reduced to mergeable partial aggregates (counts and
+    sums) and its row-level outputs are appended to CSV files in `out_dir`.
+    Peak memory is therefore proportional to `chunksize`, not to the input.
+
+    Unlike `harmonize_data`, rows are not sorted before IDs are assigned, so
+    IDs follow file order. Sort the export by Innovation/Country beforehand to
+    get the same IDs as the in-memory path.
+
+    Args:
+        path (str): Raw CSV export (same layout as `www/horizon.csv`).
+        out_dir (str): Directory for the row-level outputs.
+        chunksize (int): Number of raw rows per chunk.
+        disease_name (str): The name of the disease to filter or label the data with.
+
+    Returns:
+        dict: The aggregate frames and templates of `harmonize_data`, plus
+              "files" mapping each row-level output (and "id_offsets") to the
+              file it was written to.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    files = {name: os.path.join(out_dir, f"{name}.csv") for name in ROW_OUTPUTS}
+    files["id_offsets"] = os.path.join(out_dir, "id_offsets.jsonl")
+
+    partials = None
+    start = 0
+    reader = pd.read_csv(path, chunksize=chunksize, encoding="utf-8-sig")
+    with open(files["id_offsets"], "w") as offsets_file:
+        for i, chunk in enumerate(reader):
+            raw_rows = len(chunk)
+            chunk = _prepare(chunk, start=start, sort=False)
+            start += raw_rows
+
+            partials = _merge_partials(partials, _partial_aggregates(chunk))
+
+            for name, frame in _row_outputs(chunk).items():
+                frame.to_csv(files[name], mode="w" if i == 0 else "a", header=i == 0, index=False)
+
+            for pid, offsets in _id_offsets(chunk["id"].unique()).items():
+                offsets_file.write(json.dumps({pid: offsets}) + "\n")
+
+    if partials is None:
+        # Empty export: finalize from an empty frame so every output exists
+        empty = _prepare(pd.DataFrame(), sort=False)
+        partials = _partial_aggregates(empty)
+        for name, frame in _row_outputs(empty).items():
+            frame.to_csv(files[name], index=False)
+
+    result = _finalize_aggregates(partials)
+    result.update(_templates())
+    result["files"] = files
+    return result
+
+
+def _to_columns(df):
+    """
+    Encodes a frame as plain NumPy column buffers for inter-process transfer.
+
+    Object columns are dictionary-encoded (int32 codes plus the distinct
+    values), so strings are sent once per distinct value instead of once per
+    row; every other column is sent as its raw array.
+
+    Args:
+        df (pd.DataFrame): Frame to encode.
+
+    Returns:
+        dict: {"index": array, "columns": {name: (kind, *buffers)}}
+    """
+    columns = {}
+    for name in df.columns:
+        col = df[name]
+        if col.dtype == object:
+            codes, uniques = pd.factorize(col)
+            columns[name] = ("dict", codes.astype(np.int32), np.asarray(uniques, dtype=object))
+        else:
+            columns[name] = ("plain", col.to_numpy())
+    return {"index": df.index.to_numpy(), "columns": columns}
+
+
+def _from_columns(payload):
+    """Rebuilds a frame from `_to_columns` buffers (missing codes become NaN)."""
+    data = {}
+    for name, (kind, *buffers) in payload["columns"].items():
+        if kind == "dict":
+            codes, uniques = buffers
+            values = np.full(len(codes), np.nan, dtype=object)
+            valid = codes >= 0
+            values[valid] = uniques[codes[valid]]
+            data[name] = values
+        else:
+            data[name] = buffers[0]
+    return pd.DataFrame(data, index=payload["index"])
+
+
+def _harmonize_partition(key, payload):
+    """
+    Worker: partial aggregates, row outputs and ID offsets for one partition.
+
+    Args:
+        key: Partition value (e.g. the disease name).
+        payload (dict): Cleaned rows encoded with `_to_columns`.
+
+    Returns:
+        tuple: (key, partials, encoded row outputs, offset draws, rows, seconds)
+    """
+    start = time.perf_counter()
+    df = _from_columns(payload)
+
+    partials = _partial_aggregates(df)
+    rows = {name: _to_columns(frame) for name, frame in _row_outputs(df).items()}
+    draws = _offset_draws(df["id"].to_numpy())
+
+    return key, partials, rows, draws, len(df), time.perf_counter() - start
+
+
+def _map_bounded(pool, fn, items, limit):
+    """
+    Yields `fn(*item)` for each item, run in `pool` in completion order.
+
+    At most `limit` items are submitted at a time and `items` is consumed
+    lazily, so only the partitions in flight are materialized.
+    """
+    pending = set()
+    for item in items:
+        if len(pending) >= limit:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        pending.add(pool.submit(fn, *item))
+    for future in as_completed(pending):
+        yield future.result()
+
+
+def harmonize_partitioned(df, partition_by="Disease", workers=None):
+    """
+    Harmonizes a raw frame by partition (disease or source database) in a process pool.
+
+    Rows are cleaned and given IDs once, split on `partition_by` and shipped
+    to the workers as column buffers, one partition per free worker (the
+    buffers are built as workers become free, not all up front). Each worker
+    returns mergeable partials and its row-level outputs, which are combined
+    into the same dict that `harmonize_data` returns for the whole frame.
+
+    Args:
+        df (pd.DataFrame): The raw input dataframe containing innovation data.
+        partition_by (str): Raw column to partition on, e.g. "Disease" or a
+                            source-database column.
+        workers (int, optional): Pool size; defaults to the CPU count.
+                                 `workers=1` runs in-process.
+
+    Returns:
+        dict: `harmonize_data` outputs plus "timings", a DataFrame with the
+              rows and seconds spent on each partition.
+
+    Raises:
+        KeyError: If `partition_by` is not a column of `df`.
+    """
+    if partition_by not in df.columns:
+        raise KeyError(f"Partition column '{partition_by}' not found in the raw data.")
+
+    df = _prepare(df)
+    # Rows without a partition value are harmonized together
+    keys = df[partition_by].astype(object).where(df[partition_by].notna(), "Unknown")
+    payloads = ((key, _to_columns(part)) for key, part in df.groupby(keys, sort=True))
+
+    if workers == 1:
+        results = [_harmonize_partition(key, payload) for key, payload in payloads]
+    else:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(_map_bounded(pool, _harmonize_partition, payloads, workers))
+        # Completion order -> partition order
+        position = {key: i for i, key in enumerate(keys.drop_duplicates().sort_values())}
+        results.sort(key=lambda r: position[r[0]])
+
+    partials = None
+    row_parts = {name: [] for name in ROW_OUTPUTS}
+    draw_parts = []
+    timings = []
+    for key, part_partials, rows, draws, n_rows, seconds in results:
+        partials = _merge_partials(partials, part_partials)
+        for name, payload in rows.items():
+            row_parts[name].append(_from_columns(payload))
+        draw_parts.append(draws)
+        timings.append({"partition": key, "rows": n_rows, "seconds": seconds})
+
+    if partials is None:
+        # No rows: the empty outputs of the already prepared frame
+        return {**_harmonize_prepared(df), "timings": pd.DataFrame(columns=["partition", "rows", "seconds"])}
+
+    result = _finalize_aggregates(partials)
+    # Restore the row order of the unpartitioned frame
+    for name, parts in row_parts.items():
+        result[name] = pd.concat(parts).sort_index()
+    result.update(_templates())
+
+    # --- 14. ID Offsets (Dynamic) ---
+    order = np.argsort(np.concatenate([p.index.to_numpy() for p in row_parts["horizon"]]), kind="stable")
+    draws = {
+        field: np.concatenate([d[field] for d in draw_parts])[order]
+        for field in OFFSET_FIELDS
     }
+    result["id_offsets"] = _id_offsets(result["horizon"]["id"], draws)
+
+    result["timings"] = pd.DataFrame(timings)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Harmonize a raw horizon-scan export.")
+    parser.add_argument("input", help="Raw CSV export")
+    parser.add_argument("--out-dir", default="harmonized", help="Directory for the outputs")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="Raw rows per chunk (streaming mode)")
+    parser.add_argument("--workers", type=int, help="Harmonize partitions in a pool of this many processes")
+    parser.add_argument("--partition-by", default="Disease", help="Column to partition on with --workers")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.workers:
+        raw_df = pd.read_csv(args.input, encoding="utf-8-sig")
+        result = harmonize_partitioned(raw_df, partition_by=args.partition_by, workers=args.workers)
+        os.makedirs(args.out_dir, exist_ok=True)
+        with open(os.path.join(args.out_dir, "id_offsets.json"), "w") as f:
+            json.dump(result.pop("id_offsets"), f)
+        timings = result.pop("timings")
+    else:
+        result = harmonize_csv_chunked(args.input, args.out_dir, chunksize=args.chunksize)
+        timings = None
+
+    for name, frame in result.items():
+        if isinstance(frame, pd.DataFrame):
+            frame.to_csv(os.path.join(args.out_dir, f"{name}.csv"), index=False)
+    elapsed = time.perf_counter() - start
+
+    if timings is not None and not timings.empty:
+        print(timings.sort_values("seconds", ascending=False).to_string(index=False))
+        print(
+            f"{len(timings)} partitions, {int(timings['rows'].sum()):,} rows, "
+            f"{timings['seconds'].sum():.2f}s worker time, {elapsed:.2f}s wall "
+            f"({args.workers} workers)"
+        )
+    else:
+        print(f"Harmonized in {elapsed:.2f}s")
+    print(f"Wrote harmonized outputs to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
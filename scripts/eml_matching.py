@@ -0,0 +1,276 @@
+"""
+Essential-medicines (EML) presence matching for horizon products.
+
+Replaces the per-product lookups of `scripts/testing_product_presence_in_eml.qmd`
+with a local index over the EML lists in `data/`, so the `eml` flag and
+`eml_date` of every (innovation, scope) row can be recomputed in one pass on
+each data refresh:
+
+    python scripts/eml_matching.py www/ALIGN_health_product_data_horizon_cleaned.csv
+"""
+import argparse
+import re
+import unicodedata
+from collections import defaultdict
+
+import pandas as pd
+
+# Harmonized EML entries of every scope (see scripts/enriching_eml_data.qmd)
+EML_PATH = "data/all_scope_eml_raw.csv"
+
+# Edition date of each national list, as recorded in the horizon data
+EML_EDITION_DATES = {
+    "Kenya": "2023-01-01",
+    "Senegal": "2022-01-01",
+    "South Africa": "2024-01-01",
+}
+
+# Only medicines are assessed; other categories keep an empty `eml` flag
+MEDICINE_CATEGORIES = ["Therapeutic", "Vaccine"]
+
+# Separators between the components of a combination product
+COMBINATION_SPLIT = re.compile(r"\s*(?:/|\+|,|&|\band\b|\bwith\b)\s*", re.IGNORECASE)
+
+# Strengths ("500mg", "20 g", "5%") and dosage-form words do not identify a medicine
+STRENGTH_PATTERN = re.compile(r"\b\d+(?:\.\d+)?\s*(?:mg|g|mcg|ug|ml|iu|%)(?=\s|$)")
+FORM_WORDS = re.compile(
+    r"\b(?:tablets?|capsules?|film-coated|dispersible|oral|solution|suspension|"
+    r"injection|injectable|powder|syrup|cream|ointment|paediatric|pediatric)\b"
+)
+
+# Trailing salt names ("sildenafil citrate", "tenofovir disoproxil fumarate")
+SALT_SUFFIX = re.compile(
+    r"(?<=\w)\s+(?:citrate|fumarate|maleate|mesylate|hydrochloride|sulfate|"
+    r"sulphate|phosphate|acetate|sodium|potassium)$"
+)
+
+# Full (level 5) ATC codes, e.g. J05AR02; group-level codes are too broad to bridge lists
+FULL_ATC = re.compile(r"^[A-Z]\d{2}[A-Z]{2}\d{2}$")
+
+
+def normalize_name(name):
+    """
+    Canonicalizes a medicine name using lexical normalization only.
+
+    Same rules as `normalize_name` in `scripts/enriching_eml_data.qmd`:
+    Unicode decomposition, lowercasing, punctuation removal (except hyphens)
+    and whitespace collapsing.
+
+    Args:
+        name (str): Raw medicine name.
+
+    Returns:
+        str | None: Normalized name, or None for non-strings.
+    """
+    if not isinstance(name, str):
+        return None
+
+    name = unicodedata.normalize("NFKD", name)
+    name = name.lower()
+    name = re.sub(r"[^\w\s\-]", "", name)
+    name = re.sub(r"\s+", " ", name).strip()
+    return name
+
+
+def component_key(name, split_hyphen=False):
+    """
+    Splits a (combination) medicine name into its sorted, normalized components.
+
+    "Abacavir / Lamivudine", "lamivudine + abacavir" and "Abacavir/Lamivudine
+    Tablet 300mg" all give ("abacavir", "lamivudine").
+
+    Args:
+        name (str): Raw medicine name.
+        split_hyphen (bool): Also treat hyphens as separators
+                             ("Artesunate-Amodiaquine").
+
+    Returns:
+        tuple: Sorted distinct components; empty if nothing is left.
+    """
+    if not isinstance(name, str):
+        return ()
+
+    # Drop parenthesized abbreviations unless they are the whole name
+    outside = re.sub(r"\([^)]*\)", " ", name)
+    name = outside if outside.strip() else name.replace("(", " ").replace(")", " ")
+
+    parts = COMBINATION_SPLIT.split(name)
+    if split_hyphen:
+        parts = [p for part in parts for p in part.split("-")]
+
+    components = set()
+    for part in parts:
+        part = normalize_name(part) or ""
+        part = STRENGTH_PATTERN.sub(" ", part)
+        part = FORM_WORDS.sub(" ", part)
+        part = re.sub(r"\s+", " ", part).strip(" -")
+        part = SALT_SUFFIX.sub("", part)
+        if part:
+            components.add(part)
+    return tuple(sorted(components))
+
+
+def _split_atc(value):
+    """Splits an `atc_code` cell ("B03AA07, B03AA02") into full ATC codes."""
+    if not isinstance(value, str):
+        return []
+    codes = (c.strip().upper() for c in value.split(","))
+    return [c for c in codes if FULL_ATC.match(c)]
+
+
+def load_eml(path=EML_PATH):
+    """
+    Loads the harmonized EML entries of every scope.
+
+    Args:
+        path (str): CSV with `name`, `atc_code` and `scope` columns.
+
+    Returns:
+        pd.DataFrame: One row per EML entry.
+    """
+    df = pd.read_csv(path, encoding="utf-8-sig")
+    return df.loc[df["name"].notna(), ["name", "atc_code", "scope"]].reset_index(drop=True)
+
+
+def build_eml_index(eml_df):
+    """
+    Indexes EML entries by component set and by ATC code.
+
+    Args:
+        eml_df (pd.DataFrame): Output of `load_eml`.
+
+    Returns:
+        dict:
+            - "by_components": {component tuple: set of scopes listing it}
+            - "atc_by_components": {component tuple: set of full ATC codes}
+            - "by_atc": {ATC code: set of scopes listing it}
+    """
+    by_components = defaultdict(set)
+    atc_by_components = defaultdict(set)
+    by_atc = defaultdict(set)
+
+    for name, atc, scope in eml_df[["name", "atc_code", "scope"]].itertuples(index=False):
+        key = component_key(name)
+        codes = _split_atc(atc)
+        if key:
+            by_components[key].add(scope)
+            atc_by_components[key].update(codes)
+        for code in codes:
+            by_atc[code].add(scope)
+
+    return {
+        "by_components": dict(by_components),
+        "atc_by_components": dict(atc_by_components),
+        "by_atc": dict(by_atc),
+    }
+
+
+def _product_keys(innovation, alternative_names):
+    """Component keys to look up for one product (name, aliases, hyphen splits)."""
+    names = [innovation]
+    if isinstance(alternative_names, str):
+        names += [n for n in alternative_names.split(";") if n.strip()]
+
+    keys = set()
+    for name in names:
+        keys.add(component_key(name))
+        keys.add(component_key(name, split_hyphen=True))
+    keys.discard(())
+    return keys
+
+
+def listed_scopes(innovation, alternative_names, index):
+    """
+    Scopes whose EML lists a product.
+
+    A product is listed when an entry has exactly the same component set, or
+    when an entry in another scope shares a full ATC code with such an entry.
+
+    Args:
+        innovation (str): Product name.
+        alternative_names (str): ";"-separated aliases (may be NaN).
+        index (dict): Output of `build_eml_index`.
+
+    Returns:
+        set: Scope names.
+    """
+    scopes = set()
+    for key in _product_keys(innovation, alternative_names):
+        scopes |= index["by_components"].get(key, set())
+        for code in index["atc_by_components"].get(key, ()):
+            scopes |= index["by_atc"].get(code, set())
+    return scopes
+
+
+def match_eml(horizon_df, index=None, categories=MEDICINE_CATEGORIES):
+    """
+    Computes the `eml` flag and `eml_date` for every (innovation, scope) row.
+
+    Each distinct product is matched once; the per-row flags are then joined
+    back onto the frame.
+
+    Args:
+        horizon_df (pd.DataFrame): Long-format horizon data with `innovation`,
+                                   `scope` and optionally `alternative_names`
+                                   and `category`.
+        index (dict, optional): Output of `build_eml_index`; built from
+                                `EML_PATH` when omitted.
+        categories (list, optional): Categories to assess; other rows get a
+                                     missing `eml`. None assesses every row.
+
+    Returns:
+        pd.DataFrame: `innovation`, `scope`, `eml` ("Yes"/"No"/NaN) and
+                      `eml_date`, aligned with `horizon_df.index`.
+    """
+    if index is None:
+        index = build_eml_index(load_eml())
+
+    alt = horizon_df["alternative_names"] if "alternative_names" in horizon_df.columns else None
+    products = pd.DataFrame({
+        "innovation": horizon_df["innovation"],
+        "alternative_names": alt,
+    }).drop_duplicates()
+
+    pairs = [
+        (innovation, scope)
+        for innovation, alternative_names in products.itertuples(index=False)
+        for scope in listed_scopes(innovation, alternative_names, index)
+    ]
+    listed = pd.MultiIndex.from_tuples(pairs, names=["innovation", "scope"]) if pairs else None
+
+    rows = pd.MultiIndex.from_frame(horizon_df[["innovation", "scope"]])
+    is_listed = rows.isin(listed) if listed is not None else [False] * len(rows)
+
+    result = horizon_df[["innovation", "scope"]].copy()
+    result["eml"] = pd.Series(is_listed, index=horizon_df.index).map({True: "Yes", False: "No"})
+    if categories is not None and "category" in horizon_df.columns:
+        result.loc[~horizon_df["category"].isin(categories), "eml"] = pd.NA
+    result["eml_date"] = pd.to_datetime(horizon_df["scope"].map(EML_EDITION_DATES))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute EML presence for horizon products.")
+    parser.add_argument("input", help="Long-format horizon CSV (innovation x scope)")
+    parser.add_argument("--eml", default=EML_PATH, help="Harmonized EML CSV")
+    parser.add_argument("--out", help="Write the input with updated eml/eml_date columns here")
+    args = parser.parse_args()
+
+    horizon_df = pd.read_csv(args.input, encoding="utf-8-sig")
+    matches = match_eml(horizon_df, build_eml_index(load_eml(args.eml)))
+
+    if "eml" in horizon_df.columns:
+        assessed = matches["eml"].notna() & horizon_df["eml"].notna()
+        agree = (matches.loc[assessed, "eml"] == horizon_df.loc[assessed, "eml"]).mean()
+        print(f"Agreement with existing eml flags: {agree:.1%} of {int(assessed.sum())} rows")
+    print(matches.groupby("scope")["eml"].value_counts().unstack(fill_value=0))
+
+    if args.out:
+        horizon_df["eml"] = matches["eml"]
+        horizon_df["eml_date"] = matches["eml_date"].dt.strftime("%Y-%m-%d")
+        horizon_df.to_csv(args.out, index=False)
+        print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import sys
+import os
+import json
+
+# Add parent directory to path to allow importing utils/scripts
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.build_assets import build_about, subset_fontawesome, update_manifest
+from utils.static_assets import FINGERPRINTED, asset_url
+
+
+def test_about_fragment_is_minified_fingerprinted_and_listed(tmp_path):
+    source = tmp_path / "about.html"
+    source.write_text(
+        "<html><head><title>x</title></head><body>"
+        '<main class="content" id="quarto-document-content">\n'
+        "  <!-- note -->\n  <p>Updated <code>r params$last_updated</code></p>\n"
+        "  <p><strong>A</strong> <a href='#'>B</a></p>\n<pre>keep\n  this</pre>\n"
+        "</main></body></html>",
+        encoding="utf-8",
+    )
+    www = tmp_path / "www"
+    path = build_about(str(source), str(www / "content"))
+    html = open(path, encoding="utf-8").read()
+
+    assert FINGERPRINTED.search(path)
+    assert html == (
+        '<main class="content" id="quarto-document-content"><p>Updated 2026-03-27</p>'
+        "<p><strong>A</strong> <a href='#'>B</a></p><pre>keep\n  this</pre></main>"
+    )
+
+    # Rebuilding unchanged content keeps the same file
+    assert build_about(str(source), str(www / "content")) == path
+
+    manifest = www / "asset_manifest.json"
+    update_manifest({"about.html": path}, str(manifest))
+    assert json.loads(manifest.read_text())["about.html"] == "content/" + os.path.basename(path)
+    assert asset_url("about.html", str(manifest)) == "content/" + os.path.basename(path)
+
+
+def test_fontawesome_subset_keeps_used_icons_and_faces():
+    css = (
+        "/*! Font Awesome Free */.fa{font-family:var(--fa-style-family,\"Font Awesome 6 Free\")}"
+        ".fa-spin{animation-name:fa-spin}"
+        "@font-face{font-family:\"Font Awesome 6 Free\";font-weight:900;"
+        "src:url(../webfonts/fa-solid-900.woff2) format(\"woff2\"),url(../webfonts/fa-solid-900.ttf) format(\"truetype\")}"
+        "@font-face{font-family:\"Font Awesome 6 Free\";font-weight:400;src:url(../webfonts/fa-regular-400.woff2) format(\"woff2\")}"
+        ".fa-trash:before{content:\"\\f1f8\"}"
+        ".fa-shopping-cart:before,.fa-cart-shopping:before{content:\"\\f07a\"}"
+        ".fa-zebra:before{content:\"\\e000\"}"
+        "@keyframes fa-spin{0%{transform:rotate(0deg)}to{transform:rotate(1turn)}}"
+    )
+    subset, codepoints = subset_fontawesome(css, {"trash", "cart-shopping", "spin"})
+
+    assert ".fa-trash:before" in subset and ".fa-cart-shopping:before{" in subset
+    assert "shopping-cart" not in subset and "zebra" not in subset
+    assert "fa-solid-900" in subset and "fa-regular-400" not in subset
+    assert "@keyframes fa-spin" in subset and "Font Awesome Free" in subset
+    assert codepoints == {0xF1F8, 0xF07A}
@@ -0,0 +1,118 @@
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Add parent directory to path to allow importing utils/scripts
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.cache import cache_get, cached, cached_async, make_cache
+from utils.workers import submit_to_worker
+
+
+def test_concurrent_callers_share_one_computation():
+    cache = make_cache()
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cached(cache, "k", compute))) for _ in range(5)]
+    threads[0].start()
+    started.wait()
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+    assert cache["coalesced"] == 4
+    assert not cache["inflight"]
+
+
+def test_errors_reach_all_callers_and_are_not_cached():
+    cache = make_cache()
+
+    def fail():
+        raise ValueError("boom")
+
+    for _ in range(2):
+        try:
+            cached(cache, "k", fail)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("expected ValueError")
+
+    assert cache["misses"] == 2
+    assert cache_get(cache, "k") is None
+    assert cached(cache, "k", lambda: 1) == 1
+
+
+def test_cancelled_waiter_does_not_cancel_the_computation():
+    cache = make_cache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return 42
+
+    async def scenario():
+        first = asyncio.create_task(cached_async(cache, "k", compute))
+        second = asyncio.create_task(cached_async(cache, "k", compute))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == 42
+    assert len(calls) == 1
+    assert cache["coalesced"] == 1
+    assert cache_get(cache, "k") == 42
+
+
+def test_cached_refuses_to_block_the_event_loop():
+    cache = make_cache()
+
+    async def on_loop():
+        try:
+            cached(cache, "k", lambda: 1)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("expected RuntimeError")
+        return await cached_async(cache, "k", lambda: 1)
+
+    assert asyncio.run(on_loop()) == 1
+    assert cached(cache, "k", lambda: 2) == 1  # off the loop, a hit
+
+
+def test_cached_refuses_to_wait_on_a_cached_async_computation():
+    cache = make_cache()
+    gate = threading.Event()
+
+    def slow():
+        gate.wait(5)
+        return "value"
+
+    async def scenario():
+        pending = asyncio.create_task(cached_async(cache, "k", slow))
+        await asyncio.sleep(0)  # "k" is claimed and computing on the pool
+        try:
+            await asyncio.wrap_future(submit_to_worker(cached, cache, "k", lambda: "other"))
+        except RuntimeError:
+            outcome = "raised"
+        else:
+            outcome = "waited"
+        gate.set()
+        return outcome, await pending
+
+    assert asyncio.run(scenario()) == ("raised", "value")
+    assert cached(cache, "k", lambda: "other") == "value"  # a hit once published
@@ -0,0 +1,26 @@
+import sys
+import os
+
+# Add parent directory to path to allow importing utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shiny import reactive
+from utils.cart import cart_add, cart_diff, cart_remove, product_ids, product_labels
+import numpy as np
+
+
+def test_batch_updates_and_keyed_diff():
+    names = np.array(["Artesunate", "Lenacapavir", "O'Brien's \"test\""], dtype=object)
+    cart = reactive.Value(frozenset())
+
+    with reactive.isolate():
+        cart_add(cart, product_ids(["Lenacapavir", "O'Brien's \"test\"", "Unknown"], names))
+        assert cart.get() == frozenset({1, 2})
+        assert product_labels(cart.get(), names) == ["Lenacapavir", "O'Brien's \"test\""]
+
+        before = cart.get()
+        cart_remove(cart, [1])
+        cart_add(cart, [0])
+        diff = cart_diff(before, cart.get(), names)
+
+    assert diff == {"add": [{"id": 0, "label": "Artesunate"}], "remove": [1], "count": 2}
@@ -0,0 +1,75 @@
+import sys
+import os
+import asyncio
+import threading
+
+# Add parent directory to path to allow importing utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import modules.comparison as comparison
+from utils import workers
+from utils.comparison_lists import list_lists, load_list, save_list
+from utils.data_loader import get_data
+
+
+def test_save_and_load_round_trip(tmp_path):
+    db = str(tmp_path / "lists.db")
+
+    token = save_list("Malaria set", ["Mosquirix", "Artesunate", "R21"], path=db)
+    other = save_list("Empty", [], path=db)
+
+    assert len(token) == 8 and token != other
+    assert load_list(token, path=db) == {
+        "token": token,
+        "name": "Malaria set",
+        "products": ["Mosquirix", "Artesunate", "R21"],
+    }
+    assert load_list(other, path=db)["products"] == []
+    assert load_list("missing", path=db) is None
+    assert {t for t, _ in list_lists(path=db)} == {token, other}
+
+
+def test_warming_a_saved_list_builds_off_the_event_loop(monkeypatch):
+    df = get_data()["innovation_df"]
+    names = df["innovation"].head(3).tolist()
+    threads = []
+    build = comparison._build_outputs
+    monkeypatch.setattr(
+        comparison,
+        "_build_outputs",
+        lambda *a: threads.append(threading.current_thread()) or build(*a),
+    )
+
+    async def scenario():
+        return await comparison.warm_comparison_outputs(df, names, "warm-test")
+
+    outputs = asyncio.run(scenario())
+    assert threads and threads[0] is not threading.main_thread()
+    # The shared link then renders from the warmed cache
+    assert comparison.comparison_outputs(df, names, "warm-test") is outputs
+
+
+def test_warm_behind_a_full_pool_of_readers_does_not_deadlock():
+    df = get_data()["innovation_df"]
+    names = df["innovation"].head(4).tolist()
+    threads = workers.WORKER_THREADS
+    gate = threading.Event()
+
+    async def scenario():
+        # Every thread busy, then one heatmap/timeline-style reader per thread
+        # queued ahead of the warm, all for the same product set
+        blockers = [workers.submit_to_worker(gate.wait, 5) for _ in range(threads)]
+        readers = [
+            workers.submit_to_worker(comparison.comparison_outputs, df, names, "pool-test")
+            for _ in range(threads)
+        ]
+        warm = asyncio.create_task(comparison.warm_comparison_outputs(df, names, "pool-test"))
+        await asyncio.sleep(0.05)  # the warm is queued behind the readers
+        gate.set()
+        results = await asyncio.wait_for(
+            asyncio.gather(warm, *(asyncio.wrap_future(f) for f in blockers + readers)), 10
+        )
+        return results[0], results[1 + threads:]
+
+    warmed, read = asyncio.run(scenario())
+    assert all(outputs is warmed for outputs in read)
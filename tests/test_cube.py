@@ -0,0 +1,53 @@
+import sys
+import os
+
+# Add parent directory to path to allow importing utils/scripts
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from utils.cube import build_cube, cube_counts, cube_distinct
+
+
+def _rows(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "innovation": rng.choice([f"P{i}" for i in range(150)], n),
+        "disease": rng.choice(["HIV", "Malaria", "Tuberculosis"], n),
+        "category": rng.choice(["Drug", "Vaccine", "Diagnostic"], n),
+        "trial_status": rng.choice(["Phase 1", "Phase 2", "Phase 3", None], n),
+        "scope": rng.choice(["WHO", "Kenya", "Senegal"], n),
+        "market_year": rng.choice([2025.0, 2026.0, 2030.0, np.nan], n),
+    })
+    return df
+
+
+def test_counts_match_groupby():
+    df = _rows()
+    cube = build_cube(df)
+
+    expected = df.groupby(["market_year", "category"]).size()
+    got = cube_counts(cube, by=("market_year", "category"))
+    pd.testing.assert_series_equal(got[got > 0], expected, check_names=False)
+
+    who = df[(df["scope"] == "WHO") & (df["trial_status"] != "Phase 1")]
+    assert cube_counts(cube, scope="WHO", exclude={"trial_status": "Phase 1"}) == len(who)
+    got = cube_counts(cube, by=("trial_status",), scope="WHO", disease=["HIV", "Malaria"])
+    expected = df[(df["scope"] == "WHO") & df["disease"].isin(["HIV", "Malaria"])]["trial_status"].value_counts()
+    assert dict(got) == dict(expected)
+
+    # Missing values are kept as a None label when asked for
+    got = cube_counts(cube, by=("trial_status",), dropna=False)
+    assert got[None] == df["trial_status"].isna().sum()
+    assert cube_counts(cube, disease="Unknown disease") == 0
+
+
+def test_distinct_counts():
+    df = _rows()
+    cube = build_cube(df)
+
+    malaria = df[(df["disease"] == "Malaria") & (df["scope"] == "WHO")]
+    assert cube_distinct(cube, disease="Malaria", scope="WHO") == malaria["innovation"].nunique()
+    assert cube_distinct(cube) == df["innovation"].nunique()
+    assert cube_distinct(cube, exclude={"category": ["Drug", "Vaccine", "Diagnostic"]}) == 0
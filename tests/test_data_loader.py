@@ -0,0 +1,52 @@
+import sys
+import os
+
+# Add parent directory to path to allow importing utils/scripts
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+
+from utils.data_loader import _split_scopes, country_view, horizon_view, scope_view
+
+
+def _long_frame():
+    rows = []
+    for name, disease, nra in [("A", "HIV", ("Yes", "No")), ("B", "Malaria", ("No", "No")), ("B", "Malaria", ("Yes", "Yes"))]:
+        for scope, status in zip(("WHO", "Kenya", "Senegal"), ("Yes",) + nra):
+            rows.append({
+                "innovation": name,
+                "scope": scope,
+                "disease": disease,
+                "category": "Vaccine",
+                "nra": status,
+                "proj_date_first_launch": pd.Timestamp(f"2030-01-0{len(rows) % 9 + 1}"),
+            })
+    return pd.DataFrame(rows)
+
+
+def _data(df):
+    products, scope_status = _split_scopes(df)
+    return {"products": products, "scope_status": scope_status, "columns": list(df.columns)}
+
+
+def test_products_are_stored_once_and_views_restore_the_long_frame():
+    df = _long_frame()
+    data = _data(df)
+
+    # "B" is listed twice; each listing is its own product
+    assert len(data["products"]) == 3
+    assert "category" in data["products"].columns
+    assert "proj_date_first_launch" in data["scope_status"].columns
+
+    view = horizon_view(data)
+    pd.testing.assert_frame_equal(view[df.columns], df)
+    assert len(country_view(data)) == 6
+
+
+def test_who_rows_get_per_country_approval_columns():
+    data = _data(_long_frame())
+    who = scope_view(data, ["WHO"])
+
+    assert who["Kenya_nra"].tolist() == ["Yes", "No", "Yes"]
+    assert who["Senegal_nra"].tolist() == ["No", "No", "Yes"]
+    assert horizon_view(data).loc[lambda d: d["scope"] != "WHO", "Kenya_nra"].isna().all()
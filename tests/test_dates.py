@@ -0,0 +1,55 @@
+import sys
+import os
+
+# Add parent directory to path to allow importing utils/scripts
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from utils.dates import (
+    NO_DATE, add_years, build_date_index, calendar_year, date_range_rows, day, in_range,
+    iso_dates, next_years, to_datetime64, to_days, years,
+)
+
+
+def test_round_trip_keeps_missing_dates():
+    dates = pd.Series(pd.to_datetime(["2025-01-01", None, "1949-12-31", "2120-06-30"]))
+    days = to_days(dates)
+
+    assert days.dtype == np.int32
+    assert days[1] == NO_DATE
+    assert days[0] == day("2025-01-01")
+    assert pd.Series(to_datetime64(days)).equals(dates)
+    assert iso_dates(days).tolist() == ["2025-01-01", None, "1949-12-31", "2120-06-30"]
+
+
+def test_years_and_ranges():
+    days = to_days(pd.to_datetime(["2024-12-31", "2025-01-01", None, "2028-01-01"]))
+
+    assert np.array_equal(years(days), [2024.0, 2025.0, np.nan, 2028.0], equal_nan=True)
+    assert in_range(days, start=day("2025-01-01")).tolist() == [False, True, False, True]
+
+    today = day("2025-01-01")
+    assert in_range(days, today, add_years(today, 3)).tolist() == [False, True, False, True]
+    assert add_years(day("2024-02-29"), 1) == day("2025-02-28")
+
+
+def test_sorted_index_matches_a_full_scan():
+    rng = np.random.default_rng(0)
+    days = rng.integers(day("2020-01-01"), day("2035-12-31"), 5000).astype(np.int32)
+    days[rng.random(5000) < 0.2] = NO_DATE
+    index = build_date_index(days)
+
+    windows = [
+        (None, None),
+        (day("2025-01-01"), None),
+        next_years(3, today="2025-06-15"),
+        calendar_year(2030),
+        (day("2040-01-01"), None),
+    ]
+    for start, end in windows:
+        expected = np.flatnonzero(in_range(days, start, end))
+        assert np.array_equal(date_range_rows(index, start, end), expected)
+
+    assert next_years(3, today="2025-06-15") == (day("2025-06-15"), day("2028-06-15"))
@@ -0,0 +1,38 @@
+import sys
+import os
+
+# Add parent directory to path to allow importing scripts
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.eml_matching import build_eml_index, component_key, match_eml
+import pandas as pd
+
+
+def test_component_key_normalizes_combinations():
+    expected = ("abacavir", "lamivudine")
+    assert component_key("Abacavir / Lamivudine") == expected
+    assert component_key("lamivudine + abacavir") == expected
+    assert component_key("Abacavir/Lamivudine Tablet 300mg") == expected
+    assert component_key("(Artesunate-Amodiaquine)") == ("artesunate-amodiaquine",)
+    assert component_key("(Artesunate-Amodiaquine)", split_hyphen=True) == ("amodiaquine", "artesunate")
+
+
+def test_match_eml_flags_each_scope():
+    eml = pd.DataFrame({
+        "name": ["abacavir + lamivudine", "Abacavir/Lamivudine", "Artesunate + Amodiaquine"],
+        "atc_code": ["J05AR02", None, None],
+        "scope": ["WHO", "Kenya", "Senegal"],
+    })
+    index = build_eml_index(eml)
+    horizon = pd.DataFrame({
+        "innovation": ["Lamivudine/Abacavir"] * 3 + ["Artesunate-Amodiaquine"] * 2 + ["Some RDT"],
+        "scope": ["WHO", "Kenya", "Senegal", "Senegal", "South Africa", "Kenya"],
+        "category": ["Therapeutic"] * 5 + ["Diagnostic"],
+    })
+
+    result = match_eml(horizon, index)
+
+    assert result["eml"].tolist()[:5] == ["Yes", "Yes", "No", "Yes", "No"]
+    assert pd.isna(result["eml"].iloc[5])
+    assert result["eml_date"].iloc[1] == pd.Timestamp("2023-01-01")
+    assert pd.isna(result["eml_date"].iloc[0])
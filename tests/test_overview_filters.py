@@ -0,0 +1,25 @@
+import sys
+import os
+
+# Add parent directory to path to allow importing modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.overview_and_innovations import filtered_positions, parse_filter_query
+import pandas as pd
+
+
+def test_filter_state_round_trip_and_cached_positions():
+    df = pd.DataFrame({
+        "innovation": ["A", "B", "C", "D"],
+        "disease": ["HIV", "HIV", "Malaria", "HIV"],
+        "category": ["Drug", "Vaccine", "Drug", "Drug"],
+        "trial_status": ["Phase 3", "Phase 1", "Phase 3", "Phase 2"],
+    })
+
+    state = parse_filter_query("?disease=HIV&category=Drug&list=abc&status=")
+    assert state == {"disease": "HIV", "category": "Drug"}
+
+    first = filtered_positions(df, "v-test", **state)
+    assert first.tolist() == [0, 3]
+    assert filtered_positions(df, "v-test", **state) is first
+    assert filtered_positions(df, "v-test", "All products").tolist() == [0, 2, 3]
@@ -0,0 +1,59 @@
+import sys
+import os
+
+# Add parent directory to path to allow importing utils/scripts
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from utils.dates import NO_DATE, to_days
+from utils.pipeline import cumulate, cumulative_pipeline, period_numbers, pipeline_view
+
+
+def _rows(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 365 * 8, n), unit="D")
+    days = to_days(pd.Series(dates))
+    days[rng.random(n) < 0.1] = NO_DATE
+    return pd.DataFrame({
+        "launch": days,
+        "category": rng.choice(["Drug", "Vaccine", None], n),
+        "date": pd.Series(dates).where(days != NO_DATE),
+    })
+
+
+def test_matches_groupby_cumsum_at_every_grain():
+    df = _rows()
+    for grain, freq in [("year", "Y"), ("quarter", "Q"), ("month", "M")]:
+        got = cumulative_pipeline(df["launch"], df["category"], grain=grain)
+
+        periods = df["date"].dt.to_period(freq)
+        start = pd.Period("2025-01", freq)
+        expected = (
+            df[periods >= start].groupby([periods, "category"]).size().unstack(fill_value=0)
+            .reindex(pd.period_range(start, periods.max(), freq=freq), fill_value=0)
+            .cumsum()
+        )
+        assert got[["Drug", "Vaccine"]].to_numpy().tolist() == expected.to_numpy().tolist()
+        assert len(got) == len(expected)
+
+    quarters = cumulative_pipeline(df["launch"], grain="quarter")
+    assert quarters["quarter"].iloc[0] == pd.Timestamp("2025-01-01")
+    assert quarters.columns.tolist() == ["quarter", "All"]
+
+
+def test_weighted_counts_and_empty_input():
+    # Pre-aggregated (year, category) counts, as the harmonizer merges them
+    got = cumulate([2025, 2027, 2026], ["Drug", "Drug", "Vaccine"], weights=[3, 2, 1])
+    assert got.to_dict("list") == {"year": [2025, 2026, 2027], "Drug": [3, 3, 5], "Vaccine": [0, 1, 1]}
+
+    empty = cumulate([], [])
+    assert empty["year"].tolist() == list(range(2025, 2036))
+    assert period_numbers(to_days(pd.Series(pd.to_datetime(["2025-05-02"]))), "quarter")[0] == 2025 * 4 + 1
+
+
+def test_views_are_cached():
+    df = _rows()
+    first = pipeline_view(df, "test-version", column="launch", grain="month")
+    assert pipeline_view(df, "test-version", column="launch", grain="month") is first
@@ -0,0 +1,32 @@
+import sys
+import os
+import asyncio
+
+# Add parent directory to path to allow importing utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.product_search import build_product_search, get_product_search, search_products
+import pandas as pd
+
+
+def test_search_ranks_prefix_then_tokens_then_fuzzy():
+    horizon = pd.DataFrame({
+        "innovation": ["Lenacapavir", "Bictegravir/Lenacapavir", "Dapivirine ring", "Lenacapavir", "RTS,S"],
+        "alternative_names": ["Sunlenca", None, "DPV-VR", "Sunlenca", "Mosquirix"],
+        "manufacturer": ["Gilead", "Gilead", "IPM", "Gilead", "GSK"],
+        "disease": ["HIV", "HIV", "HIV", "HIV", "Malaria"],
+    })
+    index = build_product_search(horizon)
+
+    assert search_products(index, "lena") == ["Lenacapavir", "Bictegravir/Lenacapavir"]
+    assert search_products(index, "gilead sunl") == ["Lenacapavir"]
+    assert search_products(index, "mosqirix") == ["RTS,S"]
+    assert search_products(index, "", limit=2) == ["Bictegravir/Lenacapavir", "Dapivirine ring"]
+
+
+def test_index_is_shared_per_data_version():
+    products = pd.DataFrame({"innovation": ["Lenacapavir", "RTS,S"], "disease": ["HIV", "Malaria"]})
+    first = asyncio.run(get_product_search(products, "version-1"))
+
+    assert asyncio.run(get_product_search(products, "version-1")) is first
+    assert asyncio.run(get_product_search(products, "version-2")) is not first
@@ -0,0 +1,67 @@
+import sys
+import os
+import asyncio
+
+# Add parent directory to path to allow importing utils/scripts
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shiny import reactive
+
+from utils.reactivity import debounce
+
+
+def test_debounce_publishes_only_the_settled_value():
+    async def scenario():
+        source = reactive.Value("all")
+        settled = debounce(source, 0.1)
+        seen = []
+
+        @reactive.Effect
+        def _record():
+            seen.append(settled())
+
+        await reactive.flush()
+        for value in ("HIV", "Malaria", "Tuberculosis"):
+            source.set(value)
+            await reactive.flush()
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(0.2)
+        await reactive.flush()
+        _record.destroy()
+        return seen
+
+    assert asyncio.run(scenario()) == ["all", "Tuberculosis"]
+
+
+def test_debounce_timer_waits_for_a_visible_tab(monkeypatch):
+    import utils.sessions as sessions
+
+    async def scenario():
+        visible = reactive.Value(False)
+        monkeypatch.setattr(sessions, "tab_visible", lambda session=None: visible())
+        source = reactive.Value("all")
+        settled = debounce(source, 0.05)
+        seen = []
+
+        @reactive.Effect
+        def _record():
+            seen.append(settled())
+
+        await reactive.flush()
+        source.set("HIV")
+        await reactive.flush()
+        await asyncio.sleep(0.15)
+        await reactive.flush()
+        hidden = list(seen)
+
+        # Showing the tab publishes the value that settled in the background
+        visible.set(True)
+        await reactive.flush()
+        await asyncio.sleep(0.1)
+        await reactive.flush()
+        _record.destroy()
+        return hidden, seen
+
+    hidden, seen = asyncio.run(scenario())
+    assert hidden == ["all"]
+    assert seen == ["all", "HIV"]
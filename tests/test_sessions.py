@@ -0,0 +1,60 @@
+import sys
+import os
+from collections import OrderedDict
+from types import SimpleNamespace
+
+# Add parent directory to path to allow importing utils/scripts
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+from shiny import reactive
+
+from utils import sessions
+
+
+def _fake_session(session_id):
+    session = SimpleNamespace(id=session_id)
+    session.root_scope = lambda: session
+    return session
+
+
+def _add_record(session, last_active):
+    sessions._SESSIONS[session.id] = {
+        "session": session,
+        "last_active": last_active,
+        "idle": reactive.Value(False),
+        "holders": OrderedDict(),
+    }
+
+
+def test_idle_sessions_release_and_rehydrate_their_objects():
+    sessions._SESSIONS.clear()
+    old, recent = _fake_session("old"), _fake_session("recent")
+    _add_record(old, last_active=0.0)
+    _add_record(recent, last_active=1000.0)
+
+    released_frames = []
+    frame = pd.DataFrame({"innovation": ["A", "B"] * 100})
+    held = sessions.session_resource(
+        "frame", frame, lambda: released_frames.append("frame"), session=old
+    )
+    sessions.session_resource("figure", {"data": [frame["innovation"].to_numpy()]}, session=old)
+    sessions.session_resource("frame", frame, session=recent)
+
+    assert held is frame
+    metrics = sessions.session_metrics()
+    assert metrics["bytes_by_object"]["frame"] == sessions.object_bytes(frame) * 2
+    assert metrics["bytes_held"] > sessions.object_bytes(frame) * 2
+
+    released, to_close = sessions.sweep_sessions(now=1000.0 + 1)
+    assert released and to_close == []
+    assert released_frames == ["frame"]
+    metrics = sessions.session_metrics()
+    assert metrics["idle"] == 1
+    assert metrics["bytes_held"] == sessions.object_bytes(frame)
+
+    sessions.touch(old)
+    with reactive.isolate():
+        assert not sessions._SESSIONS["old"]["idle"]()
+    assert list(sessions._SESSIONS) == ["recent", "old"]
+    sessions._SESSIONS.clear()
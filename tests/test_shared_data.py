@@ -0,0 +1,80 @@
+import sys
+import os
+import asyncio
+from collections.abc import Mapping
+
+# Add parent directory to path to allow importing modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from modules.comparison import comparison_outputs, heatmap_html, timeline_figure
+from modules.overview_and_innovations import UPTAKE_FROM, filtered_positions, pipeline_grid_frame, table_rows
+from utils.data_loader import get_data, horizon_view
+from utils.dates import date_range_rows
+from utils.product_search import build_product_search
+from utils.text_search import get_text_index, search_text
+
+
+def _fingerprint(data):
+    prints = {}
+    for name, value in data.items():
+        if isinstance(value, pd.DataFrame):
+            prints[name] = (
+                tuple(value.columns),
+                tuple(map(str, value.dtypes)),
+                int(pd.util.hash_pandas_object(value, index=True).sum()),
+            )
+        elif isinstance(value, np.ndarray):
+            prints[name] = tuple(value.ravel().tolist())
+        elif isinstance(value, Mapping):
+            # Date indexes and the count cube
+            prints[name] = _fingerprint(value)
+        else:
+            prints[name] = value
+    return prints
+
+
+def test_interactions_do_not_mutate_the_shared_dataset():
+    data = get_data()
+    before = _fingerprint(data)
+    innovation_df = data["innovation_df"]
+    names = data["product_names"][:5].tolist()
+
+    # Overview: filters, explorer table, text search
+    for disease, category in [(None, None), ("Malaria", None), ("HIV", "Vaccine")]:
+        rows = innovation_df.iloc[
+            filtered_positions(innovation_df, "mutation-test", disease, category)
+        ]
+        hits = search_text(asyncio.run(get_text_index(innovation_df, "mutation-test")), "malaria vaccine")
+        uptake_rows = date_range_rows(data["date_indexes"]["proj_date_lmic_20_uptake"], start=UPTAKE_FROM)
+        grid = pipeline_grid_frame(table_rows(rows, hits, uptake_rows))
+        grid["Product"] = "changed"
+
+    # Comparison: heatmap, timeline, product search
+    heatmap_html(comparison_outputs(innovation_df, names, "mutation-test")["table"])
+    timeline_figure(innovation_df, names, "mutation-test")
+    build_product_search(data["products"])
+
+    # Writes to derived frames stay local
+    view = horizon_view(data)
+    view.loc[:, "innovation"] = "changed"
+    subset = innovation_df[innovation_df["disease"] == "Malaria"]
+    subset["category"] = "changed"
+    column = innovation_df["category"]
+    column.iloc[0] = "changed"  # would write through to the dataset without copy-on-write
+
+    assert _fingerprint(data) == before
+
+
+def test_shared_dataset_is_read_only():
+    data = get_data()
+    try:
+        data["innovation_df"] = pd.DataFrame()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("expected the dataset mapping to be read-only")
+    assert not data["product_names"].flags.writeable
+    assert not data["date_indexes"]["proj_date_first_launch"]["rows"].flags.writeable
@@ -0,0 +1,76 @@
+import sys
+import os
+import asyncio
+
+# Add parent directory to path to allow importing utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import text_search
+from utils.text_search import build_text_index, get_text_index, search_text, update_text_index
+import pandas as pd
+
+
+def _products():
+    return pd.DataFrame({
+        "innovation": ["Cabotegravir LA", "Bioline Malaria Ag", "Artesunate", "Dapivirine ring"],
+        "indication": [
+            "Long-acting injectable PrEP for HIV prevention",
+            "Rapid diagnostic test for malaria",
+            "Treatment of severe malaria",
+            "Monthly vaginal ring for HIV prevention",
+        ],
+        "manufacturer": ["ViiV", "Abbott", "Fosun", "IPM"],
+    })
+
+
+def test_bm25_ranks_best_match_first():
+    index = build_text_index(_products())
+
+    assert search_text(index, "long acting injectables PrEP")["innovation"].iloc[0] == "Cabotegravir LA"
+    assert search_text(index, "rapid diagnostic malaria")["innovation"].tolist()[:2] == [
+        "Bioline Malaria Ag",
+        "Artesunate",
+    ]
+    assert search_text(index, "zzz").empty
+
+
+def test_incremental_update_matches_rebuild():
+    index = build_text_index(_products())
+
+    updated = _products().iloc[1:].copy()
+    updated.loc[2, "indication"] = "Injectable treatment of severe malaria"
+    updated.loc[len(updated) + 1] = ["Lenacapavir", "Twice-yearly injectable PrEP", "Gilead"]
+    before = search_text(index, "HIV prevention ring")
+    incremental = update_text_index(index, updated)
+    rebuilt = build_text_index(updated)
+
+    # The previous index is left as it was for sessions still searching it
+    assert search_text(index, "HIV prevention ring").equals(before)
+    for query in ["injectable PrEP", "malaria", "HIV prevention ring"]:
+        a = search_text(incremental, query).sort_values("innovation").reset_index(drop=True)
+        b = search_text(rebuilt, query).sort_values("innovation").reset_index(drop=True)
+        assert a["innovation"].tolist() == b["innovation"].tolist()
+        assert (a["score"] - b["score"]).abs().max() < 1e-9
+
+
+def test_index_is_built_once_per_data_version(monkeypatch):
+    monkeypatch.setitem(text_search._INDEX, "latest", None)
+    calls = []
+    monkeypatch.setattr(
+        text_search, "_next_text_index",
+        lambda df, next_index=text_search._next_text_index: calls.append(len(df)) or next_index(df),
+    )
+    products = _products()
+
+    async def scenario():
+        first = await get_text_index(products, "text-v1")
+        same = await get_text_index(products, "text-v1")
+        newer = await get_text_index(products.iloc[1:], "text-v2")
+        return first, same, newer
+
+    first, same, newer = asyncio.run(scenario())
+    assert same is first
+    assert calls == [4, 3]  # once per version
+    assert newer is not first
+    assert "Cabotegravir LA" in search_text(first, "PrEP")["innovation"].tolist()
+    assert search_text(newer, "PrEP").empty
@@ -0,0 +1,42 @@
+import sys
+import os
+
+# Add parent directory to path to allow importing utils/scripts
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.trigram_index import build_trigram_index, trigram_link, trigram_search
+from scripts.build_product_aliases import build_aliases
+import pandas as pd
+
+
+def test_search_and_batch_link_agree():
+    index = build_trigram_index(
+        ["Lenacapavir", "Sunlenca", "Islatravir", "Dapivirine ring"],
+        keys=["Lenacapavir", "Lenacapavir", "Islatravir", "Dapivirine ring"],
+    )
+
+    top = trigram_search(index, "lenacapavr", k=5, cutoff=0.3)
+    assert top["key"].tolist() == ["Lenacapavir"]
+
+    queries = ["SUNLENCA", "dapivirine vaginal ring", "unrelated"]
+    links = trigram_link(index, queries, cutoff=0.4)
+    assert links["key"].tolist()[:2] == ["Lenacapavir", "Dapivirine ring"]
+    assert pd.isna(links["key"].iloc[2])
+    for query, key in zip(queries[:2], links["key"][:2]):
+        assert trigram_search(index, query, k=1, cutoff=0.4)["key"].iloc[0] == key
+
+
+def test_build_aliases_shortens_long_names_and_resolves_chains():
+    long_name = "Emtricitabine/Levonorgestrel " * 5
+    horizon = pd.DataFrame({
+        "innovation": [long_name, "Lenacapavir"],
+        "alternative_names": ["Dual Prevention Pill", "Sunlenca; LEN"],
+    })
+
+    aliases = build_aliases(horizon, incoming=[long_name.lower(), "Sunlenca", "Lenacapavir"])
+    mapping = dict(zip(aliases["alias"], aliases["innovation"]))
+
+    assert mapping[long_name] == "Dual Prevention Pill"
+    assert mapping[long_name.lower()] == "Dual Prevention Pill"
+    assert mapping["Sunlenca"] == "Lenacapavir"
+    assert "Lenacapavir" not in mapping
@@ -0,0 +1,124 @@
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Add parent directory to path to allow importing utils/scripts
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shiny import reactive
+
+from utils import workers
+
+
+def test_admission_limits_concurrency_and_hands_over_slots(monkeypatch):
+    monkeypatch.setitem(workers.ADMISSION_LIMITS, "test_limit", 2)
+    running = {"now": 0, "max": 0}
+
+    def compute(i):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        time.sleep(0.05)
+        running["now"] -= 1
+        return i
+
+    async def scenario():
+        return await asyncio.gather(
+            *(workers.run_admitted("test_limit", compute, i) for i in range(6))
+        )
+
+    assert asyncio.run(scenario()) == list(range(6))
+    assert running["max"] <= 2
+    metrics = workers.admission_metrics()["test_limit"]
+    assert metrics["admitted"] == 6
+    assert metrics["active"] == 0 and metrics["queue_depth"] == 0
+
+
+def test_requests_are_shed_when_the_queue_is_full_or_times_out(monkeypatch):
+    monkeypatch.setitem(workers.ADMISSION_LIMITS, "test_shed", 1)
+    monkeypatch.setattr(workers, "ADMISSION_QUEUE_DEPTH", 1)
+    monkeypatch.setattr(workers, "ADMISSION_TIMEOUT", 0.05)
+
+    async def scenario():
+        release = await workers.admit("test_shed")
+        waiting = asyncio.create_task(workers.admit("test_shed"))
+        await asyncio.sleep(0)
+        outcomes = []
+        for request in (workers.admit("test_shed"), waiting):
+            try:
+                await request
+                outcomes.append("admitted")
+            except TimeoutError:
+                outcomes.append("shed")
+        release()
+        return outcomes
+
+    assert asyncio.run(scenario()) == ["shed", "shed"]
+    metrics = workers.admission_metrics()["test_shed"]
+    assert metrics["shed"] == 2 and metrics["timed_out"] == 1
+    assert metrics["active"] == 0 and metrics["queue_depth"] == 0
+
+
+def test_superseded_computation_is_cancelled_and_never_published():
+    started = threading.Event()
+    finish = threading.Event()
+
+    def compute(x):
+        if x == 1:
+            started.set()
+            finish.wait(5)  # still running when the argument changes
+        return x * 10
+
+    async def scenario():
+        x = reactive.Value(1)
+        calc = workers.worker_calc(compute, lambda: (x(),))
+        published = []
+
+        @reactive.Effect
+        def _observe():
+            published.append(calc())
+
+        await reactive.flush()
+        await asyncio.to_thread(started.wait, 5)
+        cancelled = workers.worker_metrics()["cancelled"]
+        x.set(2)
+        await reactive.flush()
+        finish.set()
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if published:
+                break
+        await asyncio.sleep(0.1)  # the stale thread has finished by now
+        await reactive.flush()
+        return published, workers.worker_metrics()["cancelled"] - cancelled
+
+    published, cancelled = asyncio.run(scenario())
+    assert published == [20]
+    assert cancelled == 1
+
+
+def test_cancelled_waiter_released_during_cancellation_keeps_its_error(monkeypatch):
+    monkeypatch.setitem(workers.ADMISSION_LIMITS, "test_cancel", 1)
+
+    async def scenario():
+        release = await workers.admit("test_cancel")
+        waiting = asyncio.create_task(workers.admit("test_cancel"))
+        await asyncio.sleep(0)  # queued
+        waiting.cancel()
+        await asyncio.sleep(0)  # its wait is being cancelled
+        release()  # drops the cancelled waiter from the queue
+        try:
+            await waiting
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+        except ValueError:
+            outcome = "ValueError"
+        else:
+            outcome = "admitted"
+        (await workers.admit("test_cancel"))()
+        return outcome
+
+    assert asyncio.run(scenario()) == "cancelled"
+    metrics = workers.admission_metrics()["test_cancel"]
+    assert metrics["active"] == 0 and metrics["queue_depth"] == 0
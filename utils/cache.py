@@ -0,0 +1,258 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Named caches reported by `cache_metrics`
+_CACHES = {}
+
+# Admission waits started by `cached_async` (referenced until they finish)
+_PENDING = set()
+
+
+def make_cache(maxsize: int = 128, name: str = None) -> dict:
+    """
+    Creates a process-wide LRU cache.
+
+    Usage:
+        Module-level caches of computed outputs shared by all sessions
+        (e.g. comparison tables, filtered row ids).
+
+    The cache is safe to use from worker threads (`utils.workers`), and
+    `cached` / `cached_async` compute each missing key only once even when
+    several sessions ask for it at the same time. Use one of the two per
+    cache: a key claimed by `cached_async` is computed by a job queued on
+    the pool, and pool threads blocking on it in `cached` could hold every
+    thread that job needs (`cached` raises instead of waiting).
+
+    Args:
+        maxsize (int): Number of entries kept; the least recently used entry
+                       is evicted first.
+        name (str, optional): Label in `cache_metrics`.
+
+    Returns:
+        dict: Cache state for `cache_get` / `cache_set`.
+    """
+    cache = {
+        "maxsize": maxsize,
+        "items": OrderedDict(),
+        "hits": 0,
+        "misses": 0,
+        "coalesced": 0,
+        "inflight": {},
+        "lock": threading.RLock(),
+    }
+    if name is not None:
+        _CACHES[name] = cache
+    return cache
+
+
+def cache_get(cache: dict, key, default=None):
+    """
+    Looks up a key and marks it as recently used.
+
+    Args:
+        cache (dict): Output of `make_cache`.
+        key: Hashable key.
+        default: Returned when the key is missing.
+
+    Returns:
+        The cached value, or `default`.
+    """
+    with cache["lock"]:
+        items = cache["items"]
+        if key in items:
+            items.move_to_end(key)
+            cache["hits"] += 1
+            return items[key]
+        cache["misses"] += 1
+        return default
+
+
+def cache_set(cache: dict, key, value):
+    """
+    Stores a value, evicting the least recently used entries over `maxsize`.
+
+    Args:
+        cache (dict): Output of `make_cache`.
+        key: Hashable key.
+        value: Value to store.
+
+    Returns:
+        The stored value.
+    """
+    with cache["lock"]:
+        items = cache["items"]
+        items[key] = value
+        items.move_to_end(key)
+        while len(items) > cache["maxsize"]:
+            items.popitem(last=False)
+    return value
+
+
+# --- Single-flight computation ---
+
+def _claim(cache: dict, key, caller: str):
+    """
+    Looks up `key`, or joins / starts its computation.
+
+    Args:
+        cache (dict): Output of `make_cache`.
+        key: Hashable key.
+        caller (str): "cached" or "cached_async", recorded as the owner of
+                      a computation the caller starts.
+
+    Returns:
+        tuple: ("hit", value), ("wait", future) if another caller is
+               computing it, or ("own", future) if the caller must compute
+               it and publish the result with `_publish`.
+    """
+    with cache["lock"]:
+        items = cache["items"]
+        if key in items:
+            items.move_to_end(key)
+            cache["hits"] += 1
+            return "hit", items[key]
+        inflight = cache["inflight"].get(key)
+        if inflight is not None:
+            future, owner = inflight
+            if caller == "cached" and owner == "cached_async":
+                raise RuntimeError(
+                    f"cached() would block on {key!r}, which cached_async() is computing "
+                    "on the worker pool; use one access mode per cache"
+                )
+            cache["coalesced"] += 1
+            return "wait", future
+        cache["misses"] += 1
+        future = Future()
+        cache["inflight"][key] = (future, caller)
+        return "own", future
+
+
+def _abandon(cache: dict, key, future: Future, error: BaseException):
+    """Ends a computation without caching, passing `error` to the waiters."""
+    with cache["lock"]:
+        cache["inflight"].pop(key, None)
+    if not future.done():
+        future.set_exception(error)
+
+
+def _publish(cache: dict, key, future: Future, compute):
+    """Runs `compute`, caches its value and resolves `future` for the waiters."""
+    try:
+        value = compute()
+    except BaseException as e:
+        _abandon(cache, key, future, e)
+        raise
+    with cache["lock"]:
+        cache_set(cache, key, value)
+        cache["inflight"].pop(key, None)
+    future.set_result(value)
+    return value
+
+
+def cached(cache: dict, key, compute):
+    """
+    Returns the cached value for `key`, computing and storing it on a miss.
+
+    Worker threads and scripts only: concurrent callers with the same key
+    (e.g. worker threads serving different sessions) block until the first
+    caller's computation finishes instead of repeating it. If it fails,
+    they all receive the error and nothing is cached. Event-loop callers
+    use `cached_async`, which awaits the computation instead. A cache filled
+    by `cached_async` must not be read with `cached`: waiting on a key
+    `cached_async` is computing raises `RuntimeError` (see `make_cache`).
+
+    Args:
+        cache (dict): Output of `make_cache`.
+        key: Hashable key.
+        compute (callable): Called with no arguments on a miss.
+
+    Returns:
+        The cached or freshly computed value. Raises `RuntimeError` when
+        called from a running event loop, or when the key is being computed
+        by `cached_async`.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass  # worker thread or script
+    else:
+        raise RuntimeError("cached() would block the event loop; use cached_async()")
+
+    state, value = _claim(cache, key, "cached")
+    if state == "hit":
+        return value
+    if state == "wait":
+        return value.result()
+    return _publish(cache, key, value, compute)
+
+
+async def _publish_admitted(cache: dict, key, future: Future, compute, output_class):
+    from .workers import run_admitted
+
+    try:
+        await run_admitted(output_class, _publish, cache, key, future, compute)
+    except BaseException as e:
+        _abandon(cache, key, future, e)
+
+
+async def cached_async(cache: dict, key, compute, output_class: str = None):
+    """
+    `cached` for event-loop callers: a miss is computed on the worker pool.
+
+    Key Logic:
+        1.  The first caller submits `compute` to the pool; later callers
+            with the same key await the same future.
+        2.  Cancelling a caller (e.g. a superseded extended task) only stops
+            its own wait. The computation finishes and fills the cache for
+            the others.
+        3.  With an `output_class`, the computation first waits for an
+            admission slot (`utils.workers.admit`); if it is shed, every
+            caller receives the `TimeoutError`.
+
+    Args:
+        cache (dict): Output of `make_cache`.
+        key: Hashable key.
+        compute (callable): Synchronous, non-reactive function.
+        output_class (str, optional): Key of `ADMISSION_LIMITS`.
+
+    Returns:
+        The cached or freshly computed value.
+    """
+    from .workers import submit_to_worker  # workers imports this module
+
+    state, value = _claim(cache, key, "cached_async")
+    if state == "hit":
+        return value
+    if state == "own":
+        if output_class is None:
+            submit_to_worker(_publish, cache, key, value, compute)
+        else:
+            # Not tied to this caller, so cancelling it does not drop the queued request
+            task = asyncio.get_running_loop().create_task(
+                _publish_admitted(cache, key, value, compute, output_class)
+            )
+            _PENDING.add(task)
+            task.add_done_callback(_PENDING.discard)
+    return await asyncio.shield(asyncio.wrap_future(value))
+
+
+def cache_metrics() -> dict:
+    """
+    Size and hit/miss/coalesced counts of the named caches, for `/metrics`.
+
+    Returns:
+        dict: {cache name: counts}.
+    """
+    return {
+        name: {
+            "size": len(cache["items"]),
+            "maxsize": cache["maxsize"],
+            "hits": cache["hits"],
+            "misses": cache["misses"],
+            "coalesced": cache["coalesced"],
+            "inflight": len(cache["inflight"]),
+        }
+        for name, cache in _CACHES.items()
+    }
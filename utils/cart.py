@@ -0,0 +1,90 @@
+import numpy as np
+
+
+def product_ids(names, product_names: np.ndarray) -> list:
+    """
+    Converts product names to integer product ids.
+
+    Usage:
+        Called by the modules when products are added to or removed from the
+        comparison cart.
+
+    Args:
+        names (list): Innovation names.
+        product_names (np.ndarray): `load_data()["product_names"]`.
+
+    Returns:
+        list: Ids of the names that exist; unknown names are skipped.
+    """
+    names = np.asarray([n for n in names if isinstance(n, str)], dtype=object)
+    if len(names) == 0 or len(product_names) == 0:
+        return []
+    pos = np.searchsorted(product_names, names)
+    pos = np.minimum(pos, len(product_names) - 1)
+    return pos[product_names[pos] == names].tolist()
+
+
+def product_labels(ids, product_names: np.ndarray) -> list:
+    """
+    Converts product ids back to innovation names.
+
+    Args:
+        ids (iterable): Product ids.
+        product_names (np.ndarray): `load_data()["product_names"]`.
+
+    Returns:
+        list: Names, in id order.
+    """
+    ids = sorted(i for i in ids if 0 <= i < len(product_names))
+    return product_names[ids].tolist()
+
+
+def cart_add(cart, ids):
+    """
+    Adds a batch of product ids to the cart in a single update.
+
+    Args:
+        cart (reactive.Value): Cart holding a frozenset of product ids.
+        ids (iterable): Product ids to add.
+    """
+    current = cart.get()
+    new = current | frozenset(int(i) for i in ids)
+    if new != current:
+        cart.set(new)
+
+
+def cart_remove(cart, ids):
+    """
+    Removes a batch of product ids from the cart in a single update.
+
+    Args:
+        cart (reactive.Value): Cart holding a frozenset of product ids.
+        ids (iterable): Product ids to remove.
+    """
+    current = cart.get()
+    new = current - frozenset(int(i) for i in ids)
+    if new != current:
+        cart.set(new)
+
+
+def cart_diff(old: frozenset, new: frozenset, product_names: np.ndarray) -> dict:
+    """
+    Keyed difference between two cart states, as sent to the cart popover.
+
+    Args:
+        old (frozenset): Product ids currently shown.
+        new (frozenset): Product ids in the cart.
+        product_names (np.ndarray): `load_data()["product_names"]`.
+
+    Returns:
+        dict: {"add": [{"id", "label"}, ...], "remove": [id, ...], "count": int}
+    """
+    added = sorted(i for i in new - old if 0 <= i < len(product_names))
+    return {
+        "add": [
+            {"id": i, "label": label}
+            for i, label in zip(added, product_labels(added, product_names))
+        ],
+        "remove": sorted(old - new),
+        "count": len(new),
+    }
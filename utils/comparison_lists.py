@@ -0,0 +1,131 @@
+import secrets
+import sqlite3
+from datetime import datetime, timezone
+
+from .config import LISTS_DB_PATH
+
+# Characters in a share token (token_urlsafe(6) gives 8)
+TOKEN_BYTES = 6
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS comparison_lists (
+    token TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS comparison_list_items (
+    token TEXT NOT NULL REFERENCES comparison_lists(token) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    product TEXT NOT NULL,
+    PRIMARY KEY (token, position)
+) WITHOUT ROWID;
+"""
+
+
+def _connect(path: str = LISTS_DB_PATH) -> sqlite3.Connection:
+    """
+    Opens the comparison-list database, creating the tables on first use.
+
+    Args:
+        path (str): SQLite file.
+
+    Returns:
+        sqlite3.Connection: Open connection (use as a context manager to commit).
+    """
+    con = sqlite3.connect(path)
+    con.execute("PRAGMA foreign_keys = ON")
+    con.executescript(SCHEMA)
+    return con
+
+
+def save_list(name: str, products: list, path: str = LISTS_DB_PATH) -> str:
+    """
+    Stores a named comparison list and returns its share token.
+
+    Products are stored by name rather than id, because ids are positions in
+    the current data and shift when products are added.
+
+    Args:
+        name (str): Display name of the list.
+        products (list): Innovation names, in display order.
+        path (str): SQLite file.
+
+    Returns:
+        str: Short URL-safe token identifying the list.
+    """
+    con = _connect(path)
+    try:
+        with con:
+            while True:
+                token = secrets.token_urlsafe(TOKEN_BYTES)
+                try:
+                    con.execute(
+                        "INSERT INTO comparison_lists (token, name, created_at) VALUES (?, ?, ?)",
+                        (token, name, datetime.now(timezone.utc).isoformat(timespec="seconds")),
+                    )
+                    break
+                except sqlite3.IntegrityError:
+                    continue
+            con.executemany(
+                "INSERT INTO comparison_list_items (token, position, product) VALUES (?, ?, ?)",
+                [(token, i, product) for i, product in enumerate(products)],
+            )
+    finally:
+        con.close()
+    return token
+
+
+def load_list(token: str, path: str = LISTS_DB_PATH):
+    """
+    Resolves a share token to its list.
+
+    The contents come from a single query on the items' primary key.
+
+    Args:
+        token (str): Share token.
+        path (str): SQLite file.
+
+    Returns:
+        dict | None: {"token", "name", "products"}, or None for unknown tokens.
+    """
+    con = _connect(path)
+    try:
+        rows = con.execute(
+            """
+            SELECT l.name, i.product
+            FROM comparison_lists AS l
+            LEFT JOIN comparison_list_items AS i ON i.token = l.token
+            WHERE l.token = ?
+            ORDER BY i.position
+            """,
+            (token,),
+        ).fetchall()
+    finally:
+        con.close()
+
+    if not rows:
+        return None
+    return {
+        "token": token,
+        "name": rows[0][0],
+        "products": [product for _, product in rows if product is not None],
+    }
+
+
+def list_lists(path: str = LISTS_DB_PATH) -> list:
+    """
+    All saved lists, newest first.
+
+    Args:
+        path (str): SQLite file.
+
+    Returns:
+        list: (token, name) tuples.
+    """
+    con = _connect(path)
+    try:
+        return con.execute(
+            "SELECT token, name FROM comparison_lists ORDER BY created_at DESC, name"
+        ).fetchall()
+    finally:
+        con.close()
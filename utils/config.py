@@ -15,3 +15,50 @@ COLORS = {
     "fg": "#212529",
     "status_colors": ["#10b981", "#3b82f6", "#f59e0b", "#ef4444", "#8b5cf6", "#ec4899"],
 }
+
+# Product alias table (alias -> display name), built by scripts/build_product_aliases.py
+ALIAS_PATH = "www/product_aliases.csv"
+
+# Saved comparison lists (SQLite; kept out of www/ so it is not served)
+LISTS_DB_PATH = "data/comparison_lists.db"
+
+# Session lifecycle (utils/sessions.py)
+SESSION_IDLE_TIMEOUT = 15 * 60          # seconds without user activity before a session is released
+SESSIONS_MEMORY_CAP = 512 * 2**20       # bytes all sessions may hold before the least recently active are released
+MAX_SESSIONS = 200                      # live sessions before the least recently active are closed
+SESSION_SWEEP_INTERVAL = 30             # seconds between idle/cap sweeps
+
+# Built static assets (scripts/build_assets.py): logical name -> fingerprinted path under www/
+ASSET_MANIFEST_PATH = "www/asset_manifest.json"
+
+# Third-party front-end assets vendored into www/vendor by scripts/build_assets.py
+# (the CDN URL is used as-is until the build has been run)
+VENDOR_SOURCES = {
+    "fontawesome.css": "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css",
+    "fonts.css": "https://fonts.googleapis.com/css2?family=Inter:wght@400;700&family=Inter+Tight:wght@400;700&display=swap",
+}
+
+# Worker pool for heavy reactive computations (utils/workers.py)
+WORKER_THREADS = 4                      # computations running at once, across sessions
+LAG_SAMPLE_INTERVAL = 0.5               # seconds between event-loop lag samples
+LAG_STALL_THRESHOLD = 0.1               # lag (seconds) counted as a stall
+
+# Admission control for expensive outputs (utils/workers.py)
+ADMISSION_LIMITS = {                    # computations running at once, per output class
+    "heatmap": 2,
+    "timeline": 2,
+    "datagrid": 2,
+}
+ADMISSION_QUEUE_DEPTH = 16              # requests waiting per class before new ones are shed
+ADMISSION_TIMEOUT = 10                  # seconds a request waits for a slot before it is shed
+ADMISSION_RETRY = 5                     # seconds before a shed output tries again
+
+# Overview filter changes closer together than this are applied as one (seconds)
+FILTER_DEBOUNCE = 0.3
+
+# "Upcoming launches" lists projected first launches within this many years
+LAUNCH_WINDOW_YEARS = 3
+
+# Cumulative pipeline charts start in this year; with no dated rows they end in PIPELINE_END_YEAR
+PIPELINE_START_YEAR = 2025
+PIPELINE_END_YEAR = 2035
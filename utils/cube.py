@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+
+# Dimensions of the count cube, in axis order
+CUBE_DIMENSIONS = ("disease", "category", "trial_status", "scope", "market_year")
+
+
+# --- 1. Build ---
+
+def build_cube(df: pd.DataFrame, dims=CUBE_DIMENSIONS, distinct: str = "innovation") -> dict:
+    """
+    Dense row-count cube over categorical dimensions.
+
+    Usage:
+        Built once per dataset version by `load_data` (as `data["cube"]`) and
+        queried with `cube_counts` / `cube_distinct` by the Overview charts,
+        KPIs and the pipeline / readiness aggregates.
+
+    Key Logic:
+        1.  Each dimension is factorized to integer codes (labels sorted);
+            missing values get one extra code at the end of the axis.
+        2.  The codes are combined with `np.ravel_multi_index` and counted in
+            one `np.bincount` pass, then reshaped to one axis per dimension.
+        3.  For distinct counts, the unique (cell, `distinct` value) pairs are
+            kept, since distinct counts cannot be summed across cells.
+
+    Args:
+        df (pd.DataFrame): Long-format rows (one per product and scope).
+        dims (tuple): Columns used as cube axes.
+        distinct (str): Column whose distinct values `cube_distinct` counts.
+
+    Returns:
+        dict: {"dims", "labels" (per dimension, None last for missing),
+               "counts", "pair_cells", "pair_items", "n_items"}.
+    """
+    codes, labels = [], {}
+    for dim in dims:
+        dim_codes, uniques = pd.factorize(df[dim], sort=True)
+        dim_codes[dim_codes < 0] = len(uniques)
+        codes.append(dim_codes)
+        labels[dim] = list(uniques) + [None]
+
+    shape = tuple(len(labels[dim]) for dim in dims)
+    cells = np.ravel_multi_index(codes, shape) if len(df) else np.array([], dtype=np.int64)
+    counts = np.bincount(cells, minlength=int(np.prod(shape))).reshape(shape)
+
+    item_codes, items = pd.factorize(df[distinct])
+    n_items = max(len(items), 1)
+    keep = item_codes >= 0
+    pairs = np.unique(cells[keep].astype(np.int64) * n_items + item_codes[keep])
+
+    cube = {
+        "dims": tuple(dims),
+        "labels": labels,
+        "counts": counts,
+        "pair_cells": pairs // n_items,
+        "pair_items": pairs % n_items,
+        "n_items": n_items,
+    }
+    for name in ("counts", "pair_cells", "pair_items"):
+        cube[name].flags.writeable = False
+    return cube
+
+
+# --- 2. Queries ---
+
+def _selection(cube: dict, filters: dict, exclude: dict = None) -> tuple:
+    """
+    Positions kept along each axis for `filters` / `exclude`.
+
+    A filter value is a label or a list of labels; dimensions without a
+    filter keep every position (missing values included). Unknown labels
+    match nothing.
+    """
+    exclude = exclude or {}
+    unknown = set(filters) | set(exclude)
+    unknown.difference_update(cube["dims"])
+    if unknown:
+        raise KeyError(f"Unknown cube dimensions: {sorted(unknown)}")
+
+    selection = []
+    for dim in cube["dims"]:
+        labels = cube["labels"][dim]
+        keep = np.ones(len(labels), dtype=bool)
+        if filters.get(dim) is not None:
+            wanted = filters[dim]
+            wanted = set(wanted) if isinstance(wanted, (list, tuple, set)) else {wanted}
+            keep &= [label is not None and label in wanted for label in labels]
+        if exclude.get(dim) is not None:
+            dropped = exclude[dim]
+            dropped = set(dropped) if isinstance(dropped, (list, tuple, set)) else {dropped}
+            keep &= [label is None or label not in dropped for label in labels]
+        selection.append(np.flatnonzero(keep))
+    return tuple(selection)
+
+
+def cube_counts(cube: dict, by=(), exclude: dict = None, dropna: bool = True, **filters):
+    """
+    Row counts for a slice of the cube, grouped by some dimensions.
+
+    Args:
+        cube (dict): Output of `build_cube`.
+        by (tuple): Dimensions to group by (in this order); empty for a total.
+        exclude (dict, optional): Labels to leave out, by dimension
+                                  (e.g. {"trial_status": "Phase 1"}).
+        dropna (bool): Leave out missing values of the `by` dimensions (as
+                       `groupby` does); they still count in other dimensions.
+        **filters: Labels to keep, by dimension (a label or a list).
+
+    Returns:
+        int | pd.Series: The total, or counts indexed by the `by` labels
+                         (a MultiIndex for several dimensions).
+    """
+    selection = _selection(cube, filters, exclude)
+    by = tuple(by)
+    if dropna:
+        selection = tuple(
+            positions[positions < len(cube["labels"][dim]) - 1] if dim in by else positions
+            for dim, positions in zip(cube["dims"], selection)
+        )
+
+    block = cube["counts"][np.ix_(*selection)]
+    axes = tuple(i for i, dim in enumerate(cube["dims"]) if dim not in by)
+    block = block.sum(axis=axes)
+    if not by:
+        return int(block)
+
+    # Reorder the remaining axes to the order of `by`
+    remaining = [dim for dim in cube["dims"] if dim in by]
+    block = np.transpose(block, [remaining.index(dim) for dim in by])
+    levels = [
+        [cube["labels"][dim][p] for p in selection[cube["dims"].index(dim)]] for dim in by
+    ]
+    if len(by) == 1:
+        index = pd.Index(levels[0], name=by[0])
+    else:
+        index = pd.MultiIndex.from_product(levels, names=list(by))
+    return pd.Series(block.ravel(), index=index, name="count")
+
+
+def cube_distinct(cube: dict, exclude: dict = None, **filters) -> int:
+    """
+    Number of distinct `distinct` values (e.g. innovations) in a slice of the cube.
+
+    Args:
+        cube (dict): Output of `build_cube`.
+        exclude (dict, optional): Labels to leave out, by dimension.
+        **filters: Labels to keep, by dimension (a label or a list).
+
+    Returns:
+        int: Distinct count.
+    """
+    selection = _selection(cube, filters, exclude)
+    mask = np.zeros(cube["counts"].shape, dtype=bool)
+    mask[np.ix_(*selection)] = True
+    kept = cube["pair_items"][mask.ravel()[cube["pair_cells"]]]
+    return int(np.count_nonzero(np.bincount(kept, minlength=cube["n_items"])))
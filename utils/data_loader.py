@@ -1,7 +1,28 @@
+import os
+from types import MappingProxyType
+
 import pandas as pd
 import numpy as np
 from datetime import timedelta
-from .config import DATA_PATH, POP_DATA_PATH, COLORS
+from .cache import cache_get, cache_set, make_cache
+from .cube import CUBE_DIMENSIONS, build_cube, cube_counts
+from .dates import build_date_index, to_days, years
+from .pipeline import cumulative_pipeline
+from .config import DATA_PATH, POP_DATA_PATH, ALIAS_PATH, COLORS
+
+# Copy-on-write: filtered frames and column selections share memory with the
+# dataset until written to, and writing to them never changes the dataset,
+# so readers do not need defensive `.copy()` calls
+pd.set_option("mode.copy_on_write", True)
+
+# The loaded dataset, shared by all sessions (one entry per data version)
+_DATA_CACHE = make_cache(maxsize=1, name="data")
+
+# Columns always stored per scope, even where they match across scopes
+SCOPE_COLUMNS = ("scope", "nra")
+
+# Date columns of `innovation_df` with a sorted index for window queries
+DATE_INDEX_COLUMNS = ("proj_date_first_launch", "proj_date_lmic_20_uptake")
 
 
 def _load_csv(path: str) -> pd.DataFrame:
@@ -43,7 +64,7 @@ def _preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
         Called internally by `load_data()` immediately after loading.
 
     Key Logic:
-        1.  **Date Conversion**: Parses multiple date columns using `dayfirst=True` and `format='mixed'` to handle inconsistent date formats (e.g., DD-MM-YYYY vs MM/DD/YYYY).
+        1.  **Date Conversion**: Parses multiple date columns using `dayfirst=True` and `format='mixed'` to handle inconsistent date formats (e.g., DD-MM-YYYY vs MM/DD/YYYY), and stores them as int32 day numbers (`utils.dates`; `NO_DATE` for missing).
         2.  **Market Year**: Extracts the year from `proj_date_lmic_20_uptake` to drive timeline charts.
         3.  **Numeric Conversion**: Coerces key metrics (scores, DALYs, costs) to numeric types, filling NaNs with 0 to ensure downstream calculations don't fail.
         4.  **Category Cleanup**: Strips whitespace from category names to ensure grouping consistency.
@@ -77,70 +98,39 @@ def _preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
 
     for col in date_cols:
         if col in df.columns:
-            df[col] = pd.to_datetime(
-                df[col], dayfirst=True, format="mixed", errors="coerce"
-            ).dt.normalize()  # <- sets time to 00:00:00\
+            df[col] = to_days(
+                pd.to_datetime(df[col], dayfirst=True, format="mixed", errors="coerce")
+            )
 
     # Market Year Generation
     # Used for the "Forecast of products" trend chart in Overview
     if "proj_date_first_launch" in df.columns:
-        df["market_year"] = df["proj_date_first_launch"].dt.year
+        df["market_year"] = years(df["proj_date_first_launch"])
 
     return df
 
 
 def _process_pipeline(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Aggregates pipeline data by year and category to create a cumulative timeline.
+    Cumulative number of projected launches per year and category (all scopes).
 
     Usage:
-        Used by the `trend_chart` in `modules/overview.py`.
-
-    Key Logic:
-        1.  Groups data by `market_year` and `category`.
-        2.  Fills missing years between min and max year (2025-2035) to ensure a continuous X-axis.
-        3.  Calculates the **cumulative sum** (cumsum) of innovations over time.
+        Stored as `data["pipeline"]`; the Overview `trend_chart` uses
+        `utils.pipeline.pipeline_view` on the filtered rows instead.
 
     Args:
         df (pd.DataFrame): Preprocessed horizon dataframe.
 
     Returns:
-        pd.DataFrame: A dataframe with columns ['year', 'category1', 'category2'...] representing cumulative counts.
+        pd.DataFrame: A dataframe with columns ['year', 'category1', 'category2'...]
+                      of cumulative counts from `PIPELINE_START_YEAR` on.
     """
-    if "market_year" not in df.columns or "category" not in df.columns:
+    if "proj_date_first_launch" not in df.columns or "category" not in df.columns:
         return pd.DataFrame()
+    return cumulative_pipeline(df["proj_date_first_launch"], df["category"], grain="year")
 
-    # Create a pivot table: Rows=Year, Cols=Category, Values=Count
-    pipeline_raw = df.groupby(["market_year", "category"]).size().unstack(fill_value=0)
-
-    # Determine timeline range
-    min_year = 2025  # ?
-    max_year = (
-        int(pipeline_raw.index.max())
-        if not pipeline_raw.empty and not pd.isna(pipeline_raw.index.max())
-        else 2035  # ?
-    )
-    all_years = range(min_year, max_year + 1)
-
-    # Reindex to include all years (filling 0 for years with no new products)
-    if not pipeline_raw.empty:
-        pipeline_raw.index = pipeline_raw.index.astype(int)
-
-    pipeline_reindexed = pipeline_raw.reindex(all_years, fill_value=0)
-
-    # Calculate cumulative sum
-    pipeline = pipeline_reindexed.cumsum().reset_index()
-    pipeline = pipeline.rename(columns={"index": "year", "market_year": "year"})
-
-    # Ensure integer types for counts
-    for col in pipeline.columns:
-        if col != "year":
-            pipeline[col] = pipeline[col].astype(int)
-
-    return pipeline
 
-
-def _process_readiness(df: pd.DataFrame) -> pd.DataFrame:
+def _process_readiness(cube: dict) -> pd.DataFrame:
     """
     Calculates the distribution of innovations across different trial statuses.
 
@@ -148,17 +138,17 @@ def _process_readiness(df: pd.DataFrame) -> pd.DataFrame:
         Used by the `pie_chart` in `modules/overview.py`.
 
     Key Logic:
-        1.  Counts occurrences of each `trial_status` (which is already recoded).
+        1.  Sums the count cube by `trial_status` (which is already recoded).
         2.  Calculates percentage of total.
         3.  Assigns consistent colors from `COLORS` config.
 
     Args:
-        df (pd.DataFrame): Preprocessed horizon dataframe.
+        cube (dict): `utils.cube.build_cube` of the preprocessed horizon dataframe.
 
     Returns:
         pd.DataFrame: Columns ['status', 'count', 'pct', 'colors'].
     """
-    if "trial_status" not in df.columns:
+    if "trial_status" not in cube["dims"]:
         return pd.DataFrame(columns=["status", "pct", "colors"])
 
     # Define standard categories for color mapping
@@ -187,9 +177,11 @@ def _process_readiness(df: pd.DataFrame) -> pd.DataFrame:
     ]
     color_map = dict(zip(categories, base_colors))
 
-    stage_counts = df["trial_status"].value_counts().reset_index()
+    stage_counts = cube_counts(cube, by=("trial_status",))
+    stage_counts = stage_counts[stage_counts > 0].sort_values(ascending=False, kind="stable")
+    stage_counts = stage_counts.reset_index()
     stage_counts.columns = ["status", "count"]
-    total_innovations = len(df)
+    total_innovations = cube_counts(cube)
     stage_counts["pct"] = (stage_counts["count"] / total_innovations * 100).round(1)
 
     stage_counts["colors"] = stage_counts["status"].map(color_map).fillna("#cbd5e1")
@@ -197,28 +189,225 @@ def _process_readiness(df: pd.DataFrame) -> pd.DataFrame:
     return stage_counts[["status", "pct", "colors"]]
 
 
+def _apply_aliases(df: pd.DataFrame, path: str = ALIAS_PATH) -> pd.DataFrame:
+    """
+    Renames products to their display names using the alias table.
+
+    Usage:
+        Called by `load_data()` before the data is split by scope, so every
+        derived frame uses the same product names.
+
+    Args:
+        df (pd.DataFrame): Preprocessed horizon data.
+        path (str): Alias CSV written by `scripts/build_product_aliases.py`.
+
+    Returns:
+        pd.DataFrame: The dataframe with `innovation` renamed where an alias exists.
+    """
+    if df.empty or "innovation" not in df.columns:
+        return df
+
+    try:
+        aliases = pd.read_csv(path, encoding="utf-8-sig")
+    except Exception as e:
+        print(f"Warning: Could not load product aliases from {path}: {e}")
+        return df
+
+    mapping = dict(zip(aliases["alias"], aliases["innovation"]))
+    df["innovation"] = df["innovation"].replace(mapping)
+    return df
+
+
+# --- Normalized storage ---
+
+def _split_scopes(df: pd.DataFrame) -> tuple:
+    """
+    Splits the long-format frame into a products table and a scope-status table.
+
+    Usage:
+        Called by `load_data()`; `scope_view` reverses it.
+
+    Key Logic:
+        1.  Rows of one product are matched across scopes by innovation,
+            disease and occurrence (a product may be listed twice).
+        2.  Columns whose value differs between the scopes of any product
+            (approval status, dates, population) go to the scope table; all
+            other columns are stored once per product.
+
+    Args:
+        df (pd.DataFrame): Long-format horizon data.
+
+    Returns:
+        tuple: (products indexed by product row, scope table with an int32
+               "product_row" column and repeated labels stored as
+               categories), both in the order of `df`.
+    """
+    key = [c for c in ("innovation", "disease") if c in df.columns]
+    occurrence = df.groupby(key + ["scope"], dropna=False, sort=False).cumcount()
+    product_row = (
+        df[key].assign(_occurrence=occurrence)
+        .groupby(key + ["_occurrence"], dropna=False, sort=False)
+        .ngroup()
+        .to_numpy(dtype=np.int32)
+    )
+
+    by_product = df.groupby(product_row, sort=False)
+    scope_cols = [
+        c for c in df.columns
+        if c in SCOPE_COLUMNS
+        or (c not in key and by_product[c].nunique(dropna=False).gt(1).any())
+    ]
+
+    first = ~pd.Series(product_row).duplicated().to_numpy()
+    products = (
+        df.loc[first, [c for c in df.columns if c not in scope_cols]]
+        .set_axis(product_row[first])
+        .sort_index()
+    )
+    scope_status = df[scope_cols].reset_index(drop=True)
+    scope_status.insert(0, "product_row", product_row)
+    # Repeated labels (scope, Yes/No flags, population descriptions) as categories
+    for col in scope_status.columns:
+        if scope_status[col].dtype == object and scope_status[col].nunique() <= len(scope_status) // 2:
+            scope_status[col] = scope_status[col].astype("category")
+    return products, scope_status
+
+
+def scope_view(data: dict, scopes=None) -> pd.DataFrame:
+    """
+    Long-format rows rebuilt from the normalized tables.
+
+    Usage:
+        Compatibility accessor for code written against the long-format
+        frame; `horizon_view` and `country_view` are the common cases.
+
+    Key Logic:
+        1.  Each scope row is joined to its product's attributes.
+        2.  WHO rows get the per-country approval columns (e.g. "Kenya_nra";
+            "No" where a country has no status for the product).
+
+    Args:
+        data (dict): Output of `load_data()`.
+        scopes (list, optional): Scopes to include; all by default.
+
+    Returns:
+        pd.DataFrame: One row per product and scope, in data file order.
+    """
+    status = data["scope_status"]
+    if scopes is not None:
+        status = status[status["scope"].isin(scopes)]
+    rows = status["product_row"].to_numpy()
+    status = status.drop(columns="product_row").reset_index(drop=True)
+    categorical = [c for c in status.columns if isinstance(status[c].dtype, pd.CategoricalDtype)]
+    view = pd.concat(
+        [
+            data["products"].loc[rows].reset_index(drop=True),
+            status.astype({c: object for c in categorical}),
+        ],
+        axis=1,
+    )
+
+    # Per-country approval status on the WHO rows
+    all_status = data["scope_status"]
+    countries = all_status.loc[all_status["scope"] != "WHO"]
+    nra_wide = (
+        countries.assign(scope_nra=countries["scope"].astype(str) + "_nra")
+        .astype({"nra": object})
+        .pivot_table(index="product_row", columns="scope_nra", values="nra", aggfunc="first")
+        .reindex(columns=[f"{s}_nra" for s in countries["scope"].unique()])
+        .fillna("No")
+    )
+    is_who = (view["scope"] == "WHO").to_numpy()
+    for col in nra_wide.columns:
+        values = np.full(len(view), np.nan, dtype=object)
+        values[is_who] = nra_wide[col].reindex(rows[is_who]).to_numpy()
+        view[col] = values
+
+    return view[[c for c in data["columns"] if c in view.columns] + list(nra_wide.columns)]
+
+
+def horizon_view(data: dict) -> pd.DataFrame:
+    """
+    The full long-format horizon frame (formerly `load_data()["horizon"]`).
+
+    Args:
+        data (dict): Output of `load_data()`.
+
+    Returns:
+        pd.DataFrame: All products and scopes.
+    """
+    return scope_view(data)
+
+
+def country_view(data: dict) -> pd.DataFrame:
+    """
+    Country rows (formerly `load_data()["country_regulatory_df"]`).
+
+    Args:
+        data (dict): Output of `load_data()`.
+
+    Returns:
+        pd.DataFrame: All products, every scope except WHO.
+    """
+    scopes = data["scope_status"]["scope"]
+    return scope_view(data, [s for s in scopes.unique() if s != "WHO"])
+
+
+def data_version() -> str:
+    """
+    Identifies the current state of the input files.
+
+    Usage:
+        Part of the key of every process-wide cache of derived outputs, so a
+        data refresh never serves results computed from the old files.
+
+    Returns:
+        str: Modification times of the data, population and alias files.
+    """
+    stamps = []
+    for path in (DATA_PATH, POP_DATA_PATH, ALIAS_PATH):
+        try:
+            stamps.append(str(os.path.getmtime(path)))
+        except OSError:
+            stamps.append("-")
+    return "|".join(stamps)
+
+
 def load_data() -> dict:
     """
     Main orchestration function to load, process, and return all dashboard data structures.
 
     Usage:
-        Called by every module (`overview.py`, `innovation_details.py`, `comparison.py`) to access data.
+        Called through `get_data()`, which shares the result between sessions.
 
     Key Logic:
         1.  Loads main horizon data.
-        2.  Preprocesses (dates, numerics).
+        2.  Preprocesses (dates, numerics) and applies the product alias table.
         3.  **Population Merge**: Loads external `PopulationData.csv` and merges it into the main dataframe based on `country` and `disease`.
             *   *Priority*: Prefers `targeted_population` from PopulationData.csv.
             *   *Fallback*: Uses `targeted_population` from HorizonData.csv if the merge yields no result.
         4.  Generates aggregated datasets (`pipeline`, `readiness`) for charts.
+        5.  Splits the long-format frame into `products` and `scope_status`
+            (`_split_scopes`). The full frame is not kept; `horizon_view` and
+            `country_view` rebuild it on demand.
 
     Returns:
-        dict: A dictionary containing:
+        Mapping: A read-only mapping containing:
+            - "cube": `utils.cube.build_cube` count cube of the long-format
+              rows (disease x category x status x scope x launch year).
             - "pipeline": DataFrame for trend charts.
             - "readiness": DataFrame for pie charts.
-            - "horizon": The fully processed and merged main DataFrame.
-            - "innovation_df": DataFrame with distinct innovations (Overall country).
-            - "country_regulatory_df": DataFrame with country-specific rows.
+            - "products": One row per product (attributes shared by all scopes).
+            - "scope_status": One row per product and scope ("product_row",
+              "scope" and the columns that differ between scopes).
+            - "columns": Column order of the long-format views.
+            - "innovation_df": WHO-scope view, one row per product
+              (`scope_view(data, ["WHO"])`).
+            - "date_indexes": `utils.dates.build_date_index` of the
+              `DATE_INDEX_COLUMNS` of `innovation_df`, by column.
+            - "product_names": Sorted array of distinct innovation names; a
+              product's integer id is its position in this array.
+            - "data_version": Output of `data_version()` for cache keys.
     """
 
     try:
@@ -228,60 +417,11 @@ def load_data() -> dict:
         raw_df = pd.DataFrame()
 
     df = _preprocess_data(raw_df)
+    df = _apply_aliases(df)
 
     # --- 3. Organize DataFrames ---
-    # The input CSV is already in long format.
-    # horizon_df is the master dataframe.
-    horizon_df = df.copy()
-
-    all_scopes = (
-    horizon_df.loc[horizon_df["scope"] != "WHO", "scope"]
-    .dropna()
-    .unique()
-    )
-
-    expected_cols = [f"{s}_nra" for s in all_scopes]
-
-    horizon_wide = (
-        horizon_df.loc[horizon_df["scope"] != "WHO", ["innovation", "scope", "nra"]]
-        .assign(scope_nra=lambda d: d["scope"] + "_nra")
-        .pivot_table(
-            index="innovation",
-            columns="scope_nra",
-            values="nra",
-            aggfunc="first",
-        )
-        .reindex(columns=expected_cols)
-        .fillna("No")
-        .rename_axis(columns=None)
-        .reset_index()
-        .assign(scope="WHO")
-    )
-
-    # horizon_wide = (
-    #     horizon_df.loc[
-    #         (horizon_df["nra"] == "Yes") & (horizon_df["scope"] != "WHO"),
-    #         ["innovation", "scope"],
-    #     ]
-    #     .assign(scope_nra=lambda d: d["scope"] + "_nra", value="Yes")
-    #     .pivot_table(
-    #         index="innovation", columns="scope_nra", values="value", aggfunc="first"
-    #     )
-    #     .fillna("No")
-    #     .rename_axis(columns=None)
-    #     .reset_index()
-    #     .assign(scope="WHO")
-    # )
-
-    horizon_df = horizon_df.merge(horizon_wide, on=["innovation", "scope"], how="left")
-    # innovation_df: The aggregate/global view (country="Overall")
-    if "scope" in horizon_df.columns:
-        innovation_df = horizon_df[horizon_df["scope"] == "WHO"].copy()
-        # country_regulatory_df: The specific country rows
-        country_regulatory_df = horizon_df[horizon_df["scope"] != "WHO"].copy()
-    else:
-        innovation_df = pd.DataFrame()
-        country_regulatory_df = pd.DataFrame()
+    # The input CSV is already in long format (one row per product and scope).
+    horizon_df = df
 
     # --- 5. Population Data Integration ---
     try:
@@ -300,11 +440,6 @@ def load_data() -> dict:
             columns={"targeted_population": "people_at_risk"}
         )
 
-        horizon_df["innovation"] = horizon_df["innovation"].replace(
-            "Emtricitabine/Ethinylestradiol/Levonorgestrel/Tenofovir disoproxil fumarate Tablet, Film-coated + Emtricitabine/Tenofovir disoproxil fumarate",
-            "Dual Prevention Pill",
-        )
-
         # Priority Logic:
         # 1. 'people_at_risk' (from PopulationData.csv) is the default.
         # 2. If that is NaN (merge failed/no match), fill it with 'target_population' from the original data if available.
@@ -322,14 +457,70 @@ def load_data() -> dict:
         else:
             horizon_df["people_at_risk"] = 0
 
-    #  Aggregation
+    #  Aggregation: one count cube, sliced for every aggregate
+    if all(dim in horizon_df.columns for dim in CUBE_DIMENSIONS + ("innovation",)):
+        cube = build_cube(horizon_df)
+    else:
+        cube = build_cube(pd.DataFrame(columns=["innovation"]), dims=())
     pipeline = _process_pipeline(horizon_df)
-    readiness = _process_readiness(horizon_df)
+    readiness = _process_readiness(cube)
+
+    # --- 6. Normalized storage ---
+    # Product attributes are stored once; the long-format views are rebuilt
+    # from the two tables (see `scope_view`)
+    if "scope" in horizon_df.columns and "innovation" in horizon_df.columns:
+        products, scope_status = _split_scopes(horizon_df)
+    else:
+        products, scope_status = horizon_df, pd.DataFrame(columns=["product_row", "scope"])
 
-    return {
+    # Product ids: position of each distinct innovation name in sorted order
+    if "innovation" in products.columns:
+        product_names = np.sort(products["innovation"].dropna().unique())
+    else:
+        product_names = np.array([], dtype=object)
+
+    data = {
+        "cube": cube,
         "pipeline": pipeline,
         "readiness": readiness,
-        "horizon": horizon_df,
-        "innovation_df": innovation_df,
-        "country_regulatory_df": country_regulatory_df,
+        "products": products,
+        "scope_status": scope_status,
+        "columns": list(horizon_df.columns),
+        "product_names": product_names,
+        "data_version": data_version(),
     }
+    innovation_df = scope_view(data, ["WHO"]) if len(scope_status) else pd.DataFrame()
+    data["innovation_df"] = innovation_df
+    data["date_indexes"] = MappingProxyType({
+        col: build_date_index(innovation_df[col])
+        for col in DATE_INDEX_COLUMNS
+        if col in innovation_df.columns
+    })
+    product_names.flags.writeable = False
+    return MappingProxyType(data)
+
+
+def get_data() -> dict:
+    """
+    The dashboard data shared by all sessions.
+
+    Usage:
+        Called by `server()` and the module servers instead of `load_data()`,
+        so sessions hold references to one dataset rather than their own
+        copies. Callers must not modify the returned frames in place;
+        with copy-on-write, filtering and assigning to derived frames is
+        safe without copying.
+
+    Key Logic:
+        Sessions start on the event loop, the only thread that loads the
+        data, so there is never a concurrent load to wait for and the
+        blocking `utils.cache.cached` is not used.
+
+    Returns:
+        Mapping: Output of `load_data()`, reloaded when `data_version()` changes.
+    """
+    version = data_version()
+    data = cache_get(_DATA_CACHE, version)
+    if data is None:
+        data = cache_set(_DATA_CACHE, version, load_data())
+    return data
@@ -0,0 +1,272 @@
+import numpy as np
+import pandas as pd
+
+# Dates are stored as int32 days since 1970-01-01; missing dates as NO_DATE
+NO_DATE = np.iinfo(np.int32).min
+
+# Days covered by the ISO string lookup table (others are formatted directly)
+ISO_TABLE_START = np.datetime64("1950-01-01", "D")
+ISO_TABLE_END = np.datetime64("2081-01-01", "D")
+
+# ISO strings of every day in the table range (built on first use)
+_ISO_TABLE = {"strings": None}
+
+
+# --- 1. Conversion ---
+
+def to_days(values) -> np.ndarray:
+    """
+    Converts dates to int32 days since the epoch.
+
+    Usage:
+        Called by `_preprocess_data` for every parsed date column.
+
+    Args:
+        values: Datetime-like Series or array (NaT for missing).
+
+    Returns:
+        np.ndarray: int32 day numbers, `NO_DATE` where missing.
+    """
+    dates = np.asarray(pd.to_datetime(values), dtype="datetime64[D]")
+    days = dates.astype(np.int64)
+    days[np.isnat(dates)] = NO_DATE
+    return days.astype(np.int32)
+
+
+def day(value) -> int:
+    """
+    Day number of a single date.
+
+    Args:
+        value: Timestamp, date or date string (e.g. "2025-01-01").
+
+    Returns:
+        int: Days since the epoch, or `NO_DATE` for missing values.
+    """
+    if value is None or pd.isna(value):
+        return NO_DATE
+    return int(np.datetime64(pd.Timestamp(value).date(), "D").astype(np.int64))
+
+
+def has_date(days) -> np.ndarray:
+    """
+    Mask of entries holding a date.
+
+    Args:
+        days: int32 day numbers (array or Series).
+
+    Returns:
+        np.ndarray: True where the date is present.
+    """
+    return np.asarray(days) != NO_DATE
+
+
+def to_datetime64(days) -> np.ndarray:
+    """
+    Converts day numbers back to `datetime64[ns]` (for charts).
+
+    Args:
+        days: int32 day numbers (array or Series).
+
+    Returns:
+        np.ndarray: Dates, NaT where missing.
+    """
+    days = np.asarray(days)
+    dates = days.astype("datetime64[D]").astype("datetime64[ns]")
+    dates[days == NO_DATE] = np.datetime64("NaT")
+    return dates
+
+
+def to_timestamp(value):
+    """
+    Timestamp of a single day number.
+
+    Args:
+        value (int): Day number (or None).
+
+    Returns:
+        pd.Timestamp | None: The date, or None when missing.
+    """
+    if value is None or pd.isna(value) or value == NO_DATE:
+        return None
+    return pd.Timestamp(np.datetime64(int(value), "D"))
+
+
+def add_years(value: int, years: int) -> int:
+    """
+    Moves a day number by whole calendar years (29 February becomes 28 February).
+
+    Args:
+        value (int): Day number.
+        years (int): Years to add (negative to subtract).
+
+    Returns:
+        int: Day number.
+    """
+    return day(to_timestamp(value) + pd.DateOffset(years=years))
+
+
+# --- 2. Vectorized helpers ---
+
+def years(days) -> np.ndarray:
+    """
+    Calendar year of each date (e.g. `market_year`).
+
+    Args:
+        days: int32 day numbers (array or Series).
+
+    Returns:
+        np.ndarray: float years, NaN where missing.
+    """
+    days = np.asarray(days)
+    out = days.astype("datetime64[D]").astype("datetime64[Y]").astype(np.int64) + 1970.0
+    out[days == NO_DATE] = np.nan
+    return out
+
+
+def in_range(days, start: int = None, end: int = None) -> np.ndarray:
+    """
+    Mask of dates within `[start, end]`; missing dates never match.
+
+    Args:
+        days: int32 day numbers (array or Series).
+        start (int, optional): First day included (see `day`).
+        end (int, optional): Last day included.
+
+    Returns:
+        np.ndarray: Boolean mask.
+    """
+    days = np.asarray(days)
+    mask = days != NO_DATE
+    if start is not None:
+        mask &= days >= start
+    if end is not None:
+        mask &= days <= end
+    return mask
+
+
+def iso_dates(days) -> np.ndarray:
+    """
+    Formats day numbers as "YYYY-MM-DD" strings (for tables).
+
+    Key Logic:
+        1.  Days in `[ISO_TABLE_START, ISO_TABLE_END)` are looked up in a
+            table of precomputed strings, so no per-call formatting happens.
+        2.  Other days are formatted by NumPy; missing dates become None.
+
+    Args:
+        days: int32 day numbers (array or Series).
+
+    Returns:
+        np.ndarray: object array of strings and None.
+    """
+    table = _ISO_TABLE["strings"]
+    if table is None:
+        table = _ISO_TABLE["strings"] = np.array(
+            np.datetime_as_string(np.arange(ISO_TABLE_START, ISO_TABLE_END), unit="D"),
+            dtype=object,
+        )
+
+    days = np.asarray(days, dtype=np.int64)
+    offset = days - ISO_TABLE_START.astype(np.int64)
+    in_table = (offset >= 0) & (offset < len(table))
+    out = np.full(len(days), None, dtype=object)
+    out[in_table] = table[offset[in_table]]
+
+    other = ~in_table & (days != NO_DATE)
+    if other.any():
+        out[other] = np.datetime_as_string(days[other].astype("datetime64[D]"), unit="D")
+    return out
+
+
+def iso_date(value) -> str:
+    """
+    `iso_dates` for a single day number.
+
+    Args:
+        value (int): Day number (or None).
+
+    Returns:
+        str | None: "YYYY-MM-DD", or None when missing.
+    """
+    if value is None or pd.isna(value):
+        return None
+    return iso_dates([value])[0]
+
+
+# --- 3. Sorted indexes ---
+
+def build_date_index(days) -> dict:
+    """
+    Sorted index of a date column for range queries.
+
+    Usage:
+        Built once per data load for the columns in
+        `utils.data_loader.DATE_INDEX_COLUMNS`; queried with `date_range_rows`.
+
+    Args:
+        days: int32 day numbers (array or Series), one per row.
+
+    Returns:
+        dict: {"days": sorted dates, "rows": their row positions}; missing
+              dates are left out.
+    """
+    days = np.asarray(days)
+    rows = np.flatnonzero(days != NO_DATE)
+    order = rows[np.argsort(days[rows], kind="stable")]
+    index = {"days": days[order], "rows": order.astype(np.int32)}
+    for array in index.values():
+        array.flags.writeable = False
+    return index
+
+
+def date_range_rows(index: dict, start: int = None, end: int = None) -> np.ndarray:
+    """
+    Row positions with a date within `[start, end]`, via `searchsorted`.
+
+    Costs O(log n + k log k) for k matching rows; the result can be combined
+    with other row-position filters with `np.intersect1d`.
+
+    Args:
+        index (dict): Output of `build_date_index`.
+        start (int, optional): First day included (see `day`).
+        end (int, optional): Last day included.
+
+    Returns:
+        np.ndarray: Sorted row positions.
+    """
+    sorted_days = index["days"]
+    # Bounds are cast to the array dtype; a Python int would make NumPy
+    # convert the whole array before searching
+    dtype = sorted_days.dtype.type
+    lo = 0 if start is None else np.searchsorted(sorted_days, dtype(start), side="left")
+    hi = len(sorted_days) if end is None else np.searchsorted(sorted_days, dtype(end), side="right")
+    return np.sort(index["rows"][lo:hi])
+
+
+def next_years(n: int, today=None) -> tuple:
+    """
+    Window from today to the same day `n` years later.
+
+    Args:
+        n (int): Years.
+        today (optional): Start date; defaults to today.
+
+    Returns:
+        tuple: (start, end) day numbers, both included.
+    """
+    start = day(pd.Timestamp.today() if today is None else today)
+    return start, add_years(start, n)
+
+
+def calendar_year(year: int) -> tuple:
+    """
+    Window covering one calendar year.
+
+    Args:
+        year (int): e.g. 2027.
+
+    Returns:
+        tuple: (start, end) day numbers, both included.
+    """
+    return day(f"{year}-01-01"), day(f"{year}-12-31")
@@ -0,0 +1,37 @@
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+# Metric groups served by `/metrics`: name -> callable returning a dict
+METRIC_SOURCES = {}
+
+
+def register_metrics(name: str, source):
+    """
+    Adds a group of metrics to the `/metrics` endpoint.
+
+    Args:
+        name (str): Key of the group in the response (e.g. "sessions").
+        source (callable): Returns a JSON-serializable dict when called.
+    """
+    METRIC_SOURCES[name] = source
+
+
+def metrics_snapshot() -> dict:
+    """
+    Current value of every registered metric group.
+
+    Returns:
+        dict: {group name: metrics}; a failing group reports {"error": message}.
+    """
+    snapshot = {}
+    for name, source in METRIC_SOURCES.items():
+        try:
+            snapshot[name] = source()
+        except Exception as e:
+            snapshot[name] = {"error": str(e)}
+    return snapshot
+
+
+async def metrics_endpoint(request: Request) -> JSONResponse:
+    """Starlette route serving `metrics_snapshot()` as JSON."""
+    return JSONResponse(metrics_snapshot(), headers={"Cache-Control": "no-store"})
@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+
+from .cache import cached, make_cache
+from .config import PIPELINE_END_YEAR, PIPELINE_START_YEAR
+from .dates import has_date
+
+# Time grains of the cumulative pipeline
+GRAINS = ("year", "quarter", "month")
+
+# Cumulative pipelines per (caller key, column, grouping, grain), shared by all sessions
+_PIPELINE_CACHE = make_cache(maxsize=256, name="pipelines")
+
+
+# --- 1. Periods ---
+
+def period_numbers(days, grain: str = "year") -> np.ndarray:
+    """
+    Consecutive period numbers of dates at a time grain.
+
+    Years are numbered by calendar year (2025), quarters as year * 4 + quarter
+    index and months as year * 12 + month index, so consecutive periods
+    always differ by one.
+
+    Args:
+        days: int32 day numbers (see `utils.dates`); must not be missing.
+        grain (str): One of `GRAINS`.
+
+    Returns:
+        np.ndarray: int64 period numbers.
+    """
+    days = np.asarray(days, dtype=np.int64)
+    if len(days) == 0:
+        months = days
+    else:
+        # Month of every day in the covered range, then one gather per row
+        # (much cheaper than converting each row through datetime64)
+        first = days.min()
+        span = np.arange(first, days.max() + 1).astype("datetime64[D]")
+        table = span.astype("datetime64[M]").astype(np.int64) + 1970 * 12
+        months = table[days - first]
+    if grain == "year":
+        return months // 12
+    if grain == "quarter":
+        return months // 3
+    if grain == "month":
+        return months
+    raise ValueError(f"Unknown grain {grain!r}; expected one of {GRAINS}")
+
+
+def period_labels(periods, grain: str = "year"):
+    """
+    Display labels of period numbers: the year, or the first day of the quarter / month.
+
+    Args:
+        periods: Period numbers from `period_numbers`.
+        grain (str): One of `GRAINS`.
+
+    Returns:
+        np.ndarray: int years, or `datetime64[ns]` period starts.
+    """
+    periods = np.asarray(periods, dtype=np.int64)
+    if grain == "year":
+        return periods
+    months = periods * 3 if grain == "quarter" else periods
+    return (months - 1970 * 12).astype("datetime64[M]").astype("datetime64[ns]")
+
+
+def _year_period(year: int, grain: str, last: bool = False) -> int:
+    # First (or last) period of a calendar year
+    per_year = {"year": 1, "quarter": 4, "month": 12}[grain]
+    return year * per_year + (per_year - 1 if last else 0)
+
+
+# --- 2. Cumulative counts ---
+
+def _cumulate_codes(periods, codes, labels, name, grain, start, end, weights):
+    # `cumulate` on factorized groups (codes of -1 are dropped)
+    keep = codes >= 0
+
+    first = _year_period(PIPELINE_START_YEAR, grain) if start is None else int(start)
+    if end is not None:
+        last = int(end)
+    elif keep.any():
+        last = int(periods[keep].max())
+    else:
+        last = _year_period(PIPELINE_END_YEAR, grain, last=True)
+    keep &= (periods >= first) & (periods <= last)
+
+    n_periods, n_groups = max(last - first + 1, 0), len(labels)
+    cells = (periods[keep] - first) * n_groups + codes[keep]
+    counts = np.bincount(
+        cells,
+        weights=None if weights is None else np.asarray(weights)[keep],
+        minlength=n_periods * n_groups,
+    )
+    cumulative = counts.astype(np.int64).reshape(n_periods, n_groups).cumsum(axis=0)
+
+    pipeline = pd.DataFrame(cumulative, columns=pd.Index(labels, name=name))
+    pipeline.insert(0, grain, period_labels(np.arange(first, first + n_periods), grain))
+    return pipeline
+
+
+def _factorize(groups, n: int) -> tuple:
+    # Sorted group codes and labels; a single "All" group when `groups` is None
+    if groups is None:
+        return np.zeros(n, dtype=np.intp), ["All"], None
+    if not hasattr(groups, "dtype"):
+        groups = np.asarray(groups, dtype=object)
+    codes, labels = pd.factorize(groups, sort=True)
+    return codes, list(labels), getattr(groups, "name", None)
+
+
+def cumulate(periods, groups, grain: str = "year", start: int = None, end: int = None,
+             weights=None) -> pd.DataFrame:
+    """
+    Cumulative counts per group over consecutive periods.
+
+    Usage:
+        Core of `cumulative_pipeline`; the harmonizer calls it directly on its
+        merged (year, category) counts.
+
+    Key Logic:
+        1.  Groups are factorized (sorted); missing groups are dropped, as a
+            `groupby` would.
+        2.  Periods before `start` or after `end` are dropped; (period, group)
+            pairs are counted with one `np.bincount` over a dense
+            periods x groups grid, so periods without launches are present.
+        3.  `np.cumsum` down the periods gives the cumulative pipeline.
+
+    Args:
+        periods: Period numbers (see `period_numbers`), one per row.
+        groups: Group label per row, or None for a single "All" column.
+        grain (str): One of `GRAINS`.
+        start (int, optional): First period; defaults to the start of
+                               `PIPELINE_START_YEAR`.
+        end (int, optional): Last period; defaults to the last period with a
+                             row, or the end of `PIPELINE_END_YEAR` when empty.
+        weights (optional): Count of each row (defaults to 1).
+
+    Returns:
+        pd.DataFrame: A `grain` column (see `period_labels`) and one int
+                      column of cumulative counts per group (columns named
+                      after `groups`).
+    """
+    periods = np.asarray(periods, dtype=np.int64)
+    codes, labels, name = _factorize(groups, len(periods))
+    return _cumulate_codes(periods, codes, labels, name, grain, start, end, weights)
+
+
+def cumulative_pipeline(days, groups=None, grain: str = "year", start: int = None,
+                        end: int = None) -> pd.DataFrame:
+    """
+    Cumulative number of launches (or any milestone) per group over time.
+
+    Args:
+        days: int32 day numbers of the milestone, one per row; rows without a
+              date are left out.
+        groups: Group label per row (e.g. the "category" column), or None.
+        grain (str): One of `GRAINS`.
+        start (int, optional): First period (see `cumulate`).
+        end (int, optional): Last period.
+
+    Returns:
+        pd.DataFrame: Output of `cumulate`.
+    """
+    days = np.asarray(days)
+    dated = has_date(days)
+    codes, labels, name = _factorize(groups, len(days))
+    return _cumulate_codes(
+        period_numbers(days[dated], grain), codes[dated], labels, name, grain, start, end, None
+    )
+
+
+# --- 3. Cached views ---
+
+def pipeline_view(df: pd.DataFrame, key, column: str = "proj_date_first_launch",
+                  by: str = "category", grain: str = "year") -> pd.DataFrame:
+    """
+    Cached `cumulative_pipeline` of a frame.
+
+    Usage:
+        Feeds the Overview `trend_chart`, keyed by data version and filter
+        state. Called on the worker pool (`utils.cache.cached`).
+
+    Args:
+        df (pd.DataFrame): Rows to count.
+        key: Hashable identity of `df` (e.g. data version plus filters).
+        column (str): Milestone date column (int32 day numbers).
+        by (str): Grouping column (category, disease, scope, ...), or None.
+        grain (str): One of `GRAINS`.
+
+    Returns:
+        pd.DataFrame: Output of `cumulate`; shared, do not modify.
+    """
+    def compute():
+        groups = None if by is None else df[by]
+        return cumulative_pipeline(df[column], groups, grain)
+
+    return cached(_PIPELINE_CACHE, (key, column, by, grain), compute)
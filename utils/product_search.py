@@ -0,0 +1,181 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+from .cache import cached_async, make_cache
+from .trigram_index import build_trigram_index, normalize_text, trigram_search
+
+# Fields whose words make a product findable, with the weight of a hit in each
+SEARCH_FIELDS = {
+    "innovation": 3.0,
+    "alternative_names": 2.0,
+    "manufacturer": 1.0,
+    "disease": 1.0,
+}
+
+# Number of choices returned to the selectize per keystroke
+SEARCH_LIMIT = 50
+
+# Minimum trigram similarity for typo-tolerant matches
+FUZZY_CUTOFF = 0.25
+
+# Search index of the current dataset, shared by all sessions
+_SEARCH_CACHE = make_cache(maxsize=1, name="product_search")
+
+
+def build_product_search(horizon_df: pd.DataFrame) -> dict:
+    """
+    Builds the prefix/fuzzy search index used by the product pickers.
+
+    Usage:
+        Built once per data version through `get_product_search`; queried by the
+        selectize data route on every keystroke.
+
+    Key Logic:
+        1.  **Names**: Distinct innovation names sorted by their normalized form,
+            so prefix matches are a `searchsorted` range.
+        2.  **Tokens**: Every word of the `SEARCH_FIELDS` of a product, sorted,
+            with the product id and field weight of each occurrence. A token
+            prefix is again a `searchsorted` range.
+        3.  **Fuzzy**: A trigram index over names and alternative names for
+            misspelled queries.
+
+    Args:
+        horizon_df (pd.DataFrame): Product rows (`load_data()["products"]`) or
+                                   any long-format view.
+
+    Returns:
+        dict: {"names", "name_keys", "tokens", "token_ids", "token_weights", "trigrams"}.
+    """
+    cols = [c for c in SEARCH_FIELDS if c in horizon_df.columns]
+    products = (
+        horizon_df.loc[horizon_df["innovation"].notna(), cols]
+        .drop_duplicates("innovation")
+    )
+    name_keys = products["innovation"].map(normalize_text).to_numpy(dtype=object)
+    order = np.argsort(name_keys, kind="stable")
+    products = products.iloc[order].reset_index(drop=True)
+    name_keys = name_keys[order]
+
+    tokens, ids, weights = [], [], []
+    for col in cols:
+        words = products[col].map(lambda v: set(normalize_text(v).split()))
+        for product_id, product_words in enumerate(words):
+            tokens.extend(product_words)
+            ids.extend([product_id] * len(product_words))
+            weights.extend([SEARCH_FIELDS[col]] * len(product_words))
+
+    tokens = np.asarray(tokens, dtype=object)
+    token_order = np.argsort(tokens, kind="stable")
+
+    alt_texts, alt_keys = [], []
+    if "alternative_names" in products.columns:
+        for product_id, value in enumerate(products["alternative_names"]):
+            if isinstance(value, str):
+                for name in value.split(";"):
+                    if name.strip():
+                        alt_texts.append(name.strip())
+                        alt_keys.append(product_id)
+
+    names = products["innovation"].to_numpy(dtype=object)
+    return {
+        "names": names,
+        "name_keys": name_keys,
+        "tokens": tokens[token_order],
+        "token_ids": np.asarray(ids, dtype=np.int32)[token_order],
+        "token_weights": np.asarray(weights, dtype=np.float32)[token_order],
+        "trigrams": build_trigram_index(
+            list(names) + alt_texts, keys=list(range(len(names))) + alt_keys
+        ),
+    }
+
+
+async def get_product_search(products: pd.DataFrame, version: str) -> dict:
+    """
+    Process-wide `build_product_search` index of a dataset version.
+
+    The first request of a version builds it on the worker pool; concurrent
+    requests await the same build.
+
+    Args:
+        products (pd.DataFrame): `load_data()["products"]`.
+        version (str): `load_data()["data_version"]` of `products`.
+
+    Returns:
+        dict: Shared, read-only index for `search_products`.
+    """
+    return await cached_async(
+        _SEARCH_CACHE, version, functools.partial(build_product_search, products)
+    )
+
+
+def _prefix_range(sorted_keys: np.ndarray, prefix: str) -> slice:
+    """Slice of a sorted string array whose entries start with `prefix`."""
+    lo = np.searchsorted(sorted_keys, prefix, side="left")
+    hi = np.searchsorted(sorted_keys, prefix + "\uffff", side="left")
+    return slice(lo, hi)
+
+
+def search_products(index: dict, query: str, limit: int = SEARCH_LIMIT) -> list:
+    """
+    Ranked product names for a (partial) query.
+
+    Key Logic:
+        1.  Products whose name starts with the query rank first.
+        2.  Then products where every query word prefixes some word of their
+            name, alternative names, manufacturer or disease, scored by the
+            field weights of the hits.
+        3.  Remaining slots are filled by trigram similarity, so typos still
+            find the product.
+
+    Args:
+        index (dict): Output of `build_product_search`.
+        query (str): Text typed by the user.
+        limit (int): Maximum number of names to return.
+
+    Returns:
+        list: Product names, best first. An empty query returns the first
+              `limit` names alphabetically.
+    """
+    names = index["names"]
+    query = normalize_text(query)
+    if not query:
+        return names[:limit].tolist()
+
+    scores = np.zeros(len(names), dtype=np.float32)
+
+    # 1. Whole-name prefix
+    scores[_prefix_range(index["name_keys"], query)] += 100.0
+
+    # 2. Every query word must prefix a token of the product
+    words = query.split()
+    token_scores = np.zeros(len(names), dtype=np.float32)
+    matched_all = np.ones(len(names), dtype=bool)
+    for word in words:
+        hits = _prefix_range(index["tokens"], word)
+        word_scores = np.bincount(
+            index["token_ids"][hits],
+            weights=index["token_weights"][hits],
+            minlength=len(names),
+        )
+        matched_all &= word_scores > 0
+        token_scores += word_scores
+    scores += np.where(matched_all, 10.0 + token_scores, 0.0).astype(np.float32)
+
+    ranked = np.flatnonzero(scores > 0)
+    ranked = ranked[np.lexsort((index["name_keys"][ranked], -scores[ranked]))][:limit]
+    result = names[ranked].tolist()
+
+    # 3. Typo-tolerant fill
+    if len(result) < limit:
+        fuzzy = trigram_search(index["trigrams"], query, k=limit, cutoff=FUZZY_CUTOFF)
+        seen = set(ranked.tolist())
+        for product_id in fuzzy["key"]:
+            if product_id not in seen:
+                seen.add(product_id)
+                result.append(names[product_id])
+                if len(result) >= limit:
+                    break
+
+    return result
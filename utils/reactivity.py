@@ -0,0 +1,64 @@
+import time
+
+from shiny import reactive
+
+from .sessions import invalidate_later_if_visible
+
+
+def debounce(source, delay: float):
+    """
+    Reactive calc that follows `source` only once it has settled.
+
+    Usage:
+        filters = debounce(lambda: (input.disease_selector(), selected_category.get()), 0.3)
+
+    Key Logic:
+        1.  The first value is passed through immediately, so the initial
+            render (and restored URL state) is not delayed.
+        2.  Later changes restart a `delay`-second timer; only the value
+            present when it expires is published, in a single reactive
+            flush. Superseded intermediate values never reach readers.
+        3.  Publishing a value equal to the current one invalidates nothing.
+        4.  The timer is not armed while the browser tab is hidden; a value
+            that settled in the background is published when the tab is shown.
+
+    Args:
+        source (callable): Reactive function (e.g. a tuple of inputs).
+        delay (float): Seconds without changes before a value is published.
+
+    Returns:
+        callable: Reactive calc returning the latest settled value.
+    """
+    pending = {"value": None, "started": False}
+    settled = reactive.Value()
+    deadline = reactive.Value(None)
+
+    @reactive.Effect
+    def _track():
+        value = source()
+        pending["value"] = value
+        with reactive.isolate():
+            if not pending["started"]:
+                pending["started"] = True
+                settled.set(value)
+            else:
+                deadline.set(time.monotonic() + delay)
+
+    @reactive.Effect
+    def _publish():
+        due = deadline()
+        if due is None:
+            return
+        remaining = due - time.monotonic()
+        if remaining > 0:
+            invalidate_later_if_visible(remaining)
+            return
+        with reactive.isolate():
+            settled.set(pending["value"])
+            deadline.set(None)
+
+    @reactive.Calc
+    def value():
+        return settled()
+
+    return value
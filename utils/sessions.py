@@ -0,0 +1,338 @@
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from shiny import reactive, req
+from shiny.session import get_current_session
+
+from .config import (
+    MAX_SESSIONS,
+    SESSION_IDLE_TIMEOUT,
+    SESSION_SWEEP_INTERVAL,
+    SESSIONS_MEMORY_CAP,
+)
+
+# Live sessions by id, least recently active first
+_SESSIONS = OrderedDict()
+
+# Lifetime counters reported by `session_metrics`
+_COUNTERS = {"released": 0, "rehydrated": 0, "closed": 0}
+
+# Background task running `_sweep_loop`
+_SWEEPER = {"task": None}
+
+
+# --- 1. Tab visibility ---
+
+def tab_visible(session=None) -> bool:
+    """
+    Whether the session's browser tab is in the foreground.
+
+    Reads the `tab_visible` input sent by `www/session_activity.js`; a
+    reactive context reading it re-runs when the tab is shown or hidden
+    (including when the input first arrives).
+
+    Args:
+        session: Session or module session; defaults to the current one.
+
+    Returns:
+        bool: True until the client reports otherwise, and outside a session.
+    """
+    session = session or get_current_session()
+    if session is None:
+        return True  # no session (scripts, tests)
+    visible = session.root_scope().input["tab_visible"]
+    if not visible.is_set():
+        return True
+    return bool(visible())
+
+
+def invalidate_later_if_visible(delay: float, session=None):
+    """
+    `reactive.invalidate_later` that is not re-armed while the tab is hidden.
+
+    Used by the `debounce` deadline and the shed retry of `worker_calc`:
+    background tabs stop waking the server, and since the calling context
+    depends on `tab_visible`, it re-runs (and re-arms or fires the timer)
+    when the tab is shown again.
+
+    Args:
+        delay (float): Seconds until the current reactive context invalidates.
+        session: Session or module session; defaults to the current one.
+    """
+    if tab_visible(session):
+        reactive.invalidate_later(delay)
+
+
+# --- 2. Memory accounting ---
+
+def object_bytes(obj) -> int:
+    """
+    Approximate memory held by a data object.
+
+    Args:
+        obj: DataFrame, Series, array, Plotly figure, or a dict/list/tuple
+             of them.
+
+    Returns:
+        int: Bytes, including the contents of string columns.
+    """
+    if hasattr(obj, "to_plotly_json"):
+        return object_bytes(obj.to_plotly_json())
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sum(object_bytes(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(object_bytes(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+def _record(session=None):
+    """Registry entry of a session (None outside a registered session)."""
+    session = session or get_current_session()
+    if session is None:
+        return None
+    return _SESSIONS.get(session.root_scope().id)
+
+
+def _held_bytes(record) -> int:
+    return sum(holder["bytes"] for holder in record["holders"].values())
+
+
+# --- 3. Session registry ---
+
+def register_session(session) -> dict:
+    """
+    Adds a session to the lifecycle registry.
+
+    Usage:
+        Called once at the top of the app `server()`.
+
+    Key Logic:
+        1.  The `user_active` input from `www/session_activity.js` marks the
+            session as recently active and rehydrates it if it was released.
+        2.  The session is removed when it ends.
+        3.  The first registration starts the background sweep.
+
+    Args:
+        session: The app session.
+
+    Returns:
+        dict: Registry entry ("last_active", "idle", "holders").
+    """
+    session = session.root_scope()
+    record = {
+        "session": session,
+        "last_active": time.monotonic(),
+        "idle": reactive.Value(False),
+        "holders": OrderedDict(),
+    }
+    _SESSIONS[session.id] = record
+
+    @reactive.Effect
+    def _on_activity():
+        session.input.user_active()
+        touch(session)
+
+    session.on_ended(lambda: _SESSIONS.pop(session.id, None))
+    _start_sweeper()
+    return record
+
+
+def touch(session=None):
+    """
+    Marks a session as active now, rehydrating it if it was released.
+
+    Args:
+        session: Session or module session; defaults to the current one.
+    """
+    record = _record(session)
+    if record is None:
+        return
+    record["last_active"] = time.monotonic()
+    _SESSIONS.move_to_end(record["session"].id)
+    with reactive.isolate():
+        idle = record["idle"]()
+    if idle:
+        record["idle"].set(False)
+        _COUNTERS["rehydrated"] += 1
+
+
+def require_active(session=None):
+    """
+    Stops the calling calc or output while its session is released.
+
+    Reactive code that builds frames or figures calls this first: releasing
+    the session invalidates it (dropping cached values and closing widgets),
+    and it re-runs when the user returns.
+
+    Args:
+        session: Session or module session; defaults to the current one.
+    """
+    record = _record(session)
+    if record is not None and record["idle"]():
+        req(False)
+
+
+def session_resource(name: str, value, release=None, session=None):
+    """
+    Registers an object the session holds, so it is counted and released.
+
+    Usage:
+        `worker_calc(..., name=...)` registers each published result; figure
+        renderers call `require_active()` first and return
+        `session_resource("overview.pie_chart", fig)`.
+
+    Key Logic:
+        1.  The object's size counts towards the session's memory (see
+            `session_metrics` and `SESSIONS_MEMORY_CAP`); registering the same
+            name again replaces the previous entry.
+        2.  When the session is released, `release()` drops the owner's
+            reference. Widgets need none: their renderer depends on
+            `require_active`, and shinywidgets closes a widget when its
+            renderer is invalidated.
+        3.  Both re-run when the user returns and register the object again.
+
+    Args:
+        name (str): Label in the metrics (e.g. "overview.table_df").
+        value: The object (frame, figure, HTML, ...).
+        release (callable, optional): Drops the owner's reference.
+        session: Session or module session; defaults to the current one.
+
+    Returns:
+        The object, unchanged.
+    """
+    record = _record(session)
+    if record is not None:
+        record["holders"].pop(name, None)
+        record["holders"][name] = {"bytes": object_bytes(value), "release": release}
+    return value
+
+
+def release_session(record):
+    """
+    Drops a session's heavy objects and marks it idle.
+
+    The caller flushes the reactive graph afterwards so dependent calcs and
+    widgets are invalidated.
+
+    Args:
+        record (dict): Registry entry.
+    """
+    for holder in record["holders"].values():
+        if holder["release"] is not None:
+            holder["release"]()
+    record["holders"].clear()
+    with reactive.isolate():
+        idle = record["idle"]()
+    if not idle:
+        record["idle"].set(True)
+        _COUNTERS["released"] += 1
+
+
+# --- 4. Idle timeout and global caps ---
+
+def sweep_sessions(now=None) -> tuple:
+    """
+    Applies the idle timeout and the global caps.
+
+    Key Logic:
+        1.  Sessions inactive for `SESSION_IDLE_TIMEOUT` are released.
+        2.  While all sessions together hold more than `SESSIONS_MEMORY_CAP`,
+            the least recently active ones are released.
+        3.  Sessions beyond `MAX_SESSIONS` are returned for closing, least
+            recently active first.
+
+    Args:
+        now (float, optional): `time.monotonic()` timestamp.
+
+    Returns:
+        tuple: (whether any session was released, sessions to close).
+    """
+    now = time.monotonic() if now is None else now
+    records = list(_SESSIONS.values())
+    released = False
+
+    for record in records:
+        if now - record["last_active"] < SESSION_IDLE_TIMEOUT:
+            break
+        with reactive.isolate():
+            idle = record["idle"]()
+        if not idle:
+            release_session(record)
+            released = True
+
+    total = sum(_held_bytes(r) for r in records)
+    for record in records:
+        if total <= SESSIONS_MEMORY_CAP:
+            break
+        if record["holders"]:
+            total -= _held_bytes(record)
+            release_session(record)
+            released = True
+
+    excess = max(len(records) - MAX_SESSIONS, 0)
+    return released, [r["session"] for r in records[:excess]]
+
+
+async def _sweep_loop():
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL)
+        try:
+            released, to_close = sweep_sessions()
+            if released:
+                await reactive.flush()
+            for session in to_close:
+                _COUNTERS["closed"] += 1
+                await session.close()
+        except Exception as e:
+            print(f"Warning: Session sweep failed: {e}")
+
+
+def _start_sweeper():
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # no event loop (scripts, tests)
+    if _SWEEPER["task"] is None or _SWEEPER["task"].done():
+        _SWEEPER["task"] = loop.create_task(_sweep_loop())
+
+
+# --- 5. Metrics ---
+
+def session_metrics() -> dict:
+    """
+    Live sessions and memory held, for the `/metrics` endpoint.
+
+    Returns:
+        dict: Session counts, bytes held (total and largest session), bytes
+              per object name and lifetime release/rehydrate/close counters.
+    """
+    now = time.monotonic()
+    per_session = [_held_bytes(r) for r in _SESSIONS.values()]
+    by_object = {}
+    idle = 0
+    for record in _SESSIONS.values():
+        with reactive.isolate():
+            idle += bool(record["idle"]())
+        for name, holder in record["holders"].items():
+            by_object[name] = by_object.get(name, 0) + holder["bytes"]
+    return {
+        "live": len(_SESSIONS),
+        "idle": idle,
+        "bytes_held": sum(per_session),
+        "max_session_bytes": max(per_session, default=0),
+        "bytes_by_object": by_object,
+        "oldest_activity_seconds": round(
+            now - next(iter(_SESSIONS.values()))["last_active"], 1
+        ) if _SESSIONS else 0,
+        **_COUNTERS,
+    }
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import re
+
+from .config import ASSET_MANIFEST_PATH
+
+# Fingerprinted file names (`about.3f9c0e12ab.html`); their content never changes
+FINGERPRINTED = re.compile(r"\.[0-9a-f]{10}\.[A-Za-z0-9]+$")
+
+IMMUTABLE_CACHE_CONTROL = b"public, max-age=31536000, immutable"
+
+# Manifest contents, read on first use
+_MANIFEST = {}
+
+
+def content_hash(data: bytes) -> str:
+    """
+    Short content hash used in fingerprinted file names.
+
+    Args:
+        data (bytes): File contents.
+
+    Returns:
+        str: First 10 hex digits of the SHA-256.
+    """
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def asset_url(name: str, path: str = ASSET_MANIFEST_PATH, default=None):
+    """
+    URL of a built asset, relative to the app root.
+
+    Usage:
+        Called when building the UI, e.g. `asset_url("about.html")`.
+
+    Args:
+        name (str): Logical asset name in the manifest.
+        path (str): Manifest written by `scripts/build_assets.py`.
+        default (str, optional): URL used if the asset has not been built
+                                 (e.g. the CDN copy of a vendored file).
+
+    Returns:
+        str | None: Fingerprinted path (e.g. "content/about.3f9c0e12ab.html"),
+                    or `default` if the asset has not been built.
+    """
+    if path not in _MANIFEST:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                _MANIFEST[path] = json.load(f)
+        except FileNotFoundError:
+            print(f"Warning: Asset manifest not found at {path}. Run scripts/build_assets.py.")
+            _MANIFEST[path] = {}
+    return _MANIFEST[path].get(name, default)
+
+
+def immutable_cache(app):
+    """
+    ASGI middleware marking fingerprinted files as cacheable forever.
+
+    Responses for paths matching `FINGERPRINTED` get a one-year immutable
+    `Cache-Control`; other responses are unchanged (static files keep the
+    ETag/Last-Modified validation done by Starlette).
+
+    Args:
+        app: ASGI application.
+
+    Returns:
+        ASGI application.
+    """
+    async def wrapped(scope, receive, send):
+        if scope["type"] != "http" or not FINGERPRINTED.search(scope["path"]):
+            await app(scope, receive, send)
+            return
+
+        async def send_with_cache_control(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = [h for h in message.get("headers", []) if h[0].lower() != b"cache-control"]
+                headers.append((b"cache-control", IMMUTABLE_CACHE_CONTROL))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await app(scope, receive, send_with_cache_control)
+
+    return wrapped
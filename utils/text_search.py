@@ -0,0 +1,284 @@
+import functools
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from .cache import cached_async, make_cache
+from .trigram_index import normalize_text
+
+# Free-text fields searched by the Overview search box
+TEXT_SEARCH_FIELDS = [
+    "innovation",
+    "indication",
+    "technology",
+    "manufacturer",
+    "target_population",
+    "trial_status_notes",
+]
+
+# BM25 parameters (standard defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "by", "for", "from", "in", "is",
+    "of", "on", "or", "the", "to", "with",
+}
+
+TERM_SPLIT = re.compile(r"[\s_]+")
+
+# Process-wide index per data version (`get_text_index`)
+_TEXT_CACHE = make_cache(maxsize=1, name="text_index")
+
+# Most recently built index, the base of the next version's update
+_INDEX = {"latest": None}
+
+
+def tokenize(text) -> list:
+    """
+    Splits text into search terms.
+
+    Words are normalized with `normalize_text`, hyphenated words are split,
+    stopwords dropped and a trailing plural "s" removed, so "long-acting
+    injectables" and "Long acting injectable" give the same terms.
+
+    Args:
+        text: Any value; non-strings give no terms.
+
+    Returns:
+        list: Terms, in order, with repeats.
+    """
+    terms = []
+    for word in TERM_SPLIT.split(normalize_text(text)):
+        if not word or word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def _documents(df: pd.DataFrame, fields: list, key: str) -> pd.Series:
+    """Concatenated search text per key (rows sharing a key are joined)."""
+    cols = [c for c in fields if c in df.columns]
+    text = pd.Series("", index=df.index, dtype=object)
+    for col in cols:
+        text = text + " " + df[col].fillna("").astype(str)
+    text.index = df[key].to_numpy()
+    if text.index.is_unique:
+        return text
+    return text.groupby(level=0, sort=False).agg(" ".join)
+
+
+def _doc_hashes(docs: pd.Series) -> dict:
+    """Content hash per key, used to find the documents that changed."""
+    hashes = pd.util.hash_pandas_object(docs, index=False).to_numpy()
+    return dict(zip(docs.index, hashes))
+
+
+def build_text_index(df: pd.DataFrame, fields: list = TEXT_SEARCH_FIELDS, key: str = "innovation") -> dict:
+    """
+    Builds a BM25 inverted index with one document per product.
+
+    Usage:
+        Built from `innovation_df` through `get_text_index`; queried by the
+        Overview search box.
+
+    Key Logic:
+        1.  Each product's `fields` are concatenated into one document.
+        2.  Every term maps to parallel arrays of document slots and term
+            frequencies.
+        3.  Document slots are stable, so `update_text_index` can replace
+            single documents without renumbering the rest.
+
+    Args:
+        df (pd.DataFrame): One or more rows per product.
+        fields (list): Text columns to index.
+        key (str): Column identifying a product.
+
+    Returns:
+        dict: Index state ("keys", "lengths", "postings", "hashes", ...).
+    """
+    index = {
+        "fields": fields,
+        "key": key,
+        "keys": [],
+        "slots": {},
+        "lengths": np.zeros(0, dtype=np.float32),
+        "terms": [],
+        "postings": {},
+        "hashes": {},
+    }
+    return update_text_index(index, df)
+
+
+def _set_postings(index: dict, term: str, slots: np.ndarray, tfs: np.ndarray):
+    """Stores (or drops, when empty) the posting arrays of one term."""
+    if len(slots):
+        index["postings"][term] = (slots, tfs)
+    else:
+        index["postings"].pop(term, None)
+
+
+def update_text_index(index: dict, df: pd.DataFrame) -> dict:
+    """
+    Index of new data, re-tokenizing only the documents that changed.
+
+    Key Logic:
+        1.  Documents are hashed; unchanged hashes are skipped.
+        2.  Removed or changed documents are dropped from the postings of the
+            terms they contained; their slots are reused by new documents.
+        3.  New or changed documents are tokenized and appended to the
+            postings of their terms.
+        4.  `index` is not modified, so sessions still searching it are
+            unaffected; the new index shares its unchanged posting arrays.
+
+    Args:
+        index (dict): Output of `build_text_index`.
+        df (pd.DataFrame): Current data.
+
+    Returns:
+        dict: The updated index (`index` itself if nothing changed).
+    """
+    docs = _documents(df, index["fields"], index["key"])
+    hashes = _doc_hashes(docs)
+    old_hashes = index["hashes"]
+
+    removed = [k for k in old_hashes if k not in hashes]
+    changed = [k for k, h in hashes.items() if old_hashes.get(k) != h]
+    if not removed and not changed:
+        return index
+
+    # Copy the containers that change; arrays and Counters are replaced, not mutated
+    index = {
+        **index,
+        "keys": list(index["keys"]),
+        "slots": dict(index["slots"]),
+        "terms": list(index["terms"]),
+        "postings": dict(index["postings"]),
+    }
+
+    slots = index["slots"]
+    stale = {slots[k] for k in removed + changed if k in slots}
+    stale_terms = {t for s in stale for t in index["terms"][s]}
+
+    free = sorted(slots.pop(k) for k in removed)
+    for s in free:
+        index["keys"][s] = None
+        index["terms"][s] = Counter()
+
+    texts = dict(zip(docs.index, docs.to_numpy()))
+    new_terms = {}
+    for k in changed:
+        if k in slots:
+            s = slots[k]
+        elif free:
+            s = free.pop(0)
+        else:
+            s = len(index["keys"])
+            index["keys"].append(None)
+            index["terms"].append(Counter())
+        slots[k] = s
+        index["keys"][s] = k
+        index["terms"][s] = Counter(tokenize(texts[k]))
+        for term, tf in index["terms"][s].items():
+            new_terms.setdefault(term, ([], []))
+            new_terms[term][0].append(s)
+            new_terms[term][1].append(tf)
+
+    stale_arr = np.fromiter(stale, dtype=np.int32, count=len(stale))
+    for term in stale_terms | set(new_terms):
+        add_slots, add_tfs = new_terms.get(term, ([], []))
+        add_slots = np.asarray(add_slots, dtype=np.int32)
+        add_tfs = np.asarray(add_tfs, dtype=np.float32)
+        if term not in index["postings"]:
+            _set_postings(index, term, add_slots, add_tfs)
+            continue
+        doc_slots, tfs = index["postings"][term]
+        keep = ~np.isin(doc_slots, stale_arr)
+        _set_postings(
+            index,
+            term,
+            np.concatenate([doc_slots[keep], add_slots]),
+            np.concatenate([tfs[keep], add_tfs]),
+        )
+
+    index["lengths"] = np.asarray(
+        [sum(c.values()) for c in index["terms"]], dtype=np.float32
+    )
+    index["hashes"] = hashes
+    return index
+
+
+def _next_text_index(df: pd.DataFrame) -> dict:
+    # Built from the previous version's index, so only changed documents are tokenized
+    latest = _INDEX["latest"]
+    index = build_text_index(df) if latest is None else update_text_index(latest, df)
+    _INDEX["latest"] = index
+    return index
+
+
+async def get_text_index(df: pd.DataFrame, version: str) -> dict:
+    """
+    Process-wide text index of a dataset version.
+
+    Usage:
+        Requested by every Overview session when it starts. The first request
+        of a version builds the index on the worker pool (incrementally from
+        the previous version's index); concurrent requests await the same
+        build and later ones are cache hits.
+
+    Args:
+        df (pd.DataFrame): One row per product (e.g. `innovation_df`).
+        version (str): `load_data()["data_version"]` of `df`.
+
+    Returns:
+        dict: Shared, read-only index for `search_text`.
+    """
+    return await cached_async(_TEXT_CACHE, version, functools.partial(_next_text_index, df))
+
+
+def search_text(index: dict, query: str, limit: int = None) -> pd.DataFrame:
+    """
+    Ranks products against a free-text query with BM25.
+
+    Args:
+        index (dict): Output of `build_text_index`.
+        query (str): Free text, e.g. "long-acting injectable PrEP".
+        limit (int, optional): Maximum number of results.
+
+    Returns:
+        pd.DataFrame: Columns ['innovation', 'score'] (the index key column),
+                      best first; empty if no term matches.
+    """
+    lengths = index["lengths"]
+    n_docs = len(index["slots"])
+    result_cols = [index["key"], "score"]
+    if n_docs == 0:
+        return pd.DataFrame(columns=result_cols)
+
+    avgdl = lengths.sum() / n_docs
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avgdl)
+
+    scores = np.zeros(len(lengths), dtype=np.float64)
+    for term in set(tokenize(query)):
+        posting = index["postings"].get(term)
+        if posting is None:
+            continue
+        slots, tfs = posting
+        idf = np.log(1 + (n_docs - len(slots) + 0.5) / (len(slots) + 0.5))
+        scores += np.bincount(
+            slots,
+            weights=idf * tfs * (BM25_K1 + 1) / (tfs + norm[slots]),
+            minlength=len(lengths),
+        )
+
+    hits = np.flatnonzero(scores > 0)
+    if limit is not None and len(hits) > limit:
+        hits = hits[np.argpartition(-scores[hits], limit - 1)[:limit]]
+    hits = hits[np.argsort(-scores[hits], kind="stable")]
+
+    keys = np.asarray(index["keys"], dtype=object)
+    return pd.DataFrame({index["key"]: keys[hits], "score": scores[hits]})
@@ -10,9 +10,7 @@ def create_theme() -> ui.Theme:
         fg=COLORS["fg"],
     ).add_rules(
         """
-        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;700&display=swap');
-        @import url('https://fonts.googleapis.com/css2?family=Inter+Tight:wght@400;700&display=swap');
-
+        /* Inter and Inter Tight are loaded by the fonts.css link in app.py */
         body {
             font-family: 'Inter', sans-serif;
         }
@@ -0,0 +1,193 @@
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+PUNCTUATION = re.compile(r"[^\w\s]")
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text) -> str:
+    """
+    Lowercases, strips accents and punctuation, and collapses whitespace.
+
+    Args:
+        text: Any value; non-strings normalize to "".
+
+    Returns:
+        str: Normalized text.
+    """
+    if not isinstance(text, str):
+        return ""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = PUNCTUATION.sub(" ", text.lower())
+    return WHITESPACE.sub(" ", text).strip()
+
+
+def trigrams(text) -> set:
+    """
+    Character trigrams of a string, padded like pg_trgm (two spaces before
+    and one after every word) so short words and word starts still count.
+
+    Args:
+        text: Raw string.
+
+    Returns:
+        set: Distinct trigrams.
+    """
+    grams = set()
+    for word in normalize_text(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def build_trigram_index(texts, keys=None, sources=None) -> dict:
+    """
+    Builds a character-trigram inverted index over a list of names.
+
+    Usage:
+        Product/alias linking in `scripts/build_product_aliases.py`.
+
+    Key Logic:
+        1.  Each text is split into padded trigrams.
+        2.  Every trigram maps to a sorted int32 array of the texts containing it.
+        3.  Several texts can share a key (e.g. a product and its alternative
+            names), so results are reported per key.
+
+    Args:
+        texts (list): Names to index.
+        keys (list, optional): What each text resolves to; defaults to the text.
+        sources (list, optional): Label for each text (e.g. "alternative_name").
+
+    Returns:
+        dict: {"texts", "keys", "sources", "sizes", "postings"}.
+    """
+    texts = list(texts)
+    keys = list(texts if keys is None else keys)
+    sources = list([None] * len(texts) if sources is None else sources)
+
+    postings = {}
+    sizes = np.zeros(len(texts), dtype=np.int32)
+    for i, text in enumerate(texts):
+        grams = trigrams(text)
+        sizes[i] = len(grams)
+        for gram in grams:
+            postings.setdefault(gram, []).append(i)
+
+    return {
+        "texts": np.asarray(texts, dtype=object),
+        "keys": np.asarray(keys, dtype=object),
+        "sources": np.asarray(sources, dtype=object),
+        "sizes": sizes,
+        "postings": {g: np.asarray(ids, dtype=np.int32) for g, ids in postings.items()},
+    }
+
+
+def _shared_counts(index: dict, grams: set) -> np.ndarray:
+    """Number of trigrams each indexed text shares with a query."""
+    hits = [index["postings"][g] for g in grams if g in index["postings"]]
+    if not hits:
+        return np.zeros(len(index["texts"]), dtype=np.int64)
+    return np.bincount(np.concatenate(hits), minlength=len(index["texts"]))
+
+
+def _similarity(shared, query_size, sizes):
+    """Trigram Jaccard similarity: shared / (|query| + |text| - shared)."""
+    union = query_size + sizes - shared
+    return np.divide(shared, union, out=np.zeros(len(shared)), where=union > 0)
+
+
+def trigram_search(index: dict, query: str, k: int = 10, cutoff: float = 0.3) -> pd.DataFrame:
+    """
+    Top-k most similar indexed names for one query.
+
+    Args:
+        index (dict): Output of `build_trigram_index`.
+        query (str): Free text.
+        k (int): Maximum number of keys to return.
+        cutoff (float): Minimum similarity in [0, 1].
+
+    Returns:
+        pd.DataFrame: Columns ['key', 'text', 'source', 'score'], best first,
+        one row per key.
+    """
+    grams = trigrams(query)
+    scores = _similarity(_shared_counts(index, grams), len(grams), index["sizes"])
+
+    candidates = np.flatnonzero(scores >= cutoff) if cutoff > 0 else np.flatnonzero(scores > 0)
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+    result = pd.DataFrame({
+        "key": index["keys"][order],
+        "text": index["texts"][order],
+        "source": index["sources"][order],
+        "score": scores[order],
+    })
+    return result.drop_duplicates("key").head(k).reset_index(drop=True)
+
+
+def trigram_link(index: dict, queries, cutoff: float = 0.5) -> pd.DataFrame:
+    """
+    Links a whole batch of names to their best indexed match in one pass.
+
+    Key Logic:
+        1.  All (query, trigram) pairs are joined against the postings at once.
+        2.  Shared-trigram counts per (query, text) pair come from one
+            `np.unique` over the combined pair ids.
+        3.  The best-scoring text per query is kept if it meets `cutoff`.
+
+    Args:
+        index (dict): Output of `build_trigram_index`.
+        queries (list): Incoming names.
+        cutoff (float): Minimum similarity in [0, 1].
+
+    Returns:
+        pd.DataFrame: Columns ['query', 'key', 'text', 'source', 'score'];
+        unmatched queries have NaN key/text/source and score 0.
+    """
+    queries = list(queries)
+    n_texts = len(index["texts"])
+
+    query_ids, text_ids, query_sizes = [], [], np.zeros(len(queries), dtype=np.int64)
+    for qi, query in enumerate(queries):
+        grams = trigrams(query)
+        query_sizes[qi] = len(grams)
+        for gram in grams:
+            hits = index["postings"].get(gram)
+            if hits is not None:
+                query_ids.append(np.full(len(hits), qi, dtype=np.int64))
+                text_ids.append(hits)
+
+    best_text = np.full(len(queries), -1, dtype=np.int64)
+    best_score = np.zeros(len(queries))
+    if query_ids:
+        pairs, shared = np.unique(
+            np.concatenate(query_ids) * n_texts + np.concatenate(text_ids),
+            return_counts=True,
+        )
+        pair_query, pair_text = np.divmod(pairs, n_texts)
+        scores = _similarity(shared, query_sizes[pair_query], index["sizes"][pair_text])
+
+        # Best pair per query: sort by (query, -score) and take the first of each run
+        order = np.lexsort((-scores, pair_query))
+        first = order[np.r_[True, pair_query[order][1:] != pair_query[order][:-1]]]
+        best_text[pair_query[first]] = pair_text[first]
+        best_score[pair_query[first]] = scores[first]
+
+    matched = (best_text >= 0) & (best_score >= cutoff)
+    safe = np.where(matched, best_text, 0)
+
+    def pick(values):
+        return np.where(matched, values[safe] if n_texts else None, None)
+
+    return pd.DataFrame({
+        "query": queries,
+        "key": pick(index["keys"]),
+        "text": pick(index["texts"]),
+        "source": pick(index["sources"]),
+        "score": np.where(matched, best_score, 0.0),
+    })
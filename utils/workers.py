@@ -0,0 +1,405 @@
+import asyncio
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from shiny import reactive, req
+
+from .cache import cached_async
+from .sessions import invalidate_later_if_visible, require_active, session_resource
+from .config import (
+    ADMISSION_LIMITS,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_RETRY,
+    ADMISSION_TIMEOUT,
+    LAG_SAMPLE_INTERVAL,
+    LAG_STALL_THRESHOLD,
+    WORKER_THREADS,
+)
+
+# Bounded pool shared by all sessions. Threads rather than processes: the
+# inputs are large frames that would have to be pickled, and pandas/NumPy
+# release the GIL in their heavy loops.
+_EXECUTOR = ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix="globalhub-worker")
+
+# Counters reported by `worker_metrics`
+_WORKERS = {"queued": 0, "running": 0, "completed": 0, "failed": 0, "cancelled": 0, "busy_seconds": 0.0}
+_COUNTER_LOCK = threading.Lock()
+
+# Admission state per output class (see `admit`)
+_ADMISSION = {}
+
+# Returned by a shed computation in place of its result
+_SHED = object()
+
+# Event-loop lag samples reported by `event_loop_metrics`
+_LAG = {"task": None, "last": 0.0, "max": 0.0, "mean": 0.0, "samples": 0, "stalls": 0}
+
+
+# --- 1. Worker pool ---
+
+def _count(name, delta=1):
+    with _COUNTER_LOCK:
+        _WORKERS[name] += delta
+
+
+def _timed(fn, args, kwargs):
+    """Runs `fn` on a worker thread, updating the pool counters."""
+    _count("queued", -1)
+    _count("running")
+    start = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _count("running", -1)
+        _count("busy_seconds", time.perf_counter() - start)
+
+
+def _count_outcome(future):
+    if future.cancelled():
+        _count("queued", -1)  # never started
+    elif future.exception() is not None:
+        _count("failed")
+    else:
+        _count("completed")
+
+
+def submit_to_worker(fn, *args, **kwargs):
+    """
+    Queues a synchronous function on the worker pool.
+
+    Args:
+        fn (callable): Synchronous, non-reactive function.
+        *args, **kwargs: Arguments for `fn`.
+
+    Returns:
+        concurrent.futures.Future: Its result.
+    """
+    _count("queued")
+    future = _EXECUTOR.submit(_timed, fn, args, kwargs)
+    future.add_done_callback(_count_outcome)
+    return future
+
+
+async def run_in_worker(fn, *args, **kwargs):
+    """
+    Runs a synchronous function on the worker pool without blocking the event loop.
+
+    `fn` must not read reactive values or touch the session; pass it plain
+    arguments and build widgets from its result on the event loop.
+
+    Args:
+        fn (callable): Synchronous function (e.g. a pandas computation).
+        *args, **kwargs: Arguments for `fn`.
+
+    Returns:
+        The result of `fn`. If the awaiting task is cancelled, the result is
+        discarded when the thread finishes.
+    """
+    try:
+        return await asyncio.wrap_future(submit_to_worker(fn, *args, **kwargs))
+    except asyncio.CancelledError:
+        _count("cancelled")
+        raise
+
+
+# --- 2. Admission control ---
+
+def _admission(output_class):
+    state = _ADMISSION.get(output_class)
+    if state is None:
+        state = _ADMISSION[output_class] = {
+            "limit": ADMISSION_LIMITS.get(output_class, WORKER_THREADS),
+            "active": 0,
+            "waiting": deque(),
+            "admitted": 0,
+            "shed": 0,
+            "timed_out": 0,
+        }
+    return state
+
+
+def _release(state):
+    # Hand the slot to the oldest live waiter, or free it
+    while state["waiting"]:
+        waiter = state["waiting"].popleft()
+        if not waiter.done():
+            waiter.set_result(None)
+            return
+    state["active"] -= 1
+
+
+async def admit(output_class):
+    """
+    Waits for a computation slot of an output class.
+
+    Usage:
+        release = await admit("heatmap")
+        ...                         # run the computation
+        release()                   # on the event loop
+
+    Key Logic:
+        1.  Up to `ADMISSION_LIMITS[output_class]` computations of a class run
+            at once; further requests wait in arrival order.
+        2.  A request is shed (`TimeoutError`) when `ADMISSION_QUEUE_DEPTH`
+            requests are already waiting, or after `ADMISSION_TIMEOUT` seconds.
+
+    Args:
+        output_class (str): Key of `ADMISSION_LIMITS` (other names get
+                            `WORKER_THREADS` slots).
+
+    Returns:
+        callable: Releases the slot; call it exactly once.
+    """
+    state = _admission(output_class)
+    if state["active"] < state["limit"]:
+        state["active"] += 1
+    else:
+        if len(state["waiting"]) >= ADMISSION_QUEUE_DEPTH:
+            state["shed"] += 1
+            raise TimeoutError(f"{output_class}: too many requests waiting")
+        waiter = asyncio.get_running_loop().create_future()
+        state["waiting"].append(waiter)
+        try:
+            await asyncio.wait_for(waiter, ADMISSION_TIMEOUT)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                _release(state)  # the slot arrived as the wait ended
+            elif waiter in state["waiting"]:  # a release may have dropped it already
+                state["waiting"].remove(waiter)
+            if isinstance(e, TimeoutError):
+                state["shed"] += 1
+                state["timed_out"] += 1
+                raise TimeoutError(f"{output_class}: no slot after {ADMISSION_TIMEOUT}s") from None
+            raise
+    state["admitted"] += 1
+    return functools.partial(_release, state)
+
+
+async def run_admitted(output_class, fn, *args):
+    """
+    `run_in_worker` behind the admission limit of an output class.
+
+    The slot is held until the thread finishes, even if the caller stops
+    waiting, so cancelled computations still count against the limit.
+
+    Args:
+        output_class (str): Key of `ADMISSION_LIMITS`.
+        fn (callable): Synchronous, non-reactive function.
+        *args: Arguments for `fn`.
+
+    Returns:
+        The result of `fn`. Raises `TimeoutError` when the request is shed.
+    """
+    release = await admit(output_class)
+    loop = asyncio.get_running_loop()
+    future = submit_to_worker(fn, *args)
+    future.add_done_callback(lambda _: loop.call_soon_threadsafe(release))
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        _count("cancelled")
+        raise
+
+
+def worker_calc(compute, args, cache=None, key=None, output_class=None, busy=None, name=None):
+    """
+    Reactive calc whose value is computed on the worker pool.
+
+    Usage:
+        page_df = worker_calc(page_rows, lambda: (input.disease_selector(), ...),
+                              name="overview.page_df")
+        figure = worker_calc(build, args, cache=_FIGURE_CACHE, key=lambda *a: ...,
+                             output_class="timeline", busy=busy_figure)
+
+    Key Logic:
+        1.  `args()` runs in a reactive effect, so the calc is recomputed when
+            anything it reads changes. It may raise silent exceptions (e.g.
+            `req`) to skip a computation.
+        2.  `compute(*args())` runs in a Shiny extended task on the pool. A
+            computation still running when the arguments change again is
+            cancelled; only the latest result is ever published.
+        3.  While a computation is pending, readers raise Shiny's "in
+            progress" exception, so outputs keep their last value and show
+            the recalculating state instead of clearing.
+        4.  With a `cache`, results are shared across sessions by `key` and
+            concurrent sessions asking for the same key share one computation
+            (`utils.cache.cached_async`).
+        5.  With an `output_class`, the computation waits for an admission
+            slot (`admit`). If it is shed, the calc returns its previous
+            value, or else `busy()`, and tries again after `ADMISSION_RETRY`
+            seconds (once the tab is visible again, for background tabs).
+        6.  With a `name`, each published result is registered with
+            `utils.sessions.session_resource`. Releasing the idle session
+            drops it (and cancels a running computation); the calc is
+            computed again when the user returns.
+
+    Args:
+        compute (callable): Synchronous, non-reactive function.
+        args (callable): Reactive function returning the tuple of arguments.
+        cache (dict, optional): Output of `utils.cache.make_cache`.
+        key (callable, optional): Cache key from the arguments.
+        output_class (str, optional): Key of `ADMISSION_LIMITS`.
+        busy (callable, optional): Placeholder shown when a shed computation
+                                   has no previous value (default: keep the
+                                   output in its recalculating state).
+        name (str, optional): Label of the result in the session metrics.
+
+    Returns:
+        callable: Reactive calc returning the latest result.
+    """
+    retry = reactive.Value(0)
+    last = {"value": _SHED, "retrying": False}
+
+    @reactive.extended_task
+    async def task(*values):
+        try:
+            if cache is not None:
+                return await cached_async(
+                    cache, key(*values), functools.partial(compute, *values), output_class
+                )
+            if output_class is not None:
+                return await run_admitted(output_class, compute, *values)
+            return await run_in_worker(compute, *values)
+        except TimeoutError as e:
+            print(f"Warning: {e}")
+            return _SHED
+
+    def release():
+        last["value"] = _SHED
+        with reactive.isolate():
+            running = task.status() == "running"
+        if running:
+            task.cancel()  # its status becomes "cancelled"
+        else:
+            task.value.unset()
+            task.status.set("initial")
+
+    @reactive.Effect
+    def _invoke():
+        require_active()
+        values = args()
+        retry()
+        with reactive.isolate():
+            if task.status() == "running":
+                task.cancel()
+        task.invoke(*values)
+
+    @reactive.Effect
+    def _retry_shed():
+        if task.status() != "success" or task.result() is not _SHED:
+            last["retrying"] = False
+        elif last["retrying"]:
+            last["retrying"] = False
+            with reactive.isolate():
+                retry.set(retry() + 1)
+        else:
+            last["retrying"] = True
+            invalidate_later_if_visible(ADMISSION_RETRY)
+
+    @reactive.Calc
+    def result():
+        # A cancelled run is always followed by the invocation that superseded
+        # it, or by the one made when a released session becomes active again
+        if task.status() == "cancelled":
+            req(False, cancel_output="progress")
+        value = task.result()
+        if value is not _SHED:
+            last["value"] = value
+            if name is not None:
+                session_resource(name, value, release)
+        elif last["value"] is not _SHED:
+            value = last["value"]  # stale, until the retry succeeds
+        elif busy is not None:
+            value = busy()
+        else:
+            req(False, cancel_output="progress")
+        return value
+
+    return result
+
+
+# --- 3. Event-loop lag ---
+
+async def _sample_lag():
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(LAG_SAMPLE_INTERVAL)
+        lag = max(loop.time() - start - LAG_SAMPLE_INTERVAL, 0.0)
+        _LAG["last"] = lag
+        _LAG["max"] = max(_LAG["max"], lag)
+        _LAG["samples"] += 1
+        _LAG["mean"] += (lag - _LAG["mean"]) / min(_LAG["samples"], 100)
+        if lag >= LAG_STALL_THRESHOLD:
+            _LAG["stalls"] += 1
+
+
+def start_lag_monitor():
+    """
+    Starts sampling event-loop lag (idempotent).
+
+    Usage:
+        Called from the app `server()`; the first session starts the sampler.
+        Lag is how late a `LAG_SAMPLE_INTERVAL` sleep wakes up, i.e. how long
+        synchronous work held the loop.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # no event loop (scripts, tests)
+    if _LAG["task"] is None or _LAG["task"].done():
+        _LAG["task"] = loop.create_task(_sample_lag())
+
+
+# --- 4. Metrics ---
+
+def worker_metrics() -> dict:
+    """
+    Worker pool activity, for the `/metrics` endpoint.
+
+    Returns:
+        dict: Pool size, current queue and running counts, and lifetime
+              completed/failed/cancelled counts and busy time.
+    """
+    return {"threads": WORKER_THREADS, **_WORKERS, "busy_seconds": round(_WORKERS["busy_seconds"], 3)}
+
+
+def event_loop_metrics() -> dict:
+    """
+    Event-loop lag, for the `/metrics` endpoint.
+
+    Returns:
+        dict: Latest, maximum and moving-average lag in milliseconds, and the
+              number of samples over `LAG_STALL_THRESHOLD`.
+    """
+    return {
+        "lag_ms": round(_LAG["last"] * 1000, 1),
+        "max_lag_ms": round(_LAG["max"] * 1000, 1),
+        "mean_lag_ms": round(_LAG["mean"] * 1000, 1),
+        "samples": _LAG["samples"],
+        "stalls": _LAG["stalls"],
+    }
+
+
+def admission_metrics() -> dict:
+    """
+    Admission control per output class, for the `/metrics` endpoint.
+
+    Returns:
+        dict: {output class: slot limit, running and waiting (queue depth)
+              counts, and lifetime admitted/shed/timed-out counts}.
+    """
+    return {
+        output_class: {
+            "limit": state["limit"],
+            "active": state["active"],
+            "queue_depth": len(state["waiting"]),
+            "admitted": state["admitted"],
+            "shed": state["shed"],
+            "timed_out": state["timed_out"],
+        }
+        for output_class, state in _ADMISSION.items()
+    }
@@ -0,0 +1,69 @@
+// Comparison cart popover: keyed updates of the item list.
+//
+// The server sends {add: [{id, label}], remove: [id], count} whenever the
+// cart changes; only the affected rows are inserted or removed. Ids are
+// positions in the sorted product list, so keeping rows sorted by id keeps
+// them in alphabetical order.
+(function () {
+  function cartList() {
+    return document.getElementById("cart-items");
+  }
+
+  function cartRow(item) {
+    const row = document.createElement("div");
+    row.className = "cart-item d-flex justify-content-between align-items-center w-100";
+    row.dataset.productId = item.id;
+
+    const label = document.createElement("span");
+    label.textContent = item.label;
+
+    const button = document.createElement("button");
+    button.type = "button";
+    button.className = "btn btn-sm btn-ghost float-end";
+    button.dataset.cartRemove = item.id;
+    button.title = "Remove";
+    button.innerHTML = '<i class="fa-solid fa-xmark"></i>';
+
+    row.append(label, button);
+    return row;
+  }
+
+  function applyDiff(msg) {
+    const list = cartList();
+    if (!list) return;
+
+    msg.remove.forEach((id) => {
+      const row = list.querySelector(`[data-product-id="${id}"]`);
+      if (row) row.remove();
+    });
+
+    msg.add.forEach((item) => {
+      if (list.querySelector(`[data-product-id="${item.id}"]`)) return;
+      const next = Array.from(list.querySelectorAll("[data-product-id]")).find(
+        (row) => Number(row.dataset.productId) > item.id
+      );
+      list.insertBefore(cartRow(item), next || null);
+    });
+
+    const empty = document.getElementById("cart-empty");
+    if (empty) empty.classList.toggle("d-none", msg.count > 0);
+
+    const badge = document.getElementById("cart-count");
+    if (badge) {
+      badge.textContent = msg.count;
+      badge.classList.toggle("d-none", msg.count === 0);
+    }
+  }
+
+  document.addEventListener("click", (event) => {
+    const button = event.target.closest("[data-cart-remove]");
+    if (!button || !window.Shiny) return;
+    Shiny.setInputValue("cart_remove", [Number(button.dataset.cartRemove)], {
+      priority: "event",
+    });
+  });
+
+  document.addEventListener("DOMContentLoaded", () => {
+    Shiny.addCustomMessageHandler("cart_diff", applyDiff);
+  });
+})();
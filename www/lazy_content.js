@@ -0,0 +1,29 @@
+// Lazily loaded content.
+//
+// Elements with a `data-lazy-src` attribute are filled with the HTML at that
+// URL the first time they become visible (e.g. when their tab is shown). The
+// URLs are fingerprinted, so the browser cache serves repeat visits.
+(function () {
+  function load(el) {
+    fetch(el.dataset.lazySrc)
+      .then((response) => (response.ok ? response.text() : Promise.reject(response.status)))
+      .then((html) => {
+        el.innerHTML = html;
+      })
+      .catch(() => {
+        el.textContent = "This content could not be loaded.";
+      });
+  }
+
+  document.addEventListener("DOMContentLoaded", () => {
+    const observer = new IntersectionObserver((entries) => {
+      entries.forEach((entry) => {
+        if (entry.isIntersecting) {
+          observer.unobserve(entry.target);
+          load(entry.target);
+        }
+      });
+    });
+    document.querySelectorAll("[data-lazy-src]").forEach((el) => observer.observe(el));
+  });
+})();
@@ -0,0 +1,55 @@
+// Session activity signals sent to the server.
+//
+// - whenLayoutReady(id): sets input `id` to true once, after the first
+//   render has settled (first `shiny:idle`), and nudges widgets to resize.
+// - `tab_visible`: whether the browser tab is in the foreground, so the
+//   server can suspend timers for background tabs.
+// - `user_active`: timestamp of the latest pointer/keyboard use or return to
+//   the tab (at most one per ACTIVITY_THROTTLE_MS), so the server can release
+//   idle sessions and rehydrate them when the user comes back.
+(function () {
+  const ACTIVITY_THROTTLE_MS = 30000;
+  let lastActivity = 0;
+
+  window.whenLayoutReady = function (inputId) {
+    $(document).one("shiny:idle", () => {
+      window.requestAnimationFrame(() => {
+        window.dispatchEvent(new Event("resize"));
+        Shiny.setInputValue(inputId, true);
+      });
+    });
+  };
+
+  function connected() {
+    return window.Shiny && Shiny.shinyapp && Shiny.shinyapp.isConnected();
+  }
+
+  function reportVisibility() {
+    Shiny.setInputValue("tab_visible", document.visibilityState === "visible");
+  }
+
+  function reportActivity(force) {
+    const now = Date.now();
+    if (!connected() || (!force && now - lastActivity < ACTIVITY_THROTTLE_MS)) {
+      return;
+    }
+    lastActivity = now;
+    Shiny.setInputValue("user_active", now);
+  }
+
+  $(document).on("shiny:sessioninitialized", () => {
+    reportVisibility();
+    reportActivity(true);
+  });
+  document.addEventListener("visibilitychange", () => {
+    if (connected()) {
+      reportVisibility();
+      if (document.visibilityState === "visible") {
+        reportActivity(true);
+      }
+    }
+  });
+  ["pointerdown", "keydown", "wheel"].forEach((type) => {
+    document.addEventListener(type, () => reportActivity(false), { passive: true, capture: true });
+  });
+})();
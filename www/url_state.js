@@ -0,0 +1,18 @@
+// Mirrors server-side page state into the URL query string, so the current
+// view can be bookmarked or shared. Empty values remove their parameter;
+// other parameters (e.g. ?list=) are left untouched.
+(function () {
+  document.addEventListener("DOMContentLoaded", () => {
+    Shiny.addCustomMessageHandler("url_state", (msg) => {
+      const url = new URL(window.location.href);
+      Object.entries(msg.params).forEach(([key, value]) => {
+        if (value === null || value === "") {
+          url.searchParams.delete(key);
+        } else {
+          url.searchParams.set(key, value);
+        }
+      });
+      window.history.replaceState(window.history.state, "", url);
+    });
+  });
+})();